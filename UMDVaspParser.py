@@ -26,10 +26,14 @@ import os
 import numpy as np
 
 from .load_OUTCAR import Load_OUTCAR
+from .libs.UMDIndex import UMDIndex
 from .libs.UMDSimulation import UMDSimulation
+from .utils.stream_WriteBehindBuffer import WriteBehindBuffer
 
 
-def UMDVaspParser(outcarfile_name, initialStep=0, nSteps=np.infty):
+def UMDVaspParser(outcarfile_name, initialStep=0, nSteps=np.infty,
+                  bufferSize=2**22, prune=False, workers=0, index=True,
+                  dedup=0):
     """
     Generate the UMD file extracting information from a Vasp OUTCAR file.
 
@@ -45,6 +49,29 @@ def UMDVaspParser(outcarfile_name, initialStep=0, nSteps=np.infty):
         The total number of snapshots to convert. If the number of snapshot
         exceeds the number of snapshots available, all the possible snapshots
         (after the initialStep) in the OUTCAR file are used.
+    bufferSize : int
+        The size in characters of the buffer collecting the snapshots before
+        they are written on the UMD file by a background thread.
+    prune : bool
+        If True, the dynamics columns whose values are all zero (like the
+        velocities, which are not reported in the OUTCAR file) are not
+        written on the UMD file.
+    workers : int
+        The number of worker processes parsing and formatting the snapshots,
+        while a reader thread slices the OUTCAR file and the formatted
+        snapshots are written in order on the UMD file. If 0, the snapshots
+        are converted serially.
+    index : bool
+        If True, the byte offsets of the snapshots in the UMD file are saved
+        in the UMDIndex sidecar file (the UMD file name with the additional
+        '.idx' extension), so that any snapshot can be loaded with a single
+        seek on the UMD file.
+    dedup : int
+        The number of last snapshots of each run compared with the first
+        snapshots of the next run. The first snapshots of a restarted run
+        with the same positions of one of them are dropped, and the
+        snapshots saved are numbered consecutively. If 0, no snapshot is
+        dropped.
 
     # Returns
     -------
@@ -58,7 +85,8 @@ def UMDVaspParser(outcarfile_name, initialStep=0, nSteps=np.infty):
     if nSteps < 0:
         raise(ValueError('invalid nStep value: it must be positive.'))
 
-    load_OUTCAR = Load_OUTCAR(initialStep=initialStep, nSteps=nSteps)
+    load_OUTCAR = Load_OUTCAR(initialStep=initialStep, nSteps=nSteps,
+                              prune=prune, workers=workers, dedup=dedup)
 
     simulation_name = outcarfile_name.replace('.outcar', '').split('/')[-1]
     simulation = UMDSimulation(name=simulation_name)
@@ -66,9 +94,12 @@ def UMDVaspParser(outcarfile_name, initialStep=0, nSteps=np.infty):
     # We open a temporary UMD output file to store the UMDSnapshot information.
     UMDfile = outcarfile_name.replace('outcar', 'umd')
     with open(UMDfile+'.temp', 'w+') as temp:
+        # The snapshots are collected in a buffer and written on the temporary
+        # file by a background thread, while the next ones are parsed.
+        buffer = WriteBehindBuffer(temp, bufferSize)
         # We open the OUTCAR input file to read all the UMDSimulation and
         # UMDSnapshot information.
-        with open(outcarfile_name, 'r') as outcar:
+        with buffer, open(outcarfile_name, 'r') as outcar:
             # The OUTCAR file is read line by line untill its end.
             # Each simulation run is read by the Load_OUTCAR.load function
             # and added to the total simulation in the UMDSimulation object.
@@ -77,7 +108,7 @@ def UMDVaspParser(outcarfile_name, initialStep=0, nSteps=np.infty):
                     # The Load_OUTCAR.load function returns the updated
                     # UMDSimulation object. If the end of the OUTCAR file is
                     # reached, then a EOFError is raised.
-                    simulation = load_OUTCAR.load(outcar, temp, simulation)
+                    simulation = load_OUTCAR.load(outcar, buffer, simulation)
                     if load_OUTCAR.loadedSteps >= initialStep+nSteps:
                         break
             except(EOFError) as eof:
@@ -91,9 +122,18 @@ def UMDVaspParser(outcarfile_name, initialStep=0, nSteps=np.infty):
             umd.write(145*'-'+'\n\n')
             simulation.lattice.save(umd)
             umd.write(145*'-'+'\n\n')
+            header = umd.tell()
             temp.seek(0)
             umd.write(temp.read())
 
+    if index:
+        # The snapshot offsets recorded in the temporary file are shifted by
+        # the header length to get their offsets in the UMD file.
+        table = np.array(load_OUTCAR.offsets, dtype=np.int64).reshape(-1, 2)
+        umdindex = UMDIndex(table[:, 0], table[:, 1]+header)
+        with open(UMDfile+'.idx', 'wb') as idx:
+            umdindex.save(idx)
+
     # The temporary UMD file is removed.
     os.remove(UMDfile+'.temp')
 
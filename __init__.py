@@ -12,3 +12,10 @@ from .libs.UMDAtom import UMDAtom
 from .libs.UMDLattice import UMDLattice
 from .libs.UMDSnapshot import UMDSnapshot
 from .libs.UMDSimulation import UMDSimulation
+from .libs.UMDCodec import UMDCodec
+from .libs.UMDIndex import UMDIndex
+from .libs.UMDTrajectory import UMDTrajectory
+from .libs.UMDTrajectoryArrays import UMDTrajectoryArrays
+from .libs.UMDUnwrapper import UMDUnwrapper
+from .libs.UMDPairDistribution import UMDPairDistribution
+from .libs.UMDVerletList import UMDVerletList
@@ -0,0 +1,308 @@
+"""
+===============================================================================
+                                   UMDCodec
+===============================================================================
+
+This module provides the UMDCodec class useful to archive the atoms dynamics
+of a molecular dynamics trajectory in a compact binary form.
+The trajectory values (positions or forces) are quantized on a fixed-point
+grid with a given precision, so that each value is stored as an integer
+number of precision units. Then, the frames are grouped in blocks: the first
+frame of each block is stored as it is (the key frame), while the following
+ones are stored as differences with respect to the previous frame. Since the
+atoms move only a little between two consecutive snapshots, the differences
+are small integers which are packed in the smallest integer type, whatever
+the size of the key frame values, and finally compressed with the zlib
+entropy coder.
+The decoded values differ from the original ones by at most half of the
+precision.
+
+Classes
+-------
+    UMDCodec
+
+See Also
+--------
+    UMDSnapDynamics
+    UMDTrajectoryArrays
+
+"""
+
+
+import zlib
+import struct
+import numpy as np
+
+from .UMDSnapDynamics import UMDSnapDynamics
+from .UMDTrajectoryArrays import UMDTrajectoryArrays
+
+
+MAGIC = b'UMDC'
+HEADER = struct.Struct('<4sdiii')
+BLOCK = struct.Struct('<BBq')
+# The header of the stream written by the save function: the magic string,
+# the format version, the number of frames and the byte lengths of the
+# compressed positions and forces.
+VERSION = 2
+STREAM = struct.Struct('<4sBqqq')
+INTEGERS = [np.dtype('<i{}'.format(n)) for n in (1, 2, 4, 8)]
+
+
+class UMDCodec:
+    """
+    UMDCodec class to compress and decompress trajectory arrays.
+
+    Parameters
+    ----------
+    precision : float
+        The quantization step. The decoded values differ from the original
+        ones by at most precision/2.
+    blocksize : int
+        The number of frames encoded together. Each block starts with a full
+        frame, so it can be decoded independently from the others.
+    level : int
+        The zlib compression level.
+
+    Methods
+    -------
+    encode
+        Compress an array of frames into a bytes object.
+    decode
+        Decompress a bytes object into an array of frames.
+    save
+        Print the dynamics of a trajectory on a binary output stream.
+    load
+        Read a list of UMDSnapDynamics from a binary input stream.
+
+    """
+
+    def __init__(self, precision=1e-4, blocksize=100, level=9):
+        """
+        Construct a UMDCodec object.
+
+        Parameters
+        ----------
+        precision : float, optional
+            The quantization step. The default is 1e-4.
+        blocksize : int, optional
+            The number of frames encoded together. The default is 100.
+        level : int, optional
+            The zlib compression level. The default is 9.
+
+        Raises
+        ------
+        ValueError
+            If the precision or the blocksize are not positive.
+
+        Returns
+        -------
+        UMDCodec object.
+
+        """
+        if precision <= 0:
+            raise ValueError('invalid precision value: it must be positive.')
+        if blocksize <= 0:
+            raise ValueError('invalid blocksize value: it must be positive.')
+        self.precision = float(precision)
+        self.blocksize = int(blocksize)
+        self.level = level
+
+    def encode(self, frames):
+        """
+        Compress an array of frames into a bytes object.
+
+        Parameters
+        ----------
+        frames : array (nframes, natoms, 3)
+            The trajectory values to compress.
+
+        Returns
+        -------
+        data : bytes
+            The compressed trajectory.
+
+        """
+        frames = np.asarray(frames, dtype=float)
+        nframes, natoms = frames.shape[:2]
+        quanta = np.rint(frames / self.precision).astype(np.int64)
+        data = [HEADER.pack(MAGIC, self.precision, nframes, natoms,
+                            self.blocksize)]
+        for start in range(0, nframes, self.blocksize):
+            block = quanta[start:start+self.blocksize]
+            # The key frame and the deltas are packed separately, so that the
+            # integer type of the deltas does not depend on the key frame.
+            key = block[0]
+            deltas = np.diff(block, axis=0)
+            ktype = self._itype(key, INTEGERS[2:])
+            itype = self._itype(deltas)
+            raw = self._shuffle(key, ktype) + self._shuffle(deltas, itype)
+            payload = zlib.compress(raw, self.level)
+            data.append(BLOCK.pack(ktype.itemsize, itype.itemsize,
+                                   len(payload)))
+            data.append(payload)
+        return b''.join(data)
+
+    def decode(self, data, dtype=float, rows=None):
+        """
+        Decompress a bytes object into an array of frames.
+
+        Parameters
+        ----------
+        data : bytes
+            The compressed trajectory.
+        dtype : numpy dtype, optional
+            The floating point type of the decoded array.
+            The default is float.
+        rows : array, optional
+            The indexes of the atoms to decode. Each block is decompressed
+            entirely, but only the values of these atoms are reconstructed.
+            If None, all the atoms are decoded. The default is None.
+
+        Raises
+        ------
+        ValueError
+            If data is not a trajectory compressed with a UMDCodec.
+
+        Returns
+        -------
+        frames : array (nframes, nrows, 3)
+            The decoded trajectory values.
+
+        """
+        magic, precision, nframes, natoms, blocksize = \
+            HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError('invalid data: it is not a UMDCodec stream.')
+        rows = np.arange(natoms) if rows is None else np.asarray(rows)
+        frames = np.empty((nframes, len(rows), 3), dtype=dtype)
+        offset = HEADER.size
+        for start in range(0, nframes, blocksize):
+            nblock = min(blocksize, nframes-start)
+            keysize, itemsize, length = BLOCK.unpack_from(data, offset)
+            offset += BLOCK.size
+            raw = zlib.decompress(data[offset:offset+length])
+            offset += length
+            raw = np.frombuffer(raw, dtype=np.uint8)
+            split = keysize*natoms*3
+            quanta = np.empty((nblock, len(rows), 3), dtype=np.int64)
+            quanta[0] = self._unshuffle(raw[:split], keysize, 1, natoms,
+                                        rows)
+            quanta[1:] = self._unshuffle(raw[split:], itemsize, nblock-1,
+                                         natoms, rows)
+            np.cumsum(quanta, axis=0, out=quanta)
+            frames[start:start+nblock] = quanta * precision
+        return frames
+
+    def save(self, outfile, dynamics):
+        """
+        Print the dynamics of a trajectory on a binary output stream.
+
+        The positions and the forces are compressed, while the velocities are
+        not stored since they are not available from the Vasp OUTCAR file.
+
+        Parameters
+        ----------
+        outfile : binary output stream
+            The output stream where to print the compressed dynamics.
+        dynamics : list or UMDTrajectoryArrays
+            The list of UMDSnapDynamics objects to compress, or the
+            UMDTrajectoryArrays object whose arrays are compressed directly.
+
+        Returns
+        -------
+        None.
+
+        """
+        if isinstance(dynamics, UMDTrajectoryArrays):
+            time = np.asarray(dynamics.time, dtype=float)
+            position = self.encode(dynamics.position)
+            force = self.encode(dynamics.force)
+        else:
+            time = np.array([snap.time for snap in dynamics], dtype=float)
+            position = self.encode([snap.position for snap in dynamics])
+            force = self.encode([snap.force for snap in dynamics])
+        outfile.write(STREAM.pack(MAGIC, VERSION, len(dynamics),
+                                  len(position), len(force)))
+        outfile.write(time.tobytes())
+        outfile.write(position)
+        outfile.write(force)
+
+    def load(self, infile, dtype=float, rows=None):
+        """
+        Read a list of UMDSnapDynamics from a binary input stream.
+
+        Parameters
+        ----------
+        infile : binary input stream
+            The input stream with the compressed dynamics.
+        dtype : numpy dtype, optional
+            The floating point type of the dynamics arrays.
+            The default is float.
+        rows : array, optional
+            The indexes of the atoms to load, e.g. the ones of some species
+            as given by the species_UMDLattice function. If None, all the
+            atoms are loaded. The default is None.
+
+        Raises
+        ------
+        ValueError
+            If the stream was not written by the save function of this
+            format version.
+
+        Returns
+        -------
+        dynamics : list
+            The list of the decompressed UMDSnapDynamics objects.
+
+        """
+        magic, version, nframes, npos, nforce = \
+            STREAM.unpack(infile.read(STREAM.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('invalid stream: it is not a UMDCodec stream '
+                             + 'of version {}.'.format(VERSION))
+        time = np.frombuffer(infile.read(8*nframes), dtype=float)
+        position = self.decode(infile.read(npos), dtype, rows)
+        force = self.decode(infile.read(nforce), dtype, rows)
+        velocity = np.zeros(position.shape[1:], dtype=dtype)
+        velocity.setflags(write=False)
+        dynamics = [UMDSnapDynamics(time[i], position[i], velocity, force[i])
+                    for i in range(nframes)]
+        return dynamics
+
+    @staticmethod
+    def _itype(values, itypes=INTEGERS):
+        """
+        Get the smallest integer type, among itypes, able to store the values.
+
+        """
+        limit = np.max(np.abs(values), initial=0)
+        for itype in itypes:
+            if limit <= np.iinfo(itype).max:
+                return itype
+        return itypes[-1]
+
+    @staticmethod
+    def _shuffle(values, itype):
+        """
+        Pack the values into bytes of the integer type itype.
+
+        The bytes of the integers are shuffled, so that the most significant
+        (and mostly null) bytes are grouped together.
+
+        """
+        raw = values.astype(itype).view(np.uint8)
+        raw = raw.reshape(-1, itype.itemsize).T.tobytes()
+        return raw
+
+    @staticmethod
+    def _unshuffle(raw, itemsize, nframes, natoms, rows):
+        """
+        Unpack the rows of nframes frames from the bytes of the _shuffle
+        function.
+
+        """
+        itype = np.dtype('<i{}'.format(itemsize))
+        raw = raw.reshape(itemsize, nframes, natoms, 3)[:, :, rows]
+        raw = np.ascontiguousarray(np.moveaxis(raw, 0, -1))
+        values = raw.view(itype).reshape(nframes, len(rows), 3)
+        return values
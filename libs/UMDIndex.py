@@ -0,0 +1,155 @@
+"""
+===============================================================================
+                                   UMDIndex
+===============================================================================
+
+This module provides the UMDIndex class useful to locate the snapshots in a
+UMD file. A UMDIndex object stores the byte offset of the beginning of each
+snapshot section, so that any snapshot can be read with a single seek on the
+UMD file instead of scrolling all the previous snapshots.
+
+Classes
+-------
+    UMDIndex
+
+See Also
+--------
+    load_UMDIndex
+    UMDSnapshot
+
+"""
+
+
+import numpy as np
+
+
+class UMDIndex:
+    """
+    UMDIndex class to store the position of the snapshots in a UMD file.
+
+    Parameters
+    ----------
+    snaps : array
+        The indexes of the snapshots in the UMD file, in increasing order.
+    offsets : array
+        The byte offsets of the snapshot sections in the UMD file.
+
+    Methods
+    -------
+    __eq__
+        Compare two UMDIndex objects.
+    __len__
+        Get the number of snapshots indexed.
+    offset
+        Get the byte offset of a snapshot in the UMD file.
+    save
+        Print the UMDIndex on a binary output stream.
+
+    """
+
+    def __init__(self, snaps=[], offsets=[]):
+        """
+        Construct a UMDIndex object.
+
+        Parameters
+        ----------
+        snaps : array, optional
+            The indexes of the snapshots in the UMD file.
+            The default is [].
+        offsets : array, optional
+            The byte offsets of the snapshot sections in the UMD file.
+            The default is [].
+
+        Raises
+        ------
+        ValueError
+            If snaps and offsets have different lengths.
+
+        Returns
+        -------
+        UMDIndex object.
+
+        """
+        self.snaps = np.array(snaps, dtype=np.int64)
+        self.offsets = np.array(offsets, dtype=np.int64)
+        if len(self.snaps) != len(self.offsets):
+            raise ValueError('snaps and offsets must have the same length.')
+        # When the snapshots are numbered contiguously, their offsets are
+        # directly addressed without any search.
+        self.contiguous = (len(self.snaps) == 0 or
+                           self.snaps[-1]-self.snaps[0] == len(self.snaps)-1)
+
+    def __eq__(self, other):
+        """
+        Compare two UMDIndex objects.
+
+        Parameters
+        ----------
+        other : UMDIndex
+            The second term of the comparison.
+
+        Returns
+        -------
+        equal : bool
+            It returns True if the two indexes are identical, otherwise False.
+
+        """
+        equal = isinstance(other, UMDIndex)
+        equal = equal and np.array_equal(self.snaps, other.snaps)
+        equal = equal and np.array_equal(self.offsets, other.offsets)
+        return bool(equal)
+
+    def __len__(self):
+        """
+        Get the number of snapshots indexed.
+
+        Returns
+        -------
+        length : int
+            The number of snapshots indexed.
+
+        """
+        length = len(self.snaps)
+        return length
+
+    def offset(self, snap):
+        """
+        Get the byte offset of a snapshot in the UMD file.
+
+        Parameters
+        ----------
+        snap : int
+            The index of the snapshot.
+
+        Returns
+        -------
+        offset : int
+            The byte offset of the snapshot section. If the snapshot is not
+            in the UMD file, then None is returned.
+
+        """
+        if len(self.snaps) == 0:
+            return None
+        if self.contiguous:
+            i = snap - self.snaps[0]
+        else:
+            i = np.searchsorted(self.snaps, snap)
+        if 0 <= i < len(self.snaps) and self.snaps[i] == snap:
+            return int(self.offsets[i])
+        return None
+
+    def save(self, outfile):
+        """
+        Print the UMDIndex on a binary output stream.
+
+        Parameters
+        ----------
+        outfile : binary output stream
+            The output stream where to print the UMDIndex.
+
+        Returns
+        -------
+        None.
+
+        """
+        np.save(outfile, np.stack((self.snaps, self.offsets), axis=-1))
@@ -19,11 +19,92 @@ See Also
 
 import numpy as np
 import itertools as it
+import functools as ft
+from types import MappingProxyType
 
 
 DEFAULT_basis = np.identity(3, dtype=float)
 
 
+@ft.lru_cache(maxsize=64)
+def _basis_tables(key):
+    """
+    Get the read-only basis tables of a lattice basis.
+
+    Parameters
+    ----------
+    key : tuple
+        The dtype string, the shape and the bytes of the basis matrix.
+
+    Returns
+    -------
+    tables : tuple
+        The direct, inverse and reciprocal basis matrices, the volume of the
+        unit cell and the cartesian shifts of the neighbouring images to be
+        checked by the minimum image convention. The lattices with the same
+        basis share the same arrays, so the linear algebra is done only once
+        per basis.
+
+    """
+    dtype, shape, data = key
+    dirBasis = np.frombuffer(data, dtype=dtype).reshape(shape).copy()
+    invBasis = np.linalg.inv(dirBasis)
+    recBasis = 2*np.pi*invBasis.T
+    volume = np.cross(dirBasis[0], dirBasis[1])
+    volume = abs(np.dot(volume, dirBasis[2]))
+    # The minimum image is searched with the shortest lattice vectors, so
+    # that it is among the 26 neighbouring images of the nearest image in
+    # their reduced coordinates. If they are orthogonal, the nearest image is
+    # already the minimum image.
+    minBasis = _reduced_basis(dirBasis)
+    minInverse = np.linalg.inv(minBasis)
+    metric = minBasis @ minBasis.T
+    if np.allclose(metric, np.diag(np.diag(metric))):
+        images = np.zeros((0, 3), dtype=float)
+    else:
+        shifts = np.array(list(it.product((-1, 0, 1), repeat=3)), dtype=float)
+        images = np.delete(shifts, 13, axis=0) @ minBasis
+    for array in (dirBasis, invBasis, recBasis, minBasis, minInverse, images):
+        array.setflags(write=False)
+    return dirBasis, invBasis, recBasis, volume, minBasis, minInverse, images
+
+
+def _reduced_basis(basis):
+    """
+    Get the reduced basis of the lattice, made of short lattice vectors.
+
+    Each lattice vector is shortened subtracting the closest lattice vector of
+    the plane of the other two, till no vector can be shortened anymore.
+
+    Parameters
+    ----------
+    basis : array (3,3)
+        The matrix of the lattice vectors.
+
+    Returns
+    -------
+    reduced : array (3,3)
+        The matrix of the reduced lattice vectors, generating the same
+        lattice.
+
+    """
+    reduced = np.array(basis, dtype=float)
+    steps = np.array(list(it.product((-1, 0, 1), repeat=2)), dtype=float)
+    for _ in range(100):
+        changed = False
+        for i in range(3):
+            plane = np.delete(reduced, i, axis=0)
+            coeffs = np.linalg.lstsq(plane.T, reduced[i], rcond=None)[0]
+            candidates = reduced[i] - (np.rint(coeffs) + steps) @ plane
+            norms = np.einsum('ij,ij->i', candidates, candidates)
+            if norms.min() < reduced[i] @ reduced[i] - 1e-12*norms.min():
+                reduced[i] = candidates[np.argmin(norms)]
+                changed = True
+        if not changed:
+            break
+    return reduced
+
+
 class UMDLattice:
     """
     UMDLattice class to represent a braivais crystal lattice.
@@ -31,6 +112,9 @@ class UMDLattice:
     The UMDLattice objects are defined by three 3-dim lattice vectors defining
     the lattice unit cell and the periodic structure, but also by a set of
     atoms populating the cell.
+    The UMDLattice objects are immutable and hashable: the derived quantities
+    are computed once at construction and the same lattice can be shared by
+    reference among all the snapshots of a simulation.
 
     Parameters
     ----------
@@ -44,11 +128,37 @@ class UMDLattice:
         A dictionary made of atomic species coupled with their respective
         number of copies present into the unit cell. Typically the single item
         has the structure {UMDAtom: number_of_atoms}.
+    dirBasis : array (3,3)
+        The matrix of the lattice vectors.
+    invBasis : array (3,3)
+        The inverse of the matrix of the lattice vectors.
+    recBasis : array (3,3)
+        The matrix of the reciprocal lattice vectors, such that the product
+        of the i-th lattice vector and the j-th reciprocal lattice vector is
+        2*pi if i == j, otherwise 0.
+    species : tuple
+        The atomic species in the unit cell, in the order of the atoms.
+    counts : array (nspecies,)
+        The number of atoms of each species.
+    offsets : array (nspecies+1,)
+        The index of the first atom of each species, followed by the total
+        number of atoms. It can be used with np.add.reduceat.
+    types : array (natoms,)
+        The species index of each atom.
+    masses : array (natoms,)
+        The mass of each atom.
+    valences : array (natoms,)
+        The valence of each atom.
+    pairs : array (nspecies**2, 2)
+        The species indexes of all the ordered pairs of species, in the same
+        order of the bonds function.
 
     Methods
     -------
     __eq__
         Compare two UMDLattice objects.
+    __hash__
+        Get the hash value of the UMDLattice object.
     __str__
         Convert a UMDLattice objects into a string.
     save
@@ -65,6 +175,17 @@ class UMDLattice:
         Convert 3-dim vectors from reduced to cartesian coordinates.
     reduced
         Convert 3-dim vectors from cartesian to reduced coordinates.
+    bonds
+        Get all the ordered pairs of atomic species in the unit cell.
+    atomslice
+        Get the slice of the atoms of a species in the unit cell.
+    wrap
+        Wrap cartesian positions into the unit cell.
+    minimage
+        Get the minimum image of cartesian displacement vectors.
+    periodic
+        Wrap displacement vectors to their nearest image in reduced
+        coordinates.
 
     """
 
@@ -94,9 +215,75 @@ class UMDLattice:
 
         """
         self.name = name
-        self.atoms = atoms
-        self.dirBasis = np.copy(basis)
-        self.invBasis = np.copy(np.linalg.inv(basis))
+        self.atoms = MappingProxyType(dict(atoms))
+        basis = np.asarray(basis)
+        tables = _basis_tables((basis.dtype.str, basis.shape, basis.tobytes()))
+        self.dirBasis, self.invBasis, self.recBasis = tables[:3]
+        self._volume, self._minBasis, self._minInverse = tables[3:6]
+        self._images = tables[6]
+        # The composition is frozen at construction, so the species tables
+        # are computed once and the per-atom queries are simple lookups.
+        self.species = tuple(self.atoms.keys())
+        self.counts = np.array(list(self.atoms.values()), dtype=int)
+        self.offsets = np.concatenate(([0], np.cumsum(self.counts)))
+        self.types = np.repeat(np.arange(len(self.species)), self.counts)
+        # The species not given as UMDAtom objects have the UMDAtom default
+        # null mass and valence.
+        masses = [getattr(atom, 'mass', 0.0) for atom in self.species]
+        valences = [getattr(atom, 'valence', 0) for atom in self.species]
+        self.masses = np.array(masses, dtype=float)[self.types]
+        self.valences = np.array(valences, dtype=float)[self.types]
+        self.pairs = np.array(list(it.product(range(len(self.species)),
+                                              repeat=2)),
+                              dtype=int).reshape(-1, 2)
+        for array in (self.counts, self.offsets, self.types, self.masses,
+                      self.valences, self.pairs):
+            array.setflags(write=False)
+        self._natoms = int(self.offsets[-1])
+        self._mass = sum(n*m for n, m in zip(self.counts.tolist(), masses))
+        # The density of a degenerate cell is cached as it is, without the
+        # warnings that would be otherwise raised at each construction.
+        with np.errstate(over='ignore', divide='ignore', invalid='ignore'):
+            self._density = self._mass/self._volume
+        self._slices = {atom: slice(int(self.offsets[i]),
+                                    int(self.offsets[i+1]))
+                        for i, atom in enumerate(self.species)}
+        self._hash = hash((frozenset(self.atoms.items()),
+                           tuple(self.dirBasis.ravel().tolist())))
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        """
+        Forbid the modification of a constructed UMDLattice object.
+
+        Raises
+        ------
+        AttributeError
+            If the UMDLattice object is already constructed.
+
+        """
+        if '_frozen' in self.__dict__:
+            raise(AttributeError('UMDLattice object is immutable.'))
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        """
+        Forbid the modification of a constructed UMDLattice object.
+
+        Raises
+        ------
+        AttributeError
+            Always, since UMDLattice objects are immutable.
+
+        """
+        raise(AttributeError('UMDLattice object is immutable.'))
+
+    def __reduce__(self):
+        """
+        Get the arguments to rebuild the UMDLattice object when pickled.
+
+        """
+        return (UMDLattice, (self.name, self.dirBasis, dict(self.atoms)))
 
     def __eq__(self, other):
         """
@@ -120,6 +307,20 @@ class UMDLattice:
         equal *= np.array_equal(self.invBasis, other.invBasis, True)
         return equal
 
+    def __hash__(self):
+        """
+        Get the hash value of the UMDLattice object. As for the comparison,
+        the lattice name is not considered.
+
+        Returns
+        -------
+        hash_lattice : int
+            The hash value of the object.
+
+        """
+        hash_lattice = self._hash
+        return hash_lattice
+
     def __str__(self):
         """
         Convert a UMDLattice objects into a string.
@@ -167,7 +368,7 @@ class UMDLattice:
             The total number of atoms in the unit cell.
 
         """
-        natoms = sum(self.atoms.values())
+        natoms = self._natoms
         return natoms
 
     def mass(self):
@@ -180,9 +381,7 @@ class UMDLattice:
             The unit cell total mass.
 
         """
-        mass = 0
-        for atom, n in self.atoms.items():
-            mass += n*atom.mass
+        mass = self._mass
         return mass
 
     def volume(self):
@@ -195,8 +394,7 @@ class UMDLattice:
             The unit cell volume.
 
         """
-        volume = np.cross(self.dirBasis[0], self.dirBasis[1])
-        volume = abs(np.dot(volume, self.dirBasis[2]))
+        volume = self._volume
         return volume
 
     def density(self):
@@ -209,7 +407,7 @@ class UMDLattice:
             The unit cell mass.
 
         """
-        density = self.mass()/self.volume()
+        density = self._density
         return density
 
     def reduced(self, cartesian):
@@ -249,21 +447,155 @@ class UMDLattice:
         return cartesian
 
     def bonds(self):
-        bonds = list(it.product(self.atoms.keys(), repeat=2))
+        """
+        Get all the ordered pairs of atomic species in the unit cell.
+
+        Returns
+        -------
+        bonds : list
+            The list of the (UMDAtom, UMDAtom) pairs, in the same order of
+            the pairs array of species indexes.
+
+        """
+        bonds = [(self.species[i], self.species[j]) for i, j in self.pairs]
         return bonds
-    
+
     def atomslice(self, atom):
-        offset = 0
-        for at,n in self.atoms.items():
-            if at == atom:
-                return slice(offset, offset+n)
-            offset += n
+        """
+        Get the slice of the atoms of a species in the unit cell.
+
+        Parameters
+        ----------
+        atom : UMDAtom
+            The atomic species.
+
+        Returns
+        -------
+        atomslice : slice
+            The slice of the atoms indexes of the species. If the species is
+            not in the unit cell, then None is returned.
+
+        """
+        atomslice = self._slices.get(atom)
+        return atomslice
+
+    def wrap(self, positions, out=None):
+        """
+        Wrap cartesian positions into the unit cell.
+
+        The positions are shifted by lattice vectors so that their reduced
+        coordinates are in [0, 1). Any batch of vectors, like the positions
+        of a whole trajectory (nsnaps, natoms, 3), is wrapped at once.
+
+        Parameters
+        ----------
+        positions : array (..., 3)
+            An array of 3-dim vectors in cartesian coordinates.
+        out : array (..., 3), optional
+            The array where to store the result. It can be positions itself,
+            to wrap them in place. If None, a new array is allocated.
+            The default is None.
+
+        Returns
+        -------
+        out : array (..., 3)
+            The positions wrapped into the unit cell. If out is not given, it
+            has the same floating point type of positions.
+
+        """
+        positions = np.asarray(positions)
+        reduced = np.matmul(positions, self.invBasis)
+        if out is None:
+            dtype = np.result_type(positions, np.float32)
+            out = np.empty(reduced.shape, dtype=dtype)
+        np.floor(reduced, out=out)
+        np.subtract(reduced, out, out=reduced)
+        np.matmul(reduced, self.dirBasis, out=out)
+        return out
+
+    def minimage(self, variations, out=None):
+        """
+        Get the minimum image of cartesian displacement vectors.
+
+        The vectors are first wrapped to their nearest image in the reduced
+        coordinates of the shortest lattice vectors, which is the minimum
+        image for cells with orthogonal lattice vectors. For triclinic cells,
+        the 26 neighbouring images are checked too, through the cartesian
+        shifts precomputed for the lattice basis, and the shortest one is
+        taken. Any batch of vectors, like the
+        distances of all the pairs of atoms in many snapshots
+        (nsnaps, npairs, 3), is processed at once.
+
+        Parameters
+        ----------
+        variations : array (..., 3)
+            An array of 3-dim displacement vectors in cartesian coordinates.
+        out : array (..., 3), optional
+            The array where to store the result. It can be variations itself,
+            to work in place. If None, a new array is allocated.
+            The default is None.
+
+        Returns
+        -------
+        out : array (..., 3)
+            The minimum image of the displacement vectors. If out is not
+            given, it has the same floating point type of variations.
+
+        """
+        variations = np.asarray(variations)
+        reduced = np.matmul(variations, self._minInverse)
+        if out is None:
+            dtype = np.result_type(variations, np.float32)
+            out = np.empty(reduced.shape, dtype=dtype)
+        np.rint(reduced, out=out)
+        np.subtract(reduced, out, out=reduced)
+        np.matmul(reduced, self._minBasis, out=out)
+        if len(self._images):
+            # The nearest image is kept in the array of the reduced vectors,
+            # while its neighbouring images are compared in turn.
+            nearest = reduced
+            nearest[...] = out
+            candidate = np.empty_like(nearest)
+            norm = np.einsum('...i,...i->...', nearest, nearest)
+            cnorm = np.empty_like(norm)
+            for image in self._images:
+                np.add(nearest, image, out=candidate)
+                np.einsum('...i,...i->...', candidate, candidate, out=cnorm)
+                closer = cnorm < norm
+                np.copyto(out, candidate, where=closer[..., None])
+                np.minimum(norm, cnorm, out=norm)
+        return out
 
     def periodic(self, variation, cartesian=True):
+        """
+        Apply the periodic boundary conditions to displacement vectors.
+
+        Each reduced coordinate greater than 0.5 (lower than -0.5) is shifted
+        by a single -1 (+1). So the vectors with reduced coordinates in
+        [-1.5, 1.5], like the displacements between two positions in the unit
+        cell, are wrapped to their nearest image in reduced coordinates, with
+        the ties at +-0.5 left unchanged. This is the minimum image only for
+        cells with orthogonal lattice vectors, while the minimage function
+        gives it for any cell and any displacement.
+
+        Parameters
+        ----------
+        variation : array (..., 3)
+            An array of 3-dim displacement vectors.
+        cartesian : bool, optional
+            If True, the vectors are in cartesian coordinates, otherwise they
+            are in reduced coordinates. The default is True.
+
+        Returns
+        -------
+        variation : array (..., 3)
+            The displacement vectors with the periodic boundary conditions.
+
+        """
         if cartesian:
             variation = self.reduced(variation)
         variation = np.where(variation > +0.5, variation-1, variation)
         variation = np.where(variation < -0.5, variation+1, variation)
         if cartesian:
             variation = self.cartesian(variation)
-        return variation
\ No newline at end of file
+        return variation
@@ -0,0 +1,321 @@
+"""
+===============================================================================
+                              UMDPairDistribution
+===============================================================================
+
+This module provides the UMDPairDistribution class to compute the radial pair
+distribution functions g(r) of all the pairs of atomic species of a lattice.
+The pairs of atoms closer than the cutoff radius are searched with cell lists,
+so that the cost of each snapshot scales linearly with the number of atoms.
+The unit cell is split into a grid of cells, whose width perpendicular to the
+lattice planes is at least the cutoff radius, and the atoms are sorted by
+their cell. Then the neighbours of each atom are searched only among the
+atoms of its own cell and of half of the 26 cells around it, for all the
+atoms at once with numpy operations, so that each pair is found only once.
+The distances of all the species pairs are histogrammed in a single
+np.bincount call, so that all the partial g(r) are computed in a single
+neighbour search.
+
+Classes
+-------
+    UMDPairDistribution
+
+Functions
+---------
+    cell_pairs
+
+See Also
+--------
+    UMDLattice
+
+"""
+
+
+import numpy as np
+import itertools as it
+
+
+# The offsets of the neighbour cells of a half shell: the other half is
+# obtained swapping the two atoms of each pair.
+OFFSETS = np.array(list(it.product((-1, 0, 1), repeat=3))[13:], dtype=int)
+
+
+def cell_pairs(lattice, position, rcut):
+    """
+    Get all the pairs of atoms closer than a cutoff radius.
+
+    The pairs are searched with cell lists, the periodic images of the atoms
+    included. Each pair is found only once, either as (i, j) or as (j, i).
+    If the cutoff radius is longer than half the spacing of the lattice
+    planes, the same pair of atoms can be found more than once, through
+    different periodic images.
+
+    Parameters
+    ----------
+    lattice : UMDLattice
+        The lattice of the snapshot.
+    position : array (natoms, 3)
+        The atoms positions in cartesian coordinates.
+    rcut : float
+        The cutoff radius. It cannot be longer than the spacing of the
+        lattice planes.
+
+    Raises
+    ------
+    ValueError
+        If the cutoff radius is not positive or it is longer than the spacing
+        of the lattice planes.
+
+    Returns
+    -------
+    first : array (npairs,)
+        The index of the first atom of each pair.
+    second : array (npairs,)
+        The index of the second atom of each pair.
+    distance : array (npairs,)
+        The distance between the atoms of each pair.
+
+    """
+    # The spacing of the lattice planes parallel to two lattice vectors is
+    # the inverse of the norm of the third reciprocal vector over 2*pi.
+    spacing = 1/np.linalg.norm(lattice.invBasis, axis=0)
+    if not 0 < rcut <= spacing.min():
+        raise(ValueError('invalid rcut value: it must be positive and '
+                         + 'not longer than the lattice planes spacing.'))
+    ncells = np.maximum(np.floor(spacing/rcut).astype(int), 1)
+    reduced = np.matmul(position, lattice.invBasis, dtype=float)
+    reduced -= np.floor(reduced)
+    cells = np.minimum((reduced*ncells).astype(int), ncells-1)
+    # The atoms are sorted by cell, so that the atoms of each cell are in the
+    # range starts[cell]:starts[cell+1] of the order array.
+    flat = np.ravel_multi_index(cells.T, ncells)
+    order = np.argsort(flat, kind='stable')
+    counts = np.bincount(flat, minlength=np.prod(ncells))
+    starts = np.concatenate(([0], np.cumsum(counts)))
+
+    first, second, distance = [], [], []
+    for offset in OFFSETS:
+        # The neighbour cell of each atom and the lattice shift of its atoms
+        # images, if the neighbour cell is across a face of the unit cell.
+        neighbour = cells + offset
+        shift = np.floor_divide(neighbour, ncells)
+        neighbour = np.ravel_multi_index((neighbour - shift*ncells).T, ncells)
+        sizes = counts[neighbour]
+        i = np.repeat(np.arange(len(reduced)), sizes)
+        ranks = np.arange(len(i)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        j = order[starts[neighbour][i] + ranks]
+        variation = reduced[j] - reduced[i] + shift[i]
+        variation = variation @ lattice.dirBasis
+        r = np.sqrt(np.einsum('ij,ij->i', variation, variation))
+        close = r < rcut
+        if not offset.any():
+            close &= i < j
+        first.append(i[close])
+        second.append(j[close])
+        distance.append(r[close])
+    first = np.concatenate(first)
+    second = np.concatenate(second)
+    distance = np.concatenate(distance)
+    return first, second, distance
+
+
+class UMDPairDistribution:
+    """
+    UMDPairDistribution class to accumulate the radial pair distribution
+    functions of a trajectory.
+
+    The pairs distances of the snapshots are accumulated into integer
+    histograms, one for each ordered pair of species of the lattice, in the
+    same order of the UMDLattice.bonds function. The histograms of
+    UMDPairDistribution objects of the same lattice can be merged, so that
+    the snapshots of a trajectory can be processed separately.
+
+    Parameters
+    ----------
+    lattice : UMDLattice
+        The lattice of the snapshots.
+    rmax : float
+        The cutoff radius of the distribution functions.
+    nbins : int
+        The number of bins of the histograms in [0, rmax).
+    histogram : array (npairs, nbins)
+        The number of pairs of atoms of each pair of species found in each
+        bin, summed over the snapshots.
+    nsnaps : int
+        The number of snapshots accumulated.
+
+    Methods
+    -------
+    reset
+        Reset the histograms.
+    add
+        Accumulate the pairs distances of a snapshot.
+    merge
+        Merge the histograms of another UMDPairDistribution object.
+    radii
+        Get the central radius of each bin.
+    rdf
+        Get the radial pair distribution functions.
+
+    """
+
+    def __init__(self, lattice, rmax, nbins=200):
+        """
+        Construct a UMDPairDistribution object.
+
+        Parameters
+        ----------
+        lattice : UMDLattice
+            The lattice of the snapshots.
+        rmax : float
+            The cutoff radius of the distribution functions. It cannot be
+            longer than the spacing of the lattice planes.
+        nbins : int, optional
+            The number of bins of the histograms. The default is 200.
+
+        Raises
+        ------
+        ValueError
+            If rmax is not positive or it is longer than the spacing of the
+            lattice planes.
+
+        Returns
+        -------
+        UMDPairDistribution object.
+
+        """
+        spacing = 1/np.linalg.norm(lattice.invBasis, axis=0)
+        if not 0 < rmax <= spacing.min():
+            raise(ValueError('invalid rmax value: it must be positive and '
+                             + 'not longer than the lattice planes spacing.'))
+        self.lattice = lattice
+        self.rmax = float(rmax)
+        self.nbins = int(nbins)
+        self.histogram = np.zeros((len(lattice.pairs), self.nbins),
+                                  dtype=np.int64)
+        self.nsnaps = 0
+
+    def reset(self):
+        """
+        Reset the histograms.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.histogram.fill(0)
+        self.nsnaps = 0
+
+    def add(self, position, neighbours=None):
+        """
+        Accumulate the pairs distances of a snapshot.
+
+        Parameters
+        ----------
+        position : array (natoms, 3)
+            The atoms positions in cartesian coordinates.
+        neighbours : UMDVerletList, optional
+            The Verlet list of the trajectory, with cutoff radius not shorter
+            than rmax, from which the pairs are taken. If None, the pairs are
+            searched with cell lists in each snapshot. The default is None.
+
+        Raises
+        ------
+        ValueError
+            If the cutoff radius of the Verlet list is shorter than rmax.
+
+        Returns
+        -------
+        None.
+
+        """
+        if neighbours is not None and neighbours.rcut < self.rmax:
+            raise(ValueError('invalid neighbours: the Verlet list cutoff '
+                             + 'radius is shorter than rmax.'))
+        if neighbours is None:
+            first, second, distance = cell_pairs(self.lattice, position,
+                                                 self.rmax)
+        else:
+            first, second, distance = neighbours.pairs(position)
+            close = distance < self.rmax
+            first, second = first[close], second[close]
+            distance = distance[close]
+        # The pair of species of each pair of atoms is the row of the
+        # histogram, with the same order of the lattice pairs array. Each
+        # pair is counted for both the orders of its atoms.
+        types = self.lattice.types
+        nspecies = len(self.lattice.species)
+        bins = np.minimum((distance*(self.nbins/self.rmax)).astype(int),
+                          self.nbins-1)
+        bins = np.concatenate(
+            (bins + (types[first]*nspecies + types[second])*self.nbins,
+             bins + (types[second]*nspecies + types[first])*self.nbins))
+        counts = np.bincount(bins, minlength=self.histogram.size)
+        self.histogram += counts.reshape(self.histogram.shape)
+        self.nsnaps += 1
+
+    def merge(self, other):
+        """
+        Merge the histograms of another UMDPairDistribution object.
+
+        Parameters
+        ----------
+        other : UMDPairDistribution
+            The pair distribution of other snapshots of the same lattice,
+            with the same rmax and nbins.
+
+        Raises
+        ------
+        ValueError
+            If the two pair distributions are not compatible.
+
+        Returns
+        -------
+        None.
+
+        """
+        if (self.lattice != other.lattice or self.rmax != other.rmax
+                or self.nbins != other.nbins):
+            raise(ValueError('incompatible UMDPairDistribution objects.'))
+        self.histogram += other.histogram
+        self.nsnaps += other.nsnaps
+
+    def radii(self):
+        """
+        Get the central radius of each bin.
+
+        Returns
+        -------
+        radii : array (nbins,)
+            The central radius of each bin.
+
+        """
+        radii = (np.arange(self.nbins) + 0.5)*(self.rmax/self.nbins)
+        return radii
+
+    def rdf(self):
+        """
+        Get the radial pair distribution functions.
+
+        The number of pairs in each bin is normalized by the number expected
+        for an ideal gas of the same density, that is the number of pairs of
+        distinct atoms of the two species over the volume of the unit cell,
+        times the volume of the spherical shell of the bin.
+
+        Returns
+        -------
+        rdf : array (npairs, nbins)
+            The radial pair distribution function of each pair of species,
+            in the same order of the UMDLattice.bonds function.
+
+        """
+        counts = self.lattice.counts
+        first, second = self.lattice.pairs.T
+        npairs = counts[first]*(counts[second] - (first == second))
+        edges = np.linspace(0, self.rmax, self.nbins+1)
+        shells = 4/3*np.pi*np.diff(edges**3)
+        ideal = np.outer(npairs/self.lattice.volume(), shells)*self.nsnaps
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rdf = np.where(ideal > 0, self.histogram/ideal, 0.)
+        return rdf
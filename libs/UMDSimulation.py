@@ -269,5 +269,6 @@ class UMDSimulation:
 
                 assert cycle == len(runs)
                 assert steps == simulation.steps()
-                assert time == simulation.time()
+                # The total time is printed with three decimal digits.
+                assert abs(time - simulation.time()) < 1e-3
                 return simulation
@@ -18,9 +18,15 @@ See Also
 """
 
 
+import hashlib
 import numpy as np
 
 
+COLUMNS = np.array(['Position_x', 'Position_y', 'Position_z',
+                    'Velocity_x', 'Velocity_y', 'Velocity_z',
+                    'Force_x', 'Force_y', 'Force_z'])
+
+
 class UMDSnapDynamics:
     """
     UMDSnapDynamics class to collect the thermodynamics quantities of each atom
@@ -43,8 +49,12 @@ class UMDSnapDynamics:
         Compare two UMDSnapDynamics objects.
     __str__
         Convert a UMDSnapDynamics objects into a string.
+    format
+        Convert a UMDSnapDynamics objects into a string without null columns.
     save
         Print the UMDSnapDynamics information on an output stream.
+    fingerprint
+        Get a fingerprint of the atoms positions.
 
     """
 
@@ -109,13 +119,58 @@ class UMDSnapDynamics:
             Report of the atoms dynamical vectors.
 
         """
-        string = 'Dynamics: {:12.3f} fs\n'.format(self.time)
+        string = self.format(prune=False)
+        return string
+
+    def format(self, prune=True):
+        """
+        Convert a UMDSnapDynamics objects into a string without null columns.
+
+        The columns whose values are all zero (like the velocities, which are
+        not available from a Vasp OUTCAR file) are not printed. The columns
+        printed are recorded in the header by a mask of 9 digits, where 1
+        marks a printed column and 0 a skipped column.
+            Dynamics:        0.500 fs Columns: 111000111
+
+        Parameters
+        ----------
+        prune : bool, optional
+            If False, all the columns are printed and no mask is recorded.
+            The default is True.
+
+        Returns
+        -------
+        string : string
+            Report of the atoms dynamical vectors.
+
+        """
+        string = 'Dynamics: {:12.3f} fs'.format(self.time)
         dynamics = np.hstack((self.position, self.velocity, self.force))
-        string += '{:16}{:16}{:16}'.format('Position_x', 'Position_y',
-                                           'Position_z')
-        string += '{:16}{:16}{:16}'.format('Velocity_x', 'Velocity_y',
-                                           'Velocity_z')
-        string += '{:16}{:16}{:16}'.format('Force_x', 'Force_y', 'Force_z')
-        for atom in dynamics:
-            string += '\n ' + ' '.join(['{:15.8f}'.format(x) for x in atom])
+        mask = np.ones(len(COLUMNS), dtype=bool)
+        if prune:
+            mask = np.any(dynamics != 0, axis=0)
+            string += ' Columns: ' + ''.join(str(int(m)) for m in mask)
+            dynamics = dynamics[:, mask]
+        string += '\n' + ''.join(['{:16}'.format(x) for x in COLUMNS[mask]])
+        row = '\n ' + ' '.join(['{:15.8f}']*len(dynamics.T))
+        string += ''.join([row.format(*atom) for atom in dynamics.tolist()])
         return string
+
+    def fingerprint(self):
+        """
+        Get a fingerprint of the atoms positions.
+
+        The fingerprint is a 64-bit hash of the bytes of the position array,
+        so two snapshots have the same fingerprint only if their positions
+        are identical. It does not depend on the process computing it.
+
+        Returns
+        -------
+        fingerprint : int
+            The hash value of the atoms positions.
+
+        """
+        position = np.ascontiguousarray(self.position)
+        digest = hashlib.blake2b(position.tobytes(), digest_size=8).digest()
+        fingerprint = int.from_bytes(digest, 'little')
+        return fingerprint
@@ -55,6 +55,11 @@ class UMDSnapshot(UMDSnapThermodynamics, UMDSnapDynamics):
         Array of all the atoms velocities.
     force : array, optional
         Array of all the atoms forces.
+    dtype : numpy dtype
+        The floating point type of the dynamics arrays.
+    buffer : array (3, natoms, 3) or None
+        The preallocated position, velocity and force arrays, filled in place
+        by setDynamics. It is None if the snapshot does not reuse its arrays.
 
     Methods
     -------
@@ -71,7 +76,8 @@ class UMDSnapshot(UMDSnapThermodynamics, UMDSnapDynamics):
 
     """
 
-    def __init__(self, snap=-1, time=0.0, lattice=UMDLattice()):
+    def __init__(self, snap=-1, time=0.0, lattice=UMDLattice(), dtype=float,
+                 reuse=False):
         """
         Construct a UMDSnapshot object.
 
@@ -81,6 +87,16 @@ class UMDSnapshot(UMDSnapThermodynamics, UMDSnapDynamics):
             The snapshot index.
         lattice : UMDLattice
             The lattice informations.
+        dtype : numpy dtype, optional
+            The floating point type of the dynamics arrays. Using np.float32
+            halves the memory of the snapshot.
+            The default is float.
+        reuse : bool, optional
+            If True, the dynamics arrays are allocated once and setDynamics
+            fills them in place, so the snapshot can be loaded frame after
+            frame without allocating any array. The arrays are then valid
+            only till the next frame is loaded and they must be copied to be
+            kept. The default is False.
 
         Returns
         -------
@@ -90,6 +106,10 @@ class UMDSnapshot(UMDSnapThermodynamics, UMDSnapDynamics):
         self.snap = snap
         self.lattice = lattice
         self.natoms = lattice.natoms()
+        self.dtype = np.dtype(dtype)
+        self.buffer = None
+        if reuse:
+            self.buffer = np.zeros((3, self.natoms, 3), dtype=self.dtype)
         UMDSnapThermodynamics.__init__(self)
         UMDSnapDynamics.__init__(self, time)
 
@@ -154,6 +174,9 @@ class UMDSnapshot(UMDSnapThermodynamics, UMDSnapDynamics):
         """
         Initialize the dynamics parameters of the snapshot.
 
+        If the snapshot reuses its arrays, the vectors are copied into them
+        and no array is allocated.
+
         Parameters
         ----------
         time : float, optional
@@ -172,12 +195,27 @@ class UMDSnapshot(UMDSnapThermodynamics, UMDSnapDynamics):
         """
         if not time:
             time = self.time
+        if self.buffer is not None:
+            # The vectors are copied in the preallocated arrays, while the
+            # missing ones are reset to zero.
+            vectors = (position, velocity, force)
+            for vector, array in zip(vectors, self.buffer):
+                if len(vector) != self.natoms:
+                    array.fill(0)
+                elif not np.may_share_memory(vector, array):
+                    np.copyto(array, vector, casting='unsafe')
+            position, velocity, force = self.buffer
+            UMDSnapDynamics.__init__(self, time, position, velocity, force)
+            return
         if len(position) != self.natoms:
-            position = np.zeros((self.natoms, 3), dtype=float)
+            position = np.zeros((self.natoms, 3), dtype=self.dtype)
         if len(velocity) != self.natoms:
-            velocity = np.zeros((self.natoms, 3), dtype=float)
+            velocity = np.zeros((self.natoms, 3), dtype=self.dtype)
         if len(force) != self.natoms:
-            force = np.zeros((self.natoms, 3), dtype=float)
+            force = np.zeros((self.natoms, 3), dtype=self.dtype)
+        position = np.asarray(position, dtype=self.dtype)
+        velocity = np.asarray(velocity, dtype=self.dtype)
+        force = np.asarray(force, dtype=self.dtype)
         UMDSnapDynamics.__init__(self, time, position, velocity, force)
 
     def __eq__(self, other):
@@ -218,7 +256,7 @@ class UMDSnapshot(UMDSnapThermodynamics, UMDSnapDynamics):
         string += UMDSnapDynamics.__str__(self)
         return string
 
-    def save(self, outfile):
+    def save(self, outfile, prune=False):
         """
         Print the UMDSnapshot data in an output file.
 
@@ -226,13 +264,21 @@ class UMDSnapshot(UMDSnapThermodynamics, UMDSnapDynamics):
         ----------
         outfile : output file
             The output file where to print the UMDSnapshot.
+        prune : bool, optional
+            If True, the dynamics columns whose values are all zero are not
+            printed (see UMDSnapDynamics.format). The default is False.
 
         Returns
         -------
         None.
 
         """
-        string = UMDSnapshot.__str__(self)
+        if prune:
+            string  = "Snapshot: {:10}\n".format(self.snap)
+            string += UMDSnapThermodynamics.__str__(self) + '\n'
+            string += UMDSnapDynamics.format(self, prune=True)
+        else:
+            string = UMDSnapshot.__str__(self)
         outfile.write(string+'\n\n')
 
     def UMDSnapshot_from_outcar(self, outcar):
@@ -291,7 +337,7 @@ class UMDSnapshot(UMDSnapThermodynamics, UMDSnapDynamics):
                 "aborting loop EDIFF was not reached (unconverged)" in line):
                 return
 
-    def UMDSnapshot_from_umd(self, umd, index=-1):
+    def UMDSnapshot_from_umd(self, umd, index=-1, offsets=None, columns=None):
         """
         Initialize a UMDSnapshot object from a UMD file.
 
@@ -299,6 +345,9 @@ class UMDSnapshot(UMDSnapThermodynamics, UMDSnapDynamics):
         However, if index is given and positive, the function looks for the
         snapshot with the corresponding index. If the index is too large and
         does not correspond with any snapshot, then it returns None.
+        If the UMDIndex of the UMD file is given, the stream is moved directly
+        at the beginning of the snapshot section, without reading all the
+        previous snapshots.
 
         Parameters
         ----------
@@ -308,6 +357,14 @@ class UMDSnapshot(UMDSnapThermodynamics, UMDSnapDynamics):
             The index of the snapshot to load. If index is negative, then the
             first available snapshot of the stream is loaded.
             The default is -1.
+        offsets : UMDIndex, optional
+            The UMDIndex with the byte offsets of the snapshots in the UMD
+            file. It is used only if index is positive.
+            The default is None.
+        columns : tuple, optional
+            The names of the vectors to load, among 'position', 'velocity'
+            and 'force'. The other vectors are set to zero. If None, all the
+            vectors are loaded. The default is None.
 
         Returns
         -------
@@ -317,10 +374,15 @@ class UMDSnapshot(UMDSnapThermodynamics, UMDSnapDynamics):
             stream.
 
         """
+        if offsets is not None and index >= 0:
+            offset = offsets.offset(index)
+            if offset is None:
+                return None
+            umd.seek(offset)
         for line in umd:
             if 'Snapshot:' in line:
                 snap = int(line.replace('Snapshot:', '').strip())
                 if index < 0 or snap == index:
                     self.snap = snap
-                    snapshot = load_UMDSnapshot_from_umd(umd, self)
+                    snapshot = load_UMDSnapshot_from_umd(umd, self, columns)
                     return snapshot
@@ -0,0 +1,252 @@
+"""
+===============================================================================
+                                UMDTrajectory
+===============================================================================
+
+This module provides the UMDTrajectory class to access the snapshots of a UMD
+file as a sequence of UMDSnapshot objects, without loading all of them.
+The snapshots are loaded on demand, seeking directly their sections in the
+UMD file through its UMDIndex, and the most recently used are kept in a cache
+with a limited memory budget. In this way, the analyses revisiting the same
+snapshots (e.g. sliding windows or time correlations over many origins) do not
+parse the same text again.
+
+Classes
+-------
+    UMDTrajectory
+
+See Also
+--------
+    UMDSnapshot
+    UMDIndex
+    load_UMDIndex
+
+"""
+
+
+import collections
+import numpy as np
+
+from .UMDSnapshot import UMDSnapshot
+from .UMDSimulation import UMDSimulation
+from ..load_UMDIndex import load_UMDIndex
+from ..load_UMDSnapshot_from_umd import species_UMDLattice
+from ..load_UMDSnapshot_from_umd import load_UMDSnapDynamics_from_umd
+from ..load_UMDSnapshot_from_umd import load_UMDSnapThermodynamics_from_umd
+
+
+class UMDTrajectory:
+    """
+    UMDTrajectory class to access the snapshots of a UMD file on demand.
+
+    A UMDTrajectory object behaves like a sequence of UMDSnapshot objects: it
+    has a length, it can be indexed by integers and slices and it can be
+    iterated. The snapshots are numbered from 0 to len-1 according to their
+    position in the UMD file, whatever their snap index is.
+    The snapshots returned are shared with the cache, so they must not be
+    modified.
+
+    Parameters
+    ----------
+    umdfile : string
+        The name of the UMD file.
+    simulation : UMDSimulation
+        The UMDSimulation object with the information of the UMD file header.
+    index : UMDIndex
+        The UMDIndex with the offsets of the snapshots in the UMD file.
+    cacheSize : int
+        The memory budget of the snapshots cache in bytes.
+    dtype : numpy dtype
+        The floating point type of the snapshots dynamics arrays.
+    columns : tuple
+        The names of the vectors loaded. If None, all the vectors are loaded.
+    lattice : UMDLattice
+        The lattice of the snapshots, containing only the species loaded.
+
+    Methods
+    -------
+    __len__
+        Get the number of snapshots in the UMD file.
+    __getitem__
+        Get a snapshot, or a list of snapshots, by position.
+    __iter__
+        Iterate over all the snapshots in the UMD file.
+    close
+        Close the UMD file and clear the cache.
+
+    """
+
+    def __init__(self, umdfile, cacheSize=2**26, dtype=float, columns=None,
+                 species=None):
+        """
+        Construct a UMDTrajectory object opening a UMD file.
+
+        Parameters
+        ----------
+        umdfile : string
+            The name of the UMD file.
+        cacheSize : int, optional
+            The memory budget of the snapshots cache in bytes. If 0, no
+            snapshot is cached. The default is 2**26.
+        dtype : numpy dtype, optional
+            The floating point type of the snapshots dynamics arrays.
+            The default is float.
+        columns : tuple, optional
+            The names of the vectors to load, among 'position', 'velocity'
+            and 'force'. The other vectors are set to zero. If None, all the
+            vectors are loaded. The default is None.
+        species : list, optional
+            The atomic species to load, given as UMDAtom objects or as atomic
+            symbols. If None, all the atoms are loaded. The default is None.
+
+        Raises
+        ------
+        ValueError
+            If the cache size is negative.
+
+        Returns
+        -------
+        UMDTrajectory object.
+
+        """
+        if cacheSize < 0:
+            raise(ValueError('invalid cacheSize value: it must be positive.'))
+        self.umdfile = umdfile
+        self.cacheSize = cacheSize
+        self.dtype = np.dtype(dtype)
+        self.columns = columns
+        self.index = load_UMDIndex(umdfile)
+        self._umd = open(umdfile, 'r')
+        self.simulation = UMDSimulation.UMDSimulation_from_umd(self._umd)
+        self.lattice, self._rows = species_UMDLattice(self.simulation.lattice,
+                                                      species)
+        self._cache = collections.OrderedDict()
+        self._cached = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        """
+        Get the number of snapshots in the UMD file.
+
+        Returns
+        -------
+        length : int
+            The number of snapshots in the UMD file.
+
+        """
+        length = len(self.index)
+        return length
+
+    def __getitem__(self, item):
+        """
+        Get a snapshot, or a list of snapshots, by position.
+
+        Parameters
+        ----------
+        item : int or slice
+            The position of the snapshot in the UMD file, or a slice of
+            positions. Negative positions count from the end of the file.
+
+        Raises
+        ------
+        IndexError
+            If the position is out of range.
+        TypeError
+            If the item is neither an integer nor a slice.
+
+        Returns
+        -------
+        snapshot : UMDSnapshot or list
+            The UMDSnapshot object at the position given, or the list of the
+            UMDSnapshot objects in the slice.
+
+        """
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+        if not isinstance(item, (int, np.integer)):
+            raise(TypeError('UMDTrajectory indices must be integers or '
+                            + 'slices, not {}.'.format(type(item).__name__)))
+        i = int(item) + len(self) if item < 0 else int(item)
+        if not 0 <= i < len(self):
+            raise(IndexError('UMDTrajectory index out of range.'))
+        if i in self._cache:
+            self._cache.move_to_end(i)
+            return self._cache[i]
+        snapshot = self._load(i)
+        self._store(i, snapshot)
+        return snapshot
+
+    def __iter__(self):
+        """
+        Iterate over all the snapshots in the UMD file.
+
+        Yields
+        ------
+        snapshot : UMDSnapshot
+            The next UMDSnapshot object in the UMD file.
+
+        """
+        for i in range(len(self)):
+            yield self[i]
+
+    def close(self):
+        """
+        Close the UMD file and clear the cache.
+
+        Returns
+        -------
+        None.
+
+        """
+        self._umd.close()
+        self._cache.clear()
+        self._cached = 0
+
+    def _load(self, i):
+        """
+        Load the snapshot at position i seeking its section in the UMD file.
+
+        """
+        snapshot = UMDSnapshot(int(self.index.snaps[i]), lattice=self.lattice,
+                               dtype=self.dtype)
+        self._umd.seek(int(self.index.offsets[i]))
+        # The dynamics lines of all the atoms in the UMD file are read, but
+        # only the ones of the species selected are decoded.
+        thermodynamics = load_UMDSnapThermodynamics_from_umd(self._umd)
+        dynamics = load_UMDSnapDynamics_from_umd(
+            self._umd, self.simulation.lattice.natoms(), self.dtype,
+            self.columns, self._rows)
+        snapshot.setDynamics(dynamics)
+        snapshot.setThermodynamics(thermodynamics)
+        return snapshot
+
+    def _store(self, i, snapshot):
+        """
+        Store a snapshot in the cache, removing the least recently used ones
+        till the cache fits its memory budget.
+
+        """
+        size = self._nbytes(snapshot)
+        if size > self.cacheSize:
+            return
+        self._cache[i] = snapshot
+        self._cached += size
+        while self._cached > self.cacheSize:
+            _, old = self._cache.popitem(last=False)
+            self._cached -= self._nbytes(old)
+
+    @staticmethod
+    def _nbytes(snapshot):
+        """
+        Get the memory used by the dynamics arrays of a snapshot. The null
+        arrays shared by all the atoms (for the omitted or not loaded columns)
+        do not use memory.
+
+        """
+        arrays = (snapshot.position, snapshot.velocity, snapshot.force)
+        return sum(array.nbytes for array in arrays if any(array.strides))
@@ -0,0 +1,244 @@
+"""
+===============================================================================
+                              UMDTrajectoryArrays
+===============================================================================
+
+This module provides the UMDTrajectoryArrays class to store a whole molecular
+dynamics trajectory as a structure of arrays, instead of a list of UMDSnapshot
+objects.
+The positions, velocities and forces of all the snapshots are stored in three
+contiguous (nsnaps, natoms, 3) arrays, and the thermodynamic quantities in
+(nsnaps,) vectors, so that the analyses work on the whole trajectory with
+numpy operations and no object is built for each snapshot. A single snapshot
+is obtained as a UMDSnapshot object whose arrays are views on its rows.
+
+Classes
+-------
+    UMDTrajectoryArrays
+
+See Also
+--------
+    UMDSnapshot
+    load_UMDTrajectory
+
+"""
+
+
+import numpy as np
+
+from .UMDLattice import UMDLattice
+from .UMDSnapshot import UMDSnapshot
+
+
+class UMDTrajectoryArrays:
+    """
+    UMDTrajectoryArrays class to store the snapshots of a trajectory in
+    contiguous arrays.
+
+    The three vectors of each atom are stored in a single (3, nsnaps, natoms,
+    3) array, whose sections are the position, velocity and force arrays.
+    A UMDTrajectoryArrays object behaves like a sequence of UMDSnapshot
+    objects: indexing by an integer gives a UMDSnapshot which shares its
+    arrays with the trajectory, while indexing by a slice gives a new
+    UMDTrajectoryArrays object which shares its arrays too.
+
+    Parameters
+    ----------
+    lattice : UMDLattice
+        The lattice of the snapshots.
+    natoms : int
+        The number of atoms in each snapshot.
+    dtype : numpy dtype
+        The floating point type of the dynamics arrays.
+    snap : array (nsnaps,)
+        The snapshots indexes.
+    time : array (nsnaps,)
+        The snapshots time durations in fs.
+    temperature : array (nsnaps,)
+        The snapshots temperatures in K.
+    pressure : array (nsnaps,)
+        The snapshots pressures in GPa.
+    energy : array (nsnaps,)
+        The snapshots energies in eV.
+    vectors : array (3, nsnaps, natoms, 3)
+        The positions, velocities and forces of the atoms in each snapshot.
+    position : array (nsnaps, natoms, 3)
+        The atoms positions, as a view of vectors.
+    velocity : array (nsnaps, natoms, 3)
+        The atoms velocities, as a view of vectors.
+    force : array (nsnaps, natoms, 3)
+        The atoms forces, as a view of vectors.
+
+    Methods
+    -------
+    __len__
+        Get the number of snapshots.
+    __getitem__
+        Get a snapshot view, or a trajectory view of a slice of snapshots.
+    __iter__
+        Iterate over the snapshot views.
+    setSnapshot
+        Copy the data of a UMDSnapshot into a snapshot row.
+
+    """
+
+    def __init__(self, nsnaps=0, lattice=UMDLattice(), dtype=float,
+                 vectors=None):
+        """
+        Construct a UMDTrajectoryArrays object with null arrays.
+
+        Parameters
+        ----------
+        nsnaps : int, optional
+            The number of snapshots. The default is 0.
+        lattice : UMDLattice, optional
+            The lattice of the snapshots. The default is UMDLattice().
+        dtype : numpy dtype, optional
+            The floating point type of the dynamics arrays.
+            The default is float.
+        vectors : array (3, nsnaps, natoms, 3), optional
+            The array where the positions, velocities and forces are stored,
+            e.g. an array allocated in shared memory. If None, a new array
+            is allocated. The default is None.
+
+        Raises
+        ------
+        ValueError
+            If the shape of vectors does not match nsnaps and the lattice.
+
+        Returns
+        -------
+        UMDTrajectoryArrays object.
+
+        """
+        self.lattice = lattice
+        self.natoms = lattice.natoms()
+        self.dtype = np.dtype(dtype)
+        shape = (3, nsnaps, self.natoms, 3)
+        if vectors is None:
+            vectors = np.zeros(shape, dtype=self.dtype)
+        elif vectors.shape != shape:
+            raise(ValueError('invalid vectors shape: it must be '
+                             + '{}.'.format(shape)))
+        self.snap = np.zeros(nsnaps, dtype=np.int64)
+        self.time = np.zeros(nsnaps)
+        self.temperature = np.zeros(nsnaps)
+        self.pressure = np.zeros(nsnaps)
+        self.energy = np.zeros(nsnaps)
+        self._setVectors(vectors)
+
+    def __len__(self):
+        """
+        Get the number of snapshots.
+
+        Returns
+        -------
+        length : int
+            The number of snapshots.
+
+        """
+        length = len(self.snap)
+        return length
+
+    def __getitem__(self, item):
+        """
+        Get a snapshot view, or a trajectory view of a slice of snapshots.
+
+        Parameters
+        ----------
+        item : int or slice
+            The position of the snapshot, or a slice of positions. Negative
+            positions count from the end of the trajectory.
+
+        Raises
+        ------
+        IndexError
+            If the position is out of range.
+        TypeError
+            If the item is neither an integer nor a slice.
+
+        Returns
+        -------
+        snapshot : UMDSnapshot or UMDTrajectoryArrays
+            The UMDSnapshot object at the position given, or the
+            UMDTrajectoryArrays object with the snapshots in the slice. Their
+            arrays are views of the trajectory arrays.
+
+        """
+        if isinstance(item, slice):
+            trajectory = UMDTrajectoryArrays.__new__(UMDTrajectoryArrays)
+            trajectory.lattice = self.lattice
+            trajectory.natoms = self.natoms
+            trajectory.dtype = self.dtype
+            trajectory.snap = self.snap[item]
+            trajectory.time = self.time[item]
+            trajectory.temperature = self.temperature[item]
+            trajectory.pressure = self.pressure[item]
+            trajectory.energy = self.energy[item]
+            trajectory._setVectors(self.vectors[:, item])
+            return trajectory
+        if not isinstance(item, (int, np.integer)):
+            raise(TypeError('UMDTrajectoryArrays indices must be integers or '
+                            + 'slices, not {}.'.format(type(item).__name__)))
+        i = int(item) + len(self) if item < 0 else int(item)
+        if not 0 <= i < len(self):
+            raise(IndexError('UMDTrajectoryArrays index out of range.'))
+        # The snapshot attributes are set directly, so that its arrays are
+        # views of the trajectory rows and nothing is copied.
+        snapshot = UMDSnapshot(int(self.snap[i]), float(self.time[i]),
+                               self.lattice, self.dtype)
+        snapshot.temperature = float(self.temperature[i])
+        snapshot.pressure = float(self.pressure[i])
+        snapshot.energy = float(self.energy[i])
+        snapshot.position = self.position[i]
+        snapshot.velocity = self.velocity[i]
+        snapshot.force = self.force[i]
+        return snapshot
+
+    def __iter__(self):
+        """
+        Iterate over the snapshot views.
+
+        Yields
+        ------
+        snapshot : UMDSnapshot
+            The next snapshot of the trajectory.
+
+        """
+        for i in range(len(self)):
+            yield self[i]
+
+    def setSnapshot(self, i, snapshot):
+        """
+        Copy the data of a UMDSnapshot into a snapshot row.
+
+        Parameters
+        ----------
+        i : int
+            The position of the snapshot row.
+        snapshot : UMDSnapshot
+            The snapshot to copy.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.snap[i] = snapshot.snap
+        self.time[i] = snapshot.time
+        self.temperature[i] = snapshot.temperature
+        self.pressure[i] = snapshot.pressure
+        self.energy[i] = snapshot.energy
+        self.position[i] = snapshot.position
+        self.velocity[i] = snapshot.velocity
+        self.force[i] = snapshot.force
+
+    def _setVectors(self, vectors):
+        """
+        Set the vectors array and its position, velocity and force views.
+
+        """
+        self.vectors = vectors
+        self.position = vectors[0]
+        self.velocity = vectors[1]
+        self.force = vectors[2]
@@ -0,0 +1,207 @@
+"""
+===============================================================================
+                                 UMDUnwrapper
+===============================================================================
+
+This module provides the UMDUnwrapper class to unwrap the atoms positions of
+a trajectory while its snapshots are streamed.
+The positions stored in the UMD files are wrapped into the unit cell, so an
+atom crossing a cell face jumps to the opposite side. For each atom, the
+UMDUnwrapper keeps the integer counters of the cell images crossed along the
+three lattice vectors, and it updates them from the minimum image of the
+displacement between consecutive snapshots (see UMDLattice.periodic). The
+unwrapped positions are then obtained adding the lattice vectors of the image
+counters to the wrapped positions, one snapshot at a time, so that neither a
+second pass on the trajectory nor a copy of the whole unwrapped trajectory is
+needed. The image counters can also be stored compactly (e.g. as int16) next
+to the trajectory, to restore the unwrapped positions later.
+
+Classes
+-------
+    UMDUnwrapper
+
+See Also
+--------
+    UMDLattice
+    UMDTrajectoryArrays
+    load_UMDTrajectory
+
+"""
+
+
+import numpy as np
+
+
+class UMDUnwrapper:
+    """
+    UMDUnwrapper class to unwrap the atoms positions snapshot by snapshot.
+
+    The displacements between consecutive snapshots must be shorter than half
+    of the cell, which is always the case for molecular dynamics steps.
+
+    Parameters
+    ----------
+    lattice : UMDLattice
+        The lattice of the snapshots.
+    images : array (natoms, 3)
+        The integer counters of the cell images crossed by each atom along
+        the three lattice vectors, since the first snapshot.
+    previous : array (natoms, 3) or None
+        The reduced coordinates of the last snapshot unwrapped. It is None
+        before the first snapshot.
+
+    Methods
+    -------
+    reset
+        Reset the image counters before a new trajectory.
+    unwrap
+        Unwrap the atoms positions of the next snapshot.
+    restore
+        Restore the unwrapped positions from the stored image counters.
+    iter_unwrap
+        Unwrap the atoms positions of a sequence of snapshots.
+
+    """
+
+    def __init__(self, lattice, dtype=np.int64):
+        """
+        Construct a UMDUnwrapper object.
+
+        Parameters
+        ----------
+        lattice : UMDLattice
+            The lattice of the snapshots.
+        dtype : numpy dtype, optional
+            The integer type of the image counters.
+            The default is np.int64.
+
+        Returns
+        -------
+        UMDUnwrapper object.
+
+        """
+        self.lattice = lattice
+        self.images = np.zeros((lattice.natoms(), 3), dtype=dtype)
+        self.previous = None
+        # The reduced coordinates of two consecutive snapshots are stored in
+        # two buffers swapped at each snapshot.
+        self._reduced = np.empty((lattice.natoms(), 3), dtype=float)
+
+    def reset(self):
+        """
+        Reset the image counters before a new trajectory.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.images.fill(0)
+        self.previous = None
+
+    def unwrap(self, position, out=None):
+        """
+        Unwrap the atoms positions of the next snapshot.
+
+        The image counters are updated from the displacements with respect to
+        the last snapshot unwrapped, and the lattice vectors of the image
+        counters are added to the wrapped positions.
+
+        Parameters
+        ----------
+        position : array (natoms, 3)
+            The wrapped atoms positions in cartesian coordinates.
+        out : array (natoms, 3), optional
+            The array where to store the unwrapped positions. It can be the
+            same buffer for all the snapshots, or position itself to unwrap
+            in place. If None, a new array is allocated.
+            The default is None.
+
+        Returns
+        -------
+        out : array (natoms, 3)
+            The unwrapped atoms positions in cartesian coordinates.
+
+        """
+        reduced = np.matmul(position, self.lattice.invBasis,
+                            out=self._reduced)
+        if self.previous is not None:
+            # The variation of the reduced coordinates differs from its
+            # minimum image by the number of cell faces crossed.
+            variation = np.subtract(reduced, self.previous, out=self.previous)
+            jumps = variation - self.lattice.periodic(variation, False)
+            self.images -= np.rint(jumps).astype(self.images.dtype)
+            self._reduced = self.previous
+        else:
+            self._reduced = np.empty_like(reduced)
+        self.previous = reduced
+        out = self.restore(position, self.images, out)
+        return out
+
+    def restore(self, position, images, out=None):
+        """
+        Restore the unwrapped positions from the stored image counters.
+
+        Parameters
+        ----------
+        position : array (..., natoms, 3)
+            The wrapped atoms positions in cartesian coordinates, of a single
+            snapshot or of a batch of snapshots.
+        images : array (..., natoms, 3)
+            The image counters of the atoms in the same snapshots.
+        out : array (..., natoms, 3), optional
+            The array where to store the unwrapped positions. If None, a new
+            array is allocated. The default is None.
+
+        Returns
+        -------
+        out : array (..., natoms, 3)
+            The unwrapped atoms positions in cartesian coordinates.
+
+        """
+        shift = np.matmul(images, self.lattice.dirBasis)
+        out = np.add(position, shift, out=out, casting='unsafe')
+        return out
+
+    def iter_unwrap(self, positions, images=None, out=None):
+        """
+        Unwrap the atoms positions of a sequence of snapshots.
+
+        Parameters
+        ----------
+        positions : iterable
+            The wrapped atoms positions (natoms, 3) of the snapshots, e.g.
+            the position arrays of the snapshots yielded by iter_snapshots.
+        images : array (nsnaps, natoms, 3), optional
+            The integer array where to store the image counters of each
+            snapshot, e.g. a compact int16 array next to the trajectory
+            arrays. If None, the image counters are not stored.
+            The default is None.
+        out : array (natoms, 3), optional
+            The buffer where to store the unwrapped positions of each
+            snapshot. If given, the positions yielded are valid only till the
+            next iteration. If None, a new array is allocated for each
+            snapshot. The default is None.
+
+        Raises
+        ------
+        OverflowError
+            If the image counters cannot be stored in the images array type.
+
+        Yields
+        ------
+        position : array (natoms, 3)
+            The unwrapped atoms positions of the next snapshot.
+
+        """
+        if images is not None:
+            limits = np.iinfo(images.dtype)
+        for i, position in enumerate(positions):
+            unwrapped = self.unwrap(position, out)
+            if images is not None:
+                if (limits.min > self.images.min()
+                        or limits.max < self.images.max()):
+                    raise(OverflowError('image counters out of the '
+                                        + '{} range.'.format(images.dtype)))
+                images[i] = self.images
+            yield unwrapped
@@ -0,0 +1,182 @@
+"""
+===============================================================================
+                                 UMDVerletList
+===============================================================================
+
+This module provides the UMDVerletList class to keep the list of the pairs of
+neighbouring atoms along a trajectory.
+The list contains all the pairs of atoms closer than the cutoff radius plus a
+skin distance, and it is built with cell lists (see cell_pairs). In the
+following snapshots, the pairs closer than the cutoff radius are found only
+among the pairs of the list, through the minimum image of their distances.
+Since the atoms move by a small fraction of the skin at each molecular
+dynamics step, the same list can be reused for many snapshots: the list is
+built again only when the largest displacement of the atoms since the last
+build is longer than half of the skin, so that no pair of atoms can have
+entered the cutoff sphere without being in the list. In this way, the
+coordination, bond lifetime and pair distribution analyses of a trajectory
+can share a single neighbour structure.
+
+Classes
+-------
+    UMDVerletList
+
+See Also
+--------
+    UMDLattice
+    UMDPairDistribution
+
+"""
+
+
+import numpy as np
+
+from .UMDPairDistribution import cell_pairs
+
+
+class UMDVerletList:
+    """
+    UMDVerletList class to find the pairs of neighbouring atoms of the
+    snapshots of a trajectory.
+
+    Each pair of atoms is found only once, either as (i, j) or as (j, i).
+
+    Parameters
+    ----------
+    lattice : UMDLattice
+        The lattice of the snapshots.
+    rcut : float
+        The cutoff radius of the neighbouring pairs.
+    skin : float
+        The skin distance added to the cutoff radius in the list.
+    first : array (npairs,)
+        The index of the first atom of each pair of the list.
+    second : array (npairs,)
+        The index of the second atom of each pair of the list.
+    reference : array (natoms, 3) or None
+        The atoms positions at the last build of the list. It is None before
+        the first build.
+    builds : int
+        The number of builds of the list.
+
+    Methods
+    -------
+    reset
+        Discard the list, so that it is built again at the next snapshot.
+    update
+        Build the list again if the atoms moved too much since the last build.
+    pairs
+        Get the pairs of atoms closer than the cutoff radius in a snapshot.
+
+    """
+
+    def __init__(self, lattice, rcut, skin=0.3):
+        """
+        Construct a UMDVerletList object.
+
+        Parameters
+        ----------
+        lattice : UMDLattice
+            The lattice of the snapshots.
+        rcut : float
+            The cutoff radius of the neighbouring pairs.
+        skin : float, optional
+            The skin distance added to the cutoff radius in the list. The
+            cutoff radius plus the skin cannot be longer than half the
+            spacing of the lattice planes, so that each pair of atoms has a
+            single image within it. The default is 0.3.
+
+        Raises
+        ------
+        ValueError
+            If the cutoff radius or the skin are not valid.
+
+        Returns
+        -------
+        UMDVerletList object.
+
+        """
+        spacing = 1/np.linalg.norm(lattice.invBasis, axis=0)
+        if rcut <= 0 or skin < 0 or 2*(rcut + skin) > spacing.min():
+            raise(ValueError('invalid rcut and skin values: rcut+skin must '
+                             + 'not be longer than half the lattice planes '
+                             + 'spacing.'))
+        self.lattice = lattice
+        self.rcut = float(rcut)
+        self.skin = float(skin)
+        self.first = np.zeros(0, dtype=int)
+        self.second = np.zeros(0, dtype=int)
+        self.reference = None
+        self.builds = 0
+
+    def reset(self):
+        """
+        Discard the list, so that it is built again at the next snapshot.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.first = np.zeros(0, dtype=int)
+        self.second = np.zeros(0, dtype=int)
+        self.reference = None
+
+    def update(self, position):
+        """
+        Build the list again if the atoms moved too much since the last build.
+
+        The list is built again if any atom moved by more than half of the
+        skin since the last build, or if the list was never built.
+
+        Parameters
+        ----------
+        position : array (natoms, 3)
+            The atoms positions in cartesian coordinates.
+
+        Returns
+        -------
+        built : bool
+            True if the list has been built again.
+
+        """
+        if self.reference is not None:
+            # The displacements are taken with the minimum image, so that the
+            # atoms wrapped into the unit cell are not moved across it.
+            displacement = self.lattice.minimage(position - self.reference)
+            displacement = np.einsum('ij,ij->i', displacement, displacement)
+            if 4*displacement.max(initial=0) <= self.skin**2:
+                return False
+        self.first, self.second = cell_pairs(self.lattice, position,
+                                             self.rcut + self.skin)[:2]
+        self.reference = np.array(position, dtype=float)
+        self.builds += 1
+        return True
+
+    def pairs(self, position):
+        """
+        Get the pairs of atoms closer than the cutoff radius in a snapshot.
+
+        The list is updated first, if needed.
+
+        Parameters
+        ----------
+        position : array (natoms, 3)
+            The atoms positions in cartesian coordinates.
+
+        Returns
+        -------
+        first : array (npairs,)
+            The index of the first atom of each pair.
+        second : array (npairs,)
+            The index of the second atom of each pair.
+        distance : array (npairs,)
+            The distance between the atoms of each pair.
+
+        """
+        self.update(position)
+        variation = self.lattice.minimage(position[self.second]
+                                          - position[self.first])
+        distance = np.sqrt(np.einsum('ij,ij->i', variation, variation))
+        close = distance < self.rcut
+        return self.first[close], self.second[close], distance[close]
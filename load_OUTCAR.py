@@ -6,18 +6,38 @@
 This module provides the Load_OUTCAR namespace containing the functions
 necessary to execute the UMDVaspParser function and stores the UMDVaspParser
 parameters values.
+The snapshots can be converted serially or through a pipeline of three
+stages connected by bounded queues: a reader thread slicing the OUTCAR file
+into the raw text blocks of the snapshots, a pool of worker processes parsing
+and formatting the blocks, and the ordered writing of the formatted snapshots
+on the UMD file.
+When VASP jobs are restarted, the first snapshots of a run can repeat the last
+ones of the previous run. Optionally, these duplicated snapshots are detected
+by the fingerprints of their positions and they are not saved, while the
+snapshots saved are numbered consecutively.
 
 Classes
 -------
     Load_OUTCAR
 
+Functions
+---------
+    read_UMDSnapshot_block
+    convert_UMDSnapshot_block
+
 SeeAlso
 -------
     UMDVaspParser
 
 """
 
+import io
+import queue
+import threading
+import collections
+import multiprocessing
 import numpy as np
+import concurrent.futures as cf
 
 from .libs.UMDSnapshot import UMDSnapshot
 from .load_UMDSimulation_from_outcar import load_UMDSimulation_from_outcar
@@ -47,6 +67,27 @@ class Load_OUTCAR:
     loadedSteps : int
         The total number of snapshot previously loaded.
         It is calculated and updated after every simulation run.
+    prune : bool
+        If True, the null dynamics columns are not saved on the UMD file.
+        It is a UMDVaspParser function parameter and it is initialized by it.
+    workers : int
+        The number of worker processes converting the snapshots. If 0, the
+        snapshots are converted serially.
+        It is a UMDVaspParser function parameter and it is initialized by it.
+    dedup : int
+        The number of last snapshots of a run whose fingerprints are compared
+        with the first snapshots of the next run, to drop the duplicated ones.
+        If 0, no snapshot is dropped.
+        It is a UMDVaspParser function parameter and it is initialized by it.
+    dropped : int
+        The total number of duplicated snapshots dropped.
+        It is updated at the beginning of every simulation run.
+    tail : deque
+        The fingerprints of the last snapshots saved.
+        It is updated after every snapshot is saved.
+    offsets : list
+        The index and the position on the UMD stream of each snapshot saved.
+        It is updated before every snapshot is saved.
 
     Functions
     ---------
@@ -62,7 +103,8 @@ class Load_OUTCAR:
 
     """
 
-    def __init__(self, initialStep=0, nSteps=np.infty):
+    def __init__(self, initialStep=0, nSteps=np.infty, prune=False,
+                 workers=0, dedup=0):
         """
         Initialize a Load_OUTCAR instance with default parameters.
 
@@ -75,6 +117,12 @@ class Load_OUTCAR:
         self.initialStep = initialStep
         self.finalStep = 0
         self.loadedSteps = 0
+        self.prune = prune
+        self.workers = workers
+        self.dedup = dedup
+        self.dropped = 0
+        self.tail = collections.deque(maxlen=dedup)
+        self.offsets = []
 
     def load(self, outcar, umd, simulation):
         """
@@ -217,6 +265,7 @@ class Load_OUTCAR:
             UMDSnapshot.UMDSnapshot_from_outcar_null(outcar)
             yield float(step-self.loadedSteps)/(self.finalStep-self.loadedSteps)
         simulation.runs[-1].steps = 0
+        self.tail.clear()
 
     @ProgressBar(length=20)
     def _run_around_initialStep(self, outcar, umd, simulation):
@@ -242,16 +291,14 @@ class Load_OUTCAR:
             Ratio of the snapshot read.
 
         """
-        run = simulation.runs[-1]
         for step in range(self.loadedSteps, self.initialStep):
             UMDSnapshot.UMDSnapshot_from_outcar_null(outcar)
-            yield float(step-self.loadedSteps)/(self.finalStep-self.loadedSteps)
-        for step in range(self.initialStep, self.finalStep):
-            snapshot = UMDSnapshot(step, run.steptime, simulation.lattice)
-            snapshot.UMDSnapshot_from_outcar(outcar)
-            snapshot.save(umd)
-            yield float(step-self.loadedSteps)/(self.finalStep-self.loadedSteps)
-        simulation.runs[-1].steps = self.finalStep - self.initialStep
+            yield (float(step-self.loadedSteps)
+                   / (self.finalStep-self.loadedSteps))
+        steps = range(self.initialStep, self.finalStep)
+        for step in self._convert(outcar, umd, simulation, steps):
+            yield (float(step-self.loadedSteps)
+                   / (self.finalStep-self.loadedSteps))
 
     @ProgressBar(length=20)
     def _run_after_initialStep(self, outcar, umd, simulation):
@@ -260,6 +307,8 @@ class Load_OUTCAR:
 
         All the snapshots after initialSteps in the simulation are read and for
         each a UMDSnapshot object is built and saved in the umd file.
+        If dedup is set, the first snapshots of the run duplicating the last
+        ones of the previous run are dropped.
 
         Parameters
         ----------
@@ -275,11 +324,347 @@ class Load_OUTCAR:
         float
             Ratio of the snapshot read.
 
+        """
+        steps = range(self.loadedSteps, self.finalStep)
+        for step in self._convert(outcar, umd, simulation, steps,
+                                  dedup=True):
+            yield (float(step-self.loadedSteps)
+                   / (self.finalStep-self.loadedSteps))
+
+    def _convert(self, outcar, umd, simulation, steps, dedup=False):
+        """
+        Convert the snapshots of the current run, serially or through the
+        pipeline.
+
+        The steps of the run are set to the number of snapshots saved. If the
+        OUTCAR file ends before the last snapshot, all the snapshots read
+        completely are saved, the steps of the run are set to their number
+        and then an EOFError is raised, both serially and through the
+        pipeline, so that the UMD header agrees with the snapshots saved.
+
+        Parameters
+        ----------
+        outcar : input file
+            The outcar file.
+        umd : output file
+            The umd file.
+        simulation : UMDSimulation
+            The current UMDSimulation.
+        steps : range
+            The indexes of the snapshots to convert.
+        dedup : bool, optional
+            If True, the first snapshots duplicating the previous run are
+            dropped first. The default is False.
+
+        Raises
+        ------
+        EOFError
+            If the OUTCAR file ends before the last snapshot.
+
+        Yields
+        ------
+        step : int
+            The index of the last snapshot read.
+
         """
         run = simulation.runs[-1]
-        for step in range(self.loadedSteps, self.finalStep):
-            snapshot = UMDSnapshot(step, run.steptime, simulation.lattice)
-            snapshot.UMDSnapshot_from_outcar(outcar)
-            snapshot.save(umd)
-            yield float(step-self.loadedSteps)/(self.finalStep-self.loadedSteps)
-        simulation.runs[-1].steps = self.finalStep - self.loadedSteps
+        saved = len(self.offsets)
+        try:
+            if dedup:
+                steps = self._drop_duplicates(outcar, umd, simulation, steps)
+            if self.workers:
+                yield from self._pipeline(outcar, umd, simulation, steps)
+            else:
+                snapshot = UMDSnapshot(-1, run.steptime, simulation.lattice,
+                                       reuse=True)
+                for step in steps:
+                    self._load(snapshot, outcar)
+                    self._save(snapshot, umd, step)
+                    yield step
+        finally:
+            run.steps = len(self.offsets) - saved
+
+    def _drop_duplicates(self, outcar, umd, simulation, steps):
+        """
+        Drop the first snapshots of the run duplicating the previous run.
+
+        The snapshots are read till the first one whose fingerprint is not
+        among the fingerprints of the last snapshots saved. The duplicated
+        snapshots are dropped, while the first new snapshot is saved.
+
+        Parameters
+        ----------
+        outcar : input file
+            The outcar file.
+        umd : output file
+            The umd file.
+        simulation : UMDSimulation
+            The current UMDSimulation.
+        steps : range
+            The indexes of the snapshots of the run to convert.
+
+        Returns
+        -------
+        steps : range
+            The indexes of the snapshots still to convert.
+
+        """
+        if not self.tail:
+            return steps
+        run = simulation.runs[-1]
+        snapshot = UMDSnapshot(-1, run.steptime, simulation.lattice,
+                               reuse=True)
+        for i, step in enumerate(steps):
+            self._load(snapshot, outcar)
+            if snapshot.fingerprint() not in self.tail:
+                self.tail.clear()
+                self._save(snapshot, umd, step)
+                return steps[i+1:]
+            self.dropped += 1
+        return steps[len(steps):]
+
+    def _load(self, snapshot, outcar):
+        """
+        Load the next snapshot of the OUTCAR file into a reused snapshot.
+
+        Parameters
+        ----------
+        snapshot : UMDSnapshot
+            The snapshot where to load the data.
+        outcar : input file
+            The outcar file.
+
+        Raises
+        ------
+        EOFError
+            If the OUTCAR file ends before the next snapshot, so that the
+            data of the previous one are not saved again.
+
+        Returns
+        -------
+        None.
+
+        """
+        if snapshot.UMDSnapshot_from_outcar(outcar) is None:
+            raise(EOFError('OUTCAR file ended before the end of the '
+                           + 'simulation run.'))
+
+    def _save(self, snapshot, umd, step):
+        """
+        Save a snapshot on the UMD file.
+
+        The snapshot is numbered skipping the duplicated snapshots dropped,
+        and its fingerprint is recorded if dedup is set.
+
+        Parameters
+        ----------
+        snapshot : UMDSnapshot
+            The snapshot to save.
+        umd : output file
+            The umd file.
+        step : int
+            The index of the snapshot in the OUTCAR file.
+
+        Returns
+        -------
+        None.
+
+        """
+        snapshot.snap = step - self.dropped
+        if self.dedup:
+            self.tail.append(snapshot.fingerprint())
+        self.offsets.append((snapshot.snap, umd.tell()))
+        snapshot.save(umd, self.prune)
+
+    def _pipeline(self, outcar, umd, simulation, steps):
+        """
+        Convert the snapshots of the current run through the pipeline.
+
+        A reader thread slices the OUTCAR file into the raw text blocks of the
+        snapshots and puts them in a bounded queue. The blocks are converted
+        into formatted UMD snapshots by a pool of worker processes and the
+        results are written on the UMD file in the original order. At most
+        2*workers snapshots are in flight at the same time, so the memory used
+        does not depend on the number of snapshots.
+
+        Parameters
+        ----------
+        outcar : input file
+            The outcar file.
+        umd : output file
+            The umd file.
+        simulation : UMDSimulation
+            The current UMDSimulation.
+        steps : range
+            The indexes of the snapshots to convert.
+
+        Yields
+        ------
+        step : int
+            The index of the last snapshot written on the UMD file.
+
+        """
+        run = simulation.runs[-1]
+        depth = 2*self.workers
+        blocks = queue.Queue(maxsize=depth)
+        stop = threading.Event()
+
+        def reader():
+            for step in steps:
+                try:
+                    block = read_UMDSnapshot_block(outcar)
+                except Exception as error:
+                    block = error
+                while not stop.is_set():
+                    try:
+                        blocks.put(block, timeout=0.1)
+                        break
+                    except queue.Full:
+                        pass
+                if stop.is_set() or isinstance(block, Exception):
+                    return
+
+        # The worker processes are not forked from this process, where the
+        # reader thread and the write-behind thread of the UMD file may hold
+        # locks, but from a single-threaded server process, if available.
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('forkserver')
+        else:
+            context = multiprocessing.get_context()
+        thread = threading.Thread(target=reader, daemon=True)
+        pending = collections.deque()
+        with cf.ProcessPoolExecutor(self.workers, mp_context=context) as pool:
+            thread.start()
+            try:
+                for step in steps:
+                    if len(pending) == depth:
+                        self._write(umd, step-depth, pending.popleft())
+                        yield step-depth
+                    block = blocks.get()
+                    if isinstance(block, Exception):
+                        # At the end of the OUTCAR file, the snapshots read
+                        # completely are written before stopping, as done
+                        # serially.
+                        while isinstance(block, EOFError) and pending:
+                            done = step-len(pending)
+                            self._write(umd, done, pending.popleft())
+                            yield done
+                        raise block
+                    pending.append(pool.submit(
+                        convert_UMDSnapshot_block, block, step-self.dropped,
+                        run.steptime, simulation.lattice, self.prune,
+                        bool(self.dedup)))
+                for step in steps[len(steps)-len(pending):]:
+                    self._write(umd, step, pending.popleft())
+                    yield step
+            finally:
+                stop.set()
+                thread.join()
+
+    def _write(self, umd, step, future):
+        """
+        Write a snapshot converted by the pipeline on the UMD file.
+
+        Parameters
+        ----------
+        umd : output file
+            The umd file.
+        step : int
+            The index of the snapshot in the OUTCAR file.
+        future : Future
+            The result of the convert_UMDSnapshot_block function.
+
+        Returns
+        -------
+        None.
+
+        """
+        string = future.result()
+        if self.dedup:
+            string, fingerprint = string
+            self.tail.append(fingerprint)
+        self.offsets.append((step-self.dropped, umd.tell()))
+        umd.write(string)
+
+
+def read_UMDSnapshot_block(outcar):
+    """
+    Read the raw text block of the next snapshot in the OUTCAR file.
+
+    The block contains all the lines consumed by the
+    UMDSnapshot.UMDSnapshot_from_outcar function to load the next snapshot,
+    that is all the lines till the total energy line following the end of
+    the convergence loop.
+
+    Parameters
+    ----------
+    outcar : input file
+        The OUTCAR file stream.
+
+    Raises
+    ------
+    EOFError
+        If the OUTCAR file ends before the total energy line of the snapshot.
+
+    Returns
+    -------
+    block : string
+        The raw text of the snapshot.
+
+    """
+    lines = []
+    markers = iter(["aborting loop",
+                    "ENERGY OF THE ELECTRON-ION-THERMOSTAT SYSTEM (eV)",
+                    "ETOTAL"])
+    marker = next(markers)
+    for line in outcar:
+        lines.append(line)
+        if marker in line:
+            if marker == "ETOTAL":
+                break
+            marker = next(markers)
+    else:
+        raise(EOFError('OUTCAR file ended but the last snapshot is '
+                       + 'uncomplete.'))
+    block = ''.join(lines)
+    return block
+
+
+def convert_UMDSnapshot_block(block, step, steptime, lattice, prune=False,
+                              fingerprint=False):
+    """
+    Convert the raw OUTCAR text block of a snapshot into a UMD snapshot.
+
+    Parameters
+    ----------
+    block : string
+        The raw text of the snapshot in the OUTCAR file.
+    step : int
+        The snapshot index.
+    steptime : float
+        The snapshot time duration in fs.
+    lattice : UMDLattice
+        The simulation lattice.
+    prune : bool, optional
+        If True, the null dynamics columns are not saved.
+        The default is False.
+    fingerprint : bool, optional
+        If True, the fingerprint of the snapshot positions is returned too.
+        The default is False.
+
+    Returns
+    -------
+    string : string
+        The snapshot formatted as in the UMD file.
+    fingerprint : int
+        The fingerprint of the snapshot positions, only if requested.
+
+    """
+    umd = io.StringIO()
+    snapshot = UMDSnapshot(step, steptime, lattice)
+    snapshot.UMDSnapshot_from_outcar(io.StringIO(block))
+    snapshot.save(umd, prune)
+    string = umd.getvalue()
+    if fingerprint:
+        return string, snapshot.fingerprint()
+    return string
@@ -0,0 +1,245 @@
+"""
+===============================================================================
+                                load_UMDIndex
+===============================================================================
+
+This module provides the functions necessary to build, store and load the
+UMDIndex of a UMD file, that is the byte offsets of all its snapshot sections.
+The UMDIndex is stored in a sidecar file, named as the UMD file with the
+additional '.idx' extension, and it is written by the UMDVaspParser function
+together with the UMD file.
+If the sidecar file is missing or it is older than the UMD file, the UMDIndex
+is computed from the layout of the UMD file. Indeed, the snapshot sections
+written by the UMDSnapshot.save function have a fixed width, so the offset of
+the k-th snapshot is simply the header length plus k times the snapshot
+section length. Only if the UMD file does not have a fixed layout, it is
+scanned once for the lines starting with "Snapshot:" and the sidecar file is
+written again.
+
+Functions
+---------
+    load_UMDIndex
+    load_UMDIndex_from_layout
+    load_UMDIndex_from_umd
+    load_UMDIndex_from_idx
+    check_UMDIndex
+
+See Also
+--------
+    UMDIndex
+    UMDVaspParser
+
+"""
+
+
+import os
+import io
+import mmap
+import numpy as np
+
+from .libs.UMDIndex import UMDIndex
+
+
+def load_UMDIndex(umdfile):
+    """
+    Load the UMDIndex of a UMD file from its sidecar file.
+
+    If the sidecar file is missing, older than the UMD file or inconsistent
+    with it, the UMDIndex is computed from the fixed layout of the UMD file,
+    without writing any sidecar file. If the UMD file has not a fixed layout,
+    the UMDIndex is built scanning the UMD file and the sidecar file is
+    written again. If the sidecar file cannot be written (e.g. in a read only
+    directory), the UMDIndex is simply returned.
+
+    Parameters
+    ----------
+    umdfile : string
+        The name of the UMD file.
+
+    Returns
+    -------
+    index : UMDIndex
+        The UMDIndex of the UMD file.
+
+    """
+    idxfile = umdfile + '.idx'
+    with open(umdfile, 'rb') as umd:
+        if (os.path.isfile(idxfile) and
+                os.path.getmtime(idxfile) >= os.path.getmtime(umdfile)):
+            with open(idxfile, 'rb') as idx:
+                index = load_UMDIndex_from_idx(idx)
+            if check_UMDIndex(umd, index):
+                return index
+        index = load_UMDIndex_from_layout(umd)
+        if index is not None:
+            return index
+        index = load_UMDIndex_from_umd(umd)
+    try:
+        with open(idxfile, 'wb') as idx:
+            index.save(idx)
+    except(OSError):
+        pass
+    return index
+
+
+def load_UMDIndex_from_umd(umd):
+    """
+    Build the UMDIndex of a UMD file scanning all its snapshot sections.
+
+    The file is memory mapped when possible, so that the search of the
+    snapshot lines is performed without reading the file line by line.
+
+    Parameters
+    ----------
+    umd : binary input file
+        The UMD input file stream, opened in binary mode.
+
+    Returns
+    -------
+    index : UMDIndex
+        The UMDIndex of the UMD file.
+
+    """
+    data = _map(umd)
+    snaps = []
+    offsets = []
+    offset = _find(data, 0)
+    while offset >= 0:
+        snaps.append(_snap(data, offset))
+        offsets.append(offset)
+        offset = _find(data, offset+1)
+    if isinstance(data, mmap.mmap):
+        data.close()
+    index = UMDIndex(snaps, offsets)
+    return index
+
+
+def load_UMDIndex_from_layout(umd, probes=8):
+    """
+    Compute the UMDIndex of a UMD file with a fixed layout.
+
+    The header length and the snapshot section length are measured from the
+    first two snapshots. The layout is considered fixed if the rest of the
+    file is made of an integer number of snapshot sections and if some probe
+    snapshots, evenly spaced along the file, are found at their computed
+    offsets with consecutive indexes.
+
+    Parameters
+    ----------
+    umd : binary input file
+        The UMD input file stream, opened in binary mode.
+    probes : int, optional
+        The number of snapshots checked at their computed offsets, besides
+        the last one. The default is 8.
+
+    Returns
+    -------
+    index : UMDIndex
+        The UMDIndex of the UMD file. If the UMD file has not a fixed layout,
+        then None is returned.
+
+    """
+    data = _map(umd)
+    index = None
+    header = _find(data, 0)
+    if header >= 0:
+        second = _find(data, header+1)
+        blocksize = (second if second >= 0 else len(data)) - header
+        nsnaps, rest = divmod(len(data)-header, blocksize)
+        snap = _snap(data, header)
+        ks = np.unique(np.linspace(0, nsnaps-1, probes+1).astype(int))
+        if rest == 0 and all(_snap(data, header+k*blocksize) == snap+k
+                             for k in ks):
+            index = UMDIndex(np.arange(snap, snap+nsnaps),
+                             header + blocksize*np.arange(nsnaps))
+    if isinstance(data, mmap.mmap):
+        data.close()
+    return index
+
+
+def load_UMDIndex_from_idx(idx):
+    """
+    Load the UMDIndex stored in a sidecar file.
+
+    Parameters
+    ----------
+    idx : binary input file
+        The sidecar file stream, opened in binary mode.
+
+    Returns
+    -------
+    index : UMDIndex
+        The UMDIndex stored in the sidecar file.
+
+    """
+    table = np.load(idx)
+    index = UMDIndex(table[:, 0], table[:, 1])
+    return index
+
+
+def check_UMDIndex(umd, index):
+    """
+    Check that the last snapshot of a UMDIndex is found at its offset.
+
+    Parameters
+    ----------
+    umd : binary input file
+        The UMD input file stream, opened in binary mode.
+    index : UMDIndex
+        The UMDIndex to check.
+
+    Returns
+    -------
+    valid : bool
+        True if the last snapshot line is found at the indexed offset.
+
+    """
+    if len(index) == 0:
+        return False
+    umd.seek(int(index.offsets[-1]))
+    line = umd.readline()
+    valid = (line.startswith(b'Snapshot:') and
+             int(line[len(b'Snapshot:'):]) == index.snaps[-1])
+    return valid
+
+
+def _map(umd):
+    """
+    Map a binary file in memory, or read it if it cannot be mapped.
+
+    """
+    try:
+        data = mmap.mmap(umd.fileno(), 0, access=mmap.ACCESS_READ)
+    except(io.UnsupportedOperation, AttributeError, ValueError):
+        # Streams without a file descriptor and empty files cannot be mapped.
+        umd.seek(0)
+        data = umd.read()
+    return data
+
+
+def _find(data, start):
+    """
+    Get the offset of the first snapshot section starting after the offset
+    given. If there is no snapshot section, then -1 is returned.
+
+    """
+    if start == 0 and data[:9] == b'Snapshot:':
+        return 0
+    offset = data.find(b'\nSnapshot:', max(start-1, 0))
+    return offset+1 if offset >= 0 else -1
+
+
+def _snap(data, offset):
+    """
+    Get the index of the snapshot whose section starts at the offset given.
+    If no snapshot section starts there, then None is returned.
+
+    """
+    if ((offset > 0 and data[offset-1:offset] != b'\n') or
+            data[offset:offset+9] != b'Snapshot:'):
+        return None
+    end = data.find(b'\n', offset)
+    try:
+        return int(data[offset+9:end if end >= 0 else len(data)])
+    except(ValueError):
+        return None
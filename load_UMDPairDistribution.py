@@ -0,0 +1,201 @@
+"""
+===============================================================================
+                           load_UMDPairDistribution
+===============================================================================
+
+This module provides the functions to compute the radial pair distribution
+functions of the snapshots of a UMD file.
+The snapshot sections are located through the UMDIndex of the UMD file, and
+only the atoms positions are decoded from the memory mapped file, one
+snapshot at a time into the same buffer, and accumulated into the histograms
+of a UMDPairDistribution object.
+The snapshots can also be processed in parallel by a pool of worker
+processes. The snapshots selected are split into ranges of consecutive
+snapshot sections, and each worker maps the UMD file again and accumulates
+its ranges into local histograms, reading only the byte ranges of its
+snapshot sections. Since the histograms are integer counts, merging them in
+the order of the ranges gives the same result of the serial computation,
+whatever the number of workers.
+
+Functions
+---------
+    load_pair_distribution
+    accumulate_UMDPairDistribution_range
+    load_UMDPairDistribution_range
+
+See Also
+--------
+    UMDPairDistribution
+    load_UMDIndex
+    load_UMDTrajectory
+
+"""
+
+
+import mmap
+import numpy as np
+import concurrent.futures as cf
+
+from .libs.UMDSimulation import UMDSimulation
+from .libs.UMDPairDistribution import UMDPairDistribution
+from .load_UMDIndex import load_UMDIndex
+from .load_UMDTrajectory import load_UMDSnapshot_block
+from .load_UMDSnapshot_from_umd import columns_mask
+from .load_UMDSnapshot_from_umd import species_UMDLattice
+
+
+def load_pair_distribution(umdfile, rmax, nbins=200, start=0, stop=None,
+                           step=1, species=None, workers=0):
+    """
+    Compute the radial pair distribution functions of a UMD file.
+
+    The snapshots are selected by their position in the UMD file, as in the
+    slice [start:stop:step].
+
+    Parameters
+    ----------
+    umdfile : string
+        The name of the UMD file.
+    rmax : float
+        The cutoff radius of the distribution functions. It cannot be longer
+        than the spacing of the lattice planes.
+    nbins : int, optional
+        The number of bins of the histograms. The default is 200.
+    start : int, optional
+        The position of the first snapshot. The default is 0.
+    stop : int, optional
+        The position where to stop. If None, the snapshots are selected till
+        the end of the UMD file. The default is None.
+    step : int, optional
+        The step between the positions of the snapshots. The default is 1.
+    species : list, optional
+        The atomic species to load, given as UMDAtom objects or as atomic
+        symbols. If None, all the atoms are loaded. The default is None.
+    workers : int, optional
+        The number of worker processes accumulating the snapshots. If 0, the
+        snapshots are accumulated serially. The default is 0.
+
+    Returns
+    -------
+    simulation : UMDSimulation
+        The UMDSimulation object with the simulation information stored in
+        the UMD file header. If only some species are loaded, its lattice
+        contains only them.
+    pdf : UMDPairDistribution
+        The UMDPairDistribution object with the histograms of all the
+        snapshots selected.
+
+    """
+    with open(umdfile, 'r') as umd:
+        simulation = UMDSimulation.UMDSimulation_from_umd(umd)
+    natoms = simulation.lattice.natoms()
+    lattice, rows = species_UMDLattice(simulation.lattice, species)
+    if species is not None:
+        simulation = UMDSimulation(simulation.name, lattice, simulation.runs)
+    pdf = UMDPairDistribution(lattice, rmax, nbins)
+
+    index = load_UMDIndex(umdfile)
+    positions = np.arange(len(index))[start:stop:step]
+    if len(positions) == 0:
+        return simulation, pdf
+    with open(umdfile, 'rb') as umd:
+        with mmap.mmap(umd.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            ends = np.append(index.offsets[1:], len(data))
+            starts, ends = index.offsets[positions], ends[positions]
+            if not workers:
+                load_UMDPairDistribution_range(data, pdf, starts, ends,
+                                               natoms, rows)
+                return simulation, pdf
+
+    # Each worker accumulates a few ranges of consecutive snapshots, so that
+    # the load is balanced even if the workers do not proceed at the same
+    # speed. The local histograms are merged in the order of the ranges.
+    chunks = np.array_split(np.arange(len(positions)),
+                            min(4*workers, len(positions)))
+    with cf.ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(accumulate_UMDPairDistribution_range, umdfile,
+                               lattice, rmax, nbins, starts[chunk],
+                               ends[chunk], natoms, rows)
+                   for chunk in chunks]
+        for future in futures:
+            pdf.merge(future.result())
+    return simulation, pdf
+
+
+def accumulate_UMDPairDistribution_range(umdfile, lattice, rmax, nbins,
+                                         starts, ends, natoms, rows=None):
+    """
+    Accumulate a range of snapshot sections into local histograms.
+
+    It is the task of the worker processes of the load_pair_distribution
+    function. The UMD file is memory mapped again in the worker process, and
+    only the snapshot sections of the range are read.
+
+    Parameters
+    ----------
+    umdfile : string
+        The name of the UMD file.
+    lattice : UMDLattice
+        The lattice of the atoms loaded.
+    rmax : float
+        The cutoff radius of the distribution functions.
+    nbins : int
+        The number of bins of the histograms.
+    starts : array
+        The byte offsets of the snapshot sections.
+    ends : array
+        The byte offsets of the ends of the snapshot sections.
+    natoms : int
+        The number of atoms in each snapshot.
+    rows : array, optional
+        The indexes of the atoms to decode. If None, all the atoms are
+        decoded. The default is None.
+
+    Returns
+    -------
+    pdf : UMDPairDistribution
+        The UMDPairDistribution object with the histograms of the range.
+
+    """
+    pdf = UMDPairDistribution(lattice, rmax, nbins)
+    with open(umdfile, 'rb') as umd:
+        with mmap.mmap(umd.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            load_UMDPairDistribution_range(data, pdf, starts, ends, natoms,
+                                           rows)
+    return pdf
+
+
+def load_UMDPairDistribution_range(data, pdf, starts, ends, natoms,
+                                   rows=None):
+    """
+    Accumulate the snapshot sections of a UMD file into histograms.
+
+    Only the atoms positions are decoded, into the same buffer for all the
+    snapshots.
+
+    Parameters
+    ----------
+    data : bytes or mmap
+        The content of the UMD file.
+    pdf : UMDPairDistribution
+        The UMDPairDistribution object where the snapshots are accumulated.
+    starts : array
+        The byte offsets of the snapshot sections.
+    ends : array
+        The byte offsets of the ends of the snapshot sections.
+    natoms : int
+        The number of atoms in each snapshot.
+    rows : array, optional
+        The indexes of the atoms to decode. If None, all the atoms are
+        decoded. The default is None.
+
+    Returns
+    -------
+    None.
+
+    """
+    select = columns_mask(('position',))
+    buffer = np.zeros((pdf.lattice.natoms(), 9), dtype=float)
+    for start, end in zip(starts, ends):
+        load_UMDSnapshot_block(data[start:end], natoms, buffer, select, rows)
+        pdf.add(buffer[:, 0:3])
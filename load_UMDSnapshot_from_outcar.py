@@ -156,9 +156,15 @@ def load_UMDSnapshot_from_outcar(outcar, snapshot):
     stress = 0
     energy = 0
 
-    position = np.zeros((natoms, 3), dtype=float)
-    velocity = np.zeros((natoms, 3), dtype=float)
-    force = np.zeros((natoms, 3), dtype=float)
+    dtype = snapshot.dtype
+    if snapshot.buffer is None:
+        position = np.zeros((natoms, 3), dtype=dtype)
+        velocity = np.zeros((natoms, 3), dtype=dtype)
+        force = np.zeros((natoms, 3), dtype=dtype)
+    else:
+        # The dynamics are read directly into the arrays of the snapshot.
+        snapshot.buffer.fill(0)
+        position, velocity, force = snapshot.buffer
     charges = np.zeros(natoms, dtype=float)
     magnets = np.zeros(natoms, dtype=float)
 
@@ -171,7 +177,10 @@ def load_UMDSnapshot_from_outcar(outcar, snapshot):
             stress = load_stress(outcar)
             pressure = np.mean(stress[:3])
         if "FORCES acting on ions" in line:
-            position, force = load_dynamics(outcar, natoms)
+            if snapshot.buffer is None:
+                position, force = load_dynamics(outcar, natoms, dtype)
+            else:
+                load_dynamics(outcar, natoms, dtype, out=(position, force))
         if "ENERGY OF THE ELECTRON-ION-THERMOSTAT SYSTEM (eV)" in line:
             energy, temperature = load_energy(outcar)
 
@@ -297,7 +306,7 @@ def load_stress(outcar):
             return stress
 
 
-def load_dynamics(outcar, natoms):
+def load_dynamics(outcar, natoms, dtype=float, out=None):
     """
     Load the position and the force acting on each atom.
 
@@ -326,6 +335,12 @@ def load_dynamics(outcar, natoms):
         The OUTCAR file.
     natoms : int
         The number of atoms in the lattice.
+    dtype : numpy dtype, optional
+        The floating point type of the position and force arrays.
+        The default is float.
+    out : tuple, optional
+        The position and force arrays (natoms, 3) where to read the values in
+        place. If None, new arrays are allocated. The default is None.
 
     Returns
     -------
@@ -335,14 +350,17 @@ def load_dynamics(outcar, natoms):
         Array of the atoms forces.
 
     """
-    dynamics = np.zeros((natoms, 6), dtype=float)
+    if out is None:
+        dynamics = np.zeros((natoms, 6), dtype=dtype)
+        out = (dynamics[:, :3], dynamics[:, 3:])
+    position, force = out
     for line in outcar:
         if "POSITION" in line and "TOTAL-FORCE (eV/Angst)" in line:
             line = outcar.readline()    # read the separator ---------
             for i in range(natoms):
-                dynamics[i] = outcar.readline().strip().split()
-            position = dynamics[:, :3]
-            force = dynamics[:, 3:]
+                values = outcar.readline().split()
+                position[i] = values[:3]
+                force[i] = values[3:]
             return position, force
 
 
@@ -27,13 +27,34 @@ the snapshot index. Then it is subdevided into two subsections:
          r2_x    r2_y    r2_z    v2_x    v2_y    v2_z    F2_x    F2_y    F2_z
          ...     ...     ...     ...     ...     ...     ...     ...     ...
          rN_x    rN_y    rN_z    vN_x    vN_y    vN_z    FN_x    FN_y    FN_z
+   The columns whose values are all zero can be omitted from the dynamics
+   section. In this case, the dynamics line reports a mask of the columns
+   printed, with 1 for a printed column and 0 for an omitted one:
+       Dynamics: xxxxxxxx.xxx fs Columns: 111000111
+   and the omitted columns are restored as null values.
+
+Since each value is printed in a field 16 characters wide, the readers can
+decode only the columns of some vectors (e.g. columns=("position",)), slicing
+their fields out of the dynamics lines without parsing the others. The vectors
+not decoded are restored as null values, as the omitted columns.
+In the same way, the readers can decode only the atoms of some species (e.g.
+species=["Fe"]), taking their dynamics lines, which are contiguous according
+to the lattice structure, without parsing the lines of the other atoms. The
+snapshot loaded is then described by the lattice containing only the species
+selected.
 """
 
+import itertools
 import numpy as np
+from .libs.UMDAtom import UMDAtom
+from .libs.UMDLattice import UMDLattice
 from .libs.UMDSnapDynamics import UMDSnapDynamics
 from .libs.UMDSnapThermodynamics import UMDSnapThermodynamics
 
 
+VECTORS = ('position', 'velocity', 'force')
+
+
 def load_UMDSnapThermodynamics_from_umd(umd):
     """
     Initialize a UMDSnapThermodynamics object from a UMD file.
@@ -61,7 +82,8 @@ def load_UMDSnapThermodynamics_from_umd(umd):
     raise(EOFError('UMD file ended with UMDSnapTermodynamics uninitialized.'))
 
 
-def load_UMDSnapDynamics_from_umd(umd, natoms):
+def load_UMDSnapDynamics_from_umd(umd, natoms, dtype=float, columns=None,
+                                  rows=None):
     """
     Initialize a UMDSnapDynamics object from a UMD file.
 
@@ -71,6 +93,16 @@ def load_UMDSnapDynamics_from_umd(umd, natoms):
         The UMD input file.
     natoms : int
         The number of atoms in the snapshot.
+    dtype : numpy dtype, optional
+        The floating point type of the dynamics arrays.
+        The default is float.
+    columns : tuple, optional
+        The names of the vectors to decode, among 'position', 'velocity' and
+        'force'. The other vectors are set to zero. If None, all the vectors
+        are decoded. The default is None.
+    rows : array, optional
+        The indexes of the atoms to decode. If None, all the atoms are
+        decoded. The default is None.
 
     Returns
     -------
@@ -80,22 +112,249 @@ def load_UMDSnapDynamics_from_umd(umd, natoms):
     """
     for line in umd:
         if 'Dynamics' in line:
-            time = float(line.strip().split()[-2])
+            time, mask = load_UMDSnapDynamics_header(line)
+            select = columns_mask(columns)
             line = umd.readline()  # We read the header line
-            dynamics = np.zeros((natoms, 9), dtype=float)
-            for i in range(natoms):
-                line = umd.readline().strip().split()
-                dynamics[i] = line
-            position = dynamics[:, 0:3]
-            velocity = dynamics[:, 3:6]
-            force = dynamics[:, 6:9]
+            # The dynamics lines of all the atoms are read as a single chunk.
+            chunk = ''.join(itertools.islice(umd, natoms))
+            dynamics = decode_UMDSnapDynamics(chunk, natoms, mask, dtype,
+                                              select, rows)
+            position, velocity, force = unpack_UMDSnapDynamics(dynamics,
+                                                               mask & select)
             dynamics = UMDSnapDynamics(time=time, position=position,
                                        velocity=velocity, force=force)
             return dynamics
     raise(EOFError('UMD file ended with UMDSnapDynamics uninitialized.'))
 
 
-def load_UMDSnapshot_from_umd(umd, snapshot):
+def decode_UMDSnapDynamics(chunk, natoms, mask, dtype=float, select=None,
+                           rows=None):
+    """
+    Decode the dynamics lines of a snapshot into a single array.
+
+    All the values of the chunk are converted with a single vectorized call,
+    instead of converting each line separately.
+    If only some columns or some atoms are selected and the dynamics lines
+    have the fixed width of 16 characters per value, the fields of the
+    selected columns and atoms are sliced out of the lines and only them are
+    converted. Otherwise, all the values are converted and the selected
+    columns and atoms are taken.
+
+    Parameters
+    ----------
+    chunk : string or bytes
+        The dynamics lines of all the atoms in the snapshot.
+    natoms : int
+        The number of atoms in the snapshot.
+    mask : array
+        The boolean mask of the 9 dynamics columns printed in the UMD file.
+    dtype : numpy dtype, optional
+        The floating point type of the dynamics array.
+        The default is float.
+    select : array, optional
+        The boolean mask of the 9 dynamics columns to decode. If None, all
+        the columns printed are decoded. The default is None.
+    rows : array, optional
+        The indexes of the atoms to decode. If None, all the atoms are
+        decoded. The default is None.
+
+    Raises
+    ------
+    EOFError
+        If the chunk does not contain the dynamics of all the atoms.
+
+    Returns
+    -------
+    dynamics : array (nrows, ncolumns)
+        The dynamics columns printed in the UMD file and selected, for the
+        atoms selected.
+
+    """
+    ncolumns = np.count_nonzero(mask)
+    wanted = np.ones(ncolumns, dtype=bool) if select is None else select[mask]
+    if not np.all(wanted) or rows is not None:
+        width = 16*ncolumns + 1
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        if len(chunk) >= natoms*width:
+            lines = np.frombuffer(chunk, dtype='S1', count=natoms*width)
+            lines = lines.reshape(natoms, width)
+            if np.all(lines[:, -1] == b'\n'):
+                if rows is not None:
+                    lines = lines[rows]
+                fields = lines[:, :-1].reshape(len(lines), ncolumns, 16)
+                fields = np.ascontiguousarray(fields[:, wanted]).view('S16')
+                dynamics = fields.reshape(len(lines), -1).astype(dtype)
+                return dynamics
+    values = chunk.split()
+    if len(values) != natoms*ncolumns:
+        raise(EOFError('UMD file ended with UMDSnapDynamics incomplete.'))
+    dynamics = np.array(values, dtype=dtype).reshape(natoms, ncolumns)
+    if rows is not None:
+        dynamics = dynamics[rows]
+    if not np.all(wanted):
+        dynamics = dynamics[:, wanted]
+    return dynamics
+
+
+def species_UMDLattice(lattice, species=None):
+    """
+    Get the lattice containing only some atomic species and their atoms.
+
+    Parameters
+    ----------
+    lattice : UMDLattice
+        The lattice of the UMD file.
+    species : list, optional
+        The atomic species to select, given as UMDAtom objects or as atomic
+        symbols. If None, all the species are selected. The default is None.
+
+    Raises
+    ------
+    ValueError
+        If a species is not in the lattice.
+
+    Returns
+    -------
+    lattice : UMDLattice
+        The lattice with the same basis and only the species selected, in the
+        same order of the UMD file.
+    rows : array
+        The indexes of the atoms of the species selected. If species is None,
+        then None is returned.
+
+    """
+    if species is None:
+        return lattice, None
+    for specie in species:
+        if not any(isselected(atom, [specie]) for atom in lattice.atoms):
+            raise(ValueError('invalid species {}: '.format(specie)
+                             + 'it is not in the lattice.'))
+    selected = [i for i, atom in enumerate(lattice.species)
+                if isselected(atom, species)]
+    atoms = {lattice.species[i]: int(lattice.counts[i]) for i in selected}
+    rows = np.flatnonzero(np.isin(lattice.types, selected))
+    lattice = UMDLattice(lattice.name, lattice.dirBasis, atoms)
+    return lattice, rows
+
+
+def isselected(atom, species):
+    """
+    Check if an atom belongs to a list of species, given as UMDAtom objects
+    or as atomic symbols.
+
+    """
+    for specie in species:
+        if isinstance(specie, UMDAtom) and specie == atom:
+            return True
+        if isinstance(specie, str) and specie == atom.name:
+            return True
+    return False
+
+
+def columns_mask(columns=None):
+    """
+    Get the boolean mask of the 9 dynamics columns of the vectors given.
+
+    Parameters
+    ----------
+    columns : tuple, optional
+        The names of the vectors, among 'position', 'velocity' and 'force'.
+        If None, all the columns are selected. The default is None.
+
+    Raises
+    ------
+    ValueError
+        If a vector name is unknown.
+
+    Returns
+    -------
+    select : array
+        The boolean mask of the 9 dynamics columns of the vectors.
+
+    """
+    if columns is None:
+        return np.ones(9, dtype=bool)
+    select = np.zeros(9, dtype=bool)
+    for column in columns:
+        if column not in VECTORS:
+            raise(ValueError('invalid column {}: '.format(column)
+                             + 'it must be one of {}.'.format(VECTORS)))
+        i = 3*VECTORS.index(column)
+        select[i:i+3] = True
+    return select
+
+
+def load_UMDSnapDynamics_header(line):
+    """
+    Read the snapshot time and the columns mask from the dynamics line.
+
+    Parameters
+    ----------
+    line : string
+        The dynamics line, "Dynamics: xxxxxxxx.xxx fs [Columns: xxxxxxxxx]".
+
+    Returns
+    -------
+    time : float
+        The snapshot time duration in fs.
+    mask : array
+        The boolean mask of the 9 dynamics columns printed in the UMD file.
+
+    """
+    words = line.split()
+    time = float(words[1])
+    mask = np.ones(9, dtype=bool)
+    if 'Columns:' in words:
+        columns = words[words.index('Columns:')+1]
+        mask = np.array([c == '1' for c in columns], dtype=bool)
+    return time, mask
+
+
+def unpack_UMDSnapDynamics(dynamics, mask):
+    """
+    Split the dynamics columns into the position, velocity and force arrays.
+
+    The vectors whose columns are all omitted are restored as a read-only
+    null array shared by all the atoms, which does not allocate memory.
+
+    Parameters
+    ----------
+    dynamics : array (natoms, ncolumns)
+        The dynamics columns printed in the UMD file.
+    mask : array
+        The boolean mask of the 9 dynamics columns printed in the UMD file.
+
+    Returns
+    -------
+    position : array (natoms, 3)
+        Array of the atoms positions.
+    velocity : array (natoms, 3)
+        Array of the atoms velocities.
+    force : array (natoms, 3)
+        Array of the atoms forces.
+
+    """
+    if np.all(mask):
+        return dynamics[:, 0:3], dynamics[:, 3:6], dynamics[:, 6:9]
+    natoms = len(dynamics)
+    columns = np.cumsum(mask) - 1
+    vectors = []
+    for i in range(0, 9, 3):
+        vmask = mask[i:i+3]
+        if not np.any(vmask):
+            zeros = np.zeros(1, dtype=dynamics.dtype)
+            vectors.append(np.broadcast_to(zeros, (natoms, 3)))
+        elif np.all(vmask):
+            vectors.append(dynamics[:, columns[i]:columns[i]+3])
+        else:
+            vector = np.zeros((natoms, 3), dtype=dynamics.dtype)
+            vector[:, vmask] = dynamics[:, columns[i:i+3][vmask]]
+            vectors.append(vector)
+    return tuple(vectors)
+
+
+def load_UMDSnapshot_from_umd(umd, snapshot, columns=None):
     """
     Initialize a UMDSnapshot object from a UMD file.
 
@@ -105,6 +364,9 @@ def load_UMDSnapshot_from_umd(umd, snapshot):
         The UMD input file.
     snapshot : UMDSnapshot
         The UMDSnapshot object with the snapshot data.
+    columns : tuple, optional
+        The names of the vectors to decode, among 'position', 'velocity' and
+        'force'. If None, all the vectors are decoded. The default is None.
 
     Returns
     -------
@@ -113,7 +375,8 @@ def load_UMDSnapshot_from_umd(umd, snapshot):
 
     """
     thermodynamics = load_UMDSnapThermodynamics_from_umd(umd)
-    dynamics = load_UMDSnapDynamics_from_umd(umd, snapshot.natoms)
+    dynamics = load_UMDSnapDynamics_from_umd(umd, snapshot.natoms,
+                                             snapshot.dtype, columns)
     snapshot.setDynamics(dynamics)
     snapshot.setThermodynamics(thermodynamics)
     return snapshot
@@ -0,0 +1,209 @@
+"""
+===============================================================================
+                            load_UMDThermodynamics
+===============================================================================
+
+This module provides the functions to load only the thermodynamic quantities
+of the snapshots of a UMD file, without decoding their dynamics.
+The beginning of each snapshot section is located through the UMDIndex of the
+UMD file, and only its first lines (the "Snapshot:" line, the thermodynamics
+lines and the "Dynamics:" line) are read from the memory mapped file, while
+the dynamics lines of the atoms are skipped.
+The thermodynamic series are stored in a sidecar file, named as the UMD file
+with the additional '.thermo' extension, together with the size and the
+modification time of the UMD file and the number of snapshots, so that the
+following calls do not read the UMD file at all, nor build its UMDIndex.
+If the sidecar file is missing, or the UMD file has been modified since it was
+written, or its series do not have the stored number of snapshots, the series
+are loaded again from the UMD file and the sidecar file is written again.
+
+Functions
+---------
+    load_thermodynamics
+    load_thermodynamics_from_umd
+    load_thermodynamics_from_thermo
+    check_thermodynamics
+    save_thermodynamics
+
+See Also
+--------
+    load_UMDIndex
+    load_UMDTrajectory
+
+"""
+
+
+import os
+import mmap
+import numpy as np
+
+from .load_UMDIndex import load_UMDIndex
+from .load_UMDTrajectory import THERMODYNAMICS
+from .load_UMDTrajectory import load_UMDSnapshot_head
+
+
+# The number of bytes read at the beginning of each snapshot section, large
+# enough to contain the lines before the dynamics ones.
+HEADSIZE = 512
+
+# The keys of the thermodynamic series and of the UMD file stamp stored in
+# the sidecar file.
+SERIES = ('snap',) + THERMODYNAMICS
+STAMP = ('size', 'mtime', 'nsnaps')
+
+
+def load_thermodynamics(umdfile):
+    """
+    Load the thermodynamic quantities of all the snapshots of a UMD file.
+
+    The series are loaded from the sidecar file when it is valid, otherwise
+    the UMDIndex of the UMD file is loaded, the series are loaded from the
+    UMD file and the sidecar file is written again.
+    If the sidecar file cannot be written (e.g. in a read only directory),
+    the series are simply returned.
+
+    Parameters
+    ----------
+    umdfile : string
+        The name of the UMD file.
+
+    Returns
+    -------
+    thermodynamics : dict
+        The vectors of the snapshots 'snap' index, 'time' duration (fs),
+        'temperature' (K), 'pressure' (GPa) and 'energy' (eV).
+
+    """
+    thermofile = umdfile + '.thermo'
+    stat = os.stat(umdfile)
+    if os.path.isfile(thermofile):
+        with open(thermofile, 'rb') as thermo:
+            thermodynamics = load_thermodynamics_from_thermo(thermo)
+        if check_thermodynamics(thermodynamics, stat):
+            return {key: thermodynamics[key] for key in SERIES}
+    index = load_UMDIndex(umdfile)
+    with open(umdfile, 'rb') as umd:
+        thermodynamics = load_thermodynamics_from_umd(umd, index)
+    try:
+        with open(thermofile, 'wb') as thermo:
+            save_thermodynamics(thermo, thermodynamics, stat)
+    except(OSError):
+        pass
+    return thermodynamics
+
+
+def load_thermodynamics_from_umd(umd, index):
+    """
+    Load the thermodynamic quantities of the snapshots from a UMD file.
+
+    Only the first lines of each snapshot section are read, while the
+    dynamics lines are skipped.
+
+    Parameters
+    ----------
+    umd : binary input file
+        The UMD input file stream, opened in binary mode.
+    index : UMDIndex
+        The UMDIndex of the UMD file.
+
+    Returns
+    -------
+    thermodynamics : dict
+        The vectors of the snapshots 'snap' index, 'time' duration (fs),
+        'temperature' (K), 'pressure' (GPa) and 'energy' (eV).
+
+    """
+    nsnaps = len(index)
+    thermodynamics = {key: np.zeros(nsnaps) for key in THERMODYNAMICS}
+    thermodynamics['snap'] = index.snaps.copy()
+    if nsnaps == 0:
+        return thermodynamics
+    with mmap.mmap(umd.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        ends = np.append(index.offsets[1:], len(data))
+        for i, (start, end) in enumerate(zip(index.offsets, ends)):
+            lines = data[start:min(start+HEADSIZE, end)].split(b'\n', 6)
+            if len(lines) < 7:
+                lines = data[start:end].split(b'\n', 6)
+            thermo, _ = load_UMDSnapshot_head(lines)
+            for key, value in thermo.items():
+                thermodynamics[key][i] = value
+    return thermodynamics
+
+
+def load_thermodynamics_from_thermo(thermo):
+    """
+    Load the thermodynamic series stored in a sidecar file.
+
+    Parameters
+    ----------
+    thermo : binary input file
+        The sidecar file stream, opened in binary mode.
+
+    Returns
+    -------
+    thermodynamics : dict
+        The vectors of the snapshots 'snap' index, 'time' duration (fs),
+        'temperature' (K), 'pressure' (GPa) and 'energy' (eV), and the
+        'size', 'mtime' and 'nsnaps' stamp of the UMD file, if stored.
+
+    """
+    with np.load(thermo) as table:
+        thermodynamics = {key: table[key] for key in table.files}
+    return thermodynamics
+
+
+def check_thermodynamics(thermodynamics, stat):
+    """
+    Check if the series of a sidecar file are valid for the UMD file.
+
+    The size and the modification time of the UMD file stored in the sidecar
+    file must be equal to the current ones, and all the series must have the
+    stored number of snapshots.
+
+    Parameters
+    ----------
+    thermodynamics : dict
+        The series and the stamp loaded from the sidecar file.
+    stat : os.stat_result
+        The status of the UMD file.
+
+    Returns
+    -------
+    bool
+        True if the series are valid.
+
+    """
+    if any(key not in thermodynamics for key in SERIES + STAMP):
+        return False
+    nsnaps = thermodynamics['nsnaps']
+    return (thermodynamics['size'] == stat.st_size
+            and thermodynamics['mtime'] == stat.st_mtime_ns
+            and all(len(thermodynamics[key]) == nsnaps for key in SERIES))
+
+
+def save_thermodynamics(outfile, thermodynamics, stat=None):
+    """
+    Print the thermodynamic series on a binary output stream.
+
+    Parameters
+    ----------
+    outfile : binary output stream
+        The output stream where to print the series.
+    thermodynamics : dict
+        The vectors of the snapshots 'snap' index, 'time' duration (fs),
+        'temperature' (K), 'pressure' (GPa) and 'energy' (eV).
+    stat : os.stat_result, optional
+        The status of the UMD file, taken before loading the series, whose
+        size and modification time are printed together with the number of
+        snapshots. The default is None.
+
+    Returns
+    -------
+    None.
+
+    """
+    if stat is not None:
+        thermodynamics = dict(thermodynamics, size=stat.st_size,
+                              mtime=stat.st_mtime_ns,
+                              nsnaps=len(thermodynamics['snap']))
+    np.savez(outfile, **thermodynamics)
@@ -0,0 +1,432 @@
+"""
+===============================================================================
+                              load_UMDTrajectory
+===============================================================================
+
+This module provides the functions to load the snapshots of a UMD file
+directly from their sections in the memory mapped file, without reading the
+file line by line.
+The load_trajectory function loads all the snapshots at once into a
+UMDTrajectoryArrays object.
+The number of snapshots and the number of atoms are known from the UMD header,
+so the contiguous position, velocity and force arrays of the whole trajectory
+and a single vector for each thermodynamic quantity are allocated at once.
+Then the UMD file is memory mapped and each snapshot section, located through
+the UMDIndex of the file, is decoded directly into its rows of the arrays,
+without building any UMDSnapshot object.
+The iter_snapshots generator streams the snapshots one by one, so that the
+memory used does not depend on the length of the trajectory. Optionally, the
+same buffer is reused for all the snapshots, so that no array is allocated
+after the first snapshot.
+The snapshots can also be decoded in parallel by a pool of worker processes.
+The UMD file is split into ranges of consecutive snapshot sections, and each
+worker decodes its ranges directly into the dynamics arrays, which are
+allocated in shared memory. In this way, only the thermodynamic vectors are
+sent back to the main process, while the dynamics are never pickled.
+
+Functions
+---------
+    load_trajectory
+    iter_snapshots
+    load_UMDSnapshot_range
+    decode_UMDSnapshot_range
+    load_UMDSnapshot_block
+    load_UMDSnapshot_head
+
+See Also
+--------
+    UMDTrajectoryArrays
+    load_UMDIndex
+    load_UMDSnapshot_from_umd
+
+"""
+
+
+import mmap
+import weakref
+import numpy as np
+import concurrent.futures as cf
+from multiprocessing import shared_memory
+
+from .libs.UMDSnapshot import UMDSnapshot
+from .libs.UMDSimulation import UMDSimulation
+from .libs.UMDTrajectoryArrays import UMDTrajectoryArrays
+from .load_UMDIndex import load_UMDIndex
+from .load_UMDSnapshot_from_umd import decode_UMDSnapDynamics
+from .load_UMDSnapshot_from_umd import load_UMDSnapDynamics_header
+from .load_UMDSnapshot_from_umd import columns_mask
+from .load_UMDSnapshot_from_umd import species_UMDLattice
+
+
+THERMODYNAMICS = ('time', 'temperature', 'pressure', 'energy')
+
+
+def load_trajectory(umdfile, dtype=float, columns=None, species=None,
+                    workers=0):
+    """
+    Load all the snapshots of a UMD file into a UMDTrajectoryArrays object.
+
+    Parameters
+    ----------
+    umdfile : string
+        The name of the UMD file.
+    dtype : numpy dtype, optional
+        The floating point type of the dynamics arrays.
+        The default is float.
+    columns : tuple, optional
+        The names of the vectors to load, among 'position', 'velocity' and
+        'force'. The other vectors are set to zero. If None,
+        all the vectors are loaded. The default is None.
+    species : list, optional
+        The atomic species to load, given as UMDAtom objects or as atomic
+        symbols. If None, all the atoms are loaded. The default is None.
+    workers : int, optional
+        The number of worker processes decoding the snapshots. If 0, the
+        snapshots are decoded serially. The default is 0.
+
+    Raises
+    ------
+    EOFError
+        If the number of snapshots in the UMD file is different from the
+        total number of steps reported in its header.
+
+    Returns
+    -------
+    simulation : UMDSimulation
+        The UMDSimulation object with the simulation information stored in
+        the UMD file header. If only some species are loaded, its lattice
+        contains only them.
+    trajectory : UMDTrajectoryArrays
+        The UMDTrajectoryArrays object with the thermodynamic quantities and
+        the positions, velocities and forces of the atoms in each snapshot.
+        If workers is given, its vectors array is stored in shared memory,
+        which is released when the array is deleted.
+
+    """
+    with open(umdfile, 'r') as umd:
+        simulation = UMDSimulation.UMDSimulation_from_umd(umd)
+    select = columns_mask(columns)
+    nsnaps = simulation.steps()
+    natoms = simulation.lattice.natoms()
+    lattice, rows = species_UMDLattice(simulation.lattice, species)
+    if species is not None:
+        simulation = UMDSimulation(simulation.name, lattice, simulation.runs)
+
+    index = load_UMDIndex(umdfile)
+    if len(index) != nsnaps:
+        raise(EOFError('UMD file contains {} snapshots '.format(len(index))
+                       + 'instead of {}.'.format(nsnaps)))
+
+    if nsnaps == 0:
+        return simulation, UMDTrajectoryArrays(0, lattice, dtype)
+
+    with open(umdfile, 'rb') as umd:
+        with mmap.mmap(umd.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            ends = np.append(index.offsets[1:], len(data))
+            if not workers:
+                trajectory = UMDTrajectoryArrays(nsnaps, lattice, dtype)
+                thermo = load_UMDSnapshot_range(data, index.offsets, ends,
+                                                natoms, trajectory.vectors,
+                                                select, rows)
+                _fill(trajectory, index.snaps, thermo)
+                return simulation, trajectory
+
+    # Each worker decodes a few ranges of consecutive snapshots, so that the
+    # load is balanced even if the workers do not proceed at the same speed.
+    chunks = np.array_split(np.arange(nsnaps), min(4*workers, nsnaps))
+    shape = (3, nsnaps, lattice.natoms(), 3)
+    size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    vectors = None
+    try:
+        vectors = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        trajectory = UMDTrajectoryArrays(nsnaps, lattice, dtype, vectors)
+        thermodynamics = {key: np.zeros(nsnaps) for key in THERMODYNAMICS}
+        with cf.ProcessPoolExecutor(workers) as pool:
+            futures = [pool.submit(decode_UMDSnapshot_range, umdfile,
+                                   shm.name, shape, dtype, chunk[0],
+                                   index.offsets[chunk], ends[chunk], natoms,
+                                   select, rows)
+                       for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                thermo = future.result()
+                for key, value in thermo.items():
+                    thermodynamics[key][chunk] = value
+        _fill(trajectory, index.snaps, thermodynamics)
+    except BaseException:
+        vectors = trajectory = None
+        shm.close()
+        raise
+    finally:
+        # The name is removed at once, while the memory is kept mapped till
+        # the vectors array is deleted.
+        shm.unlink()
+    weakref.finalize(vectors, shm.close)
+    return simulation, trajectory
+
+
+def iter_snapshots(umdfile, start=0, stop=None, step=1, reuse=False,
+                   arrays=False, dtype=float, columns=None, species=None):
+    """
+    Iterate over the snapshots of a UMD file.
+
+    The snapshots are selected by their position in the UMD file, as in the
+    slice [start:stop:step], and they are loaded one at a time.
+
+    Parameters
+    ----------
+    umdfile : string
+        The name of the UMD file.
+    start : int, optional
+        The position of the first snapshot. The default is 0.
+    stop : int, optional
+        The position where to stop. If None, the iteration continues till the
+        end of the UMD file. The default is None.
+    step : int, optional
+        The step between the positions of the snapshots. The default is 1.
+    reuse : bool, optional
+        If True, the same buffer (and the same UMDSnapshot object) is filled
+        by each snapshot, so it is valid only till the next iteration and it
+        must be copied to be kept. The default is False.
+    arrays : bool, optional
+        If True, the raw (natoms, 9) array of positions, velocities and
+        forces is yielded instead of the UMDSnapshot object.
+        The default is False.
+    dtype : numpy dtype, optional
+        The floating point type of the dynamics arrays.
+        The default is float.
+    columns : tuple, optional
+        The names of the vectors to load, among 'position', 'velocity' and
+        'force'. The other vectors are set to zero. If None, all the vectors
+        are loaded. The default is None.
+    species : list, optional
+        The atomic species to load, given as UMDAtom objects or as atomic
+        symbols. The snapshots yielded are described by the lattice with
+        only them. If None, all the atoms are loaded. The default is None.
+
+    Yields
+    ------
+    snapshot : UMDSnapshot or array (natoms, 9)
+        The next snapshot selected.
+
+    """
+    with open(umdfile, 'r') as umd:
+        simulation = UMDSimulation.UMDSimulation_from_umd(umd)
+    natoms = simulation.lattice.natoms()
+    lattice, rows = species_UMDLattice(simulation.lattice, species)
+    select = columns_mask(columns)
+    index = load_UMDIndex(umdfile)
+    positions = range(*slice(start, stop, step).indices(len(index)))
+    if len(positions) == 0:
+        return
+
+    buffer = np.zeros((lattice.natoms(), 9), dtype=dtype)
+    snapshot = UMDSnapshot(lattice=lattice, dtype=dtype)
+    with open(umdfile, 'rb') as umd:
+        with mmap.mmap(umd.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            ends = np.append(index.offsets[1:], len(data))
+            for i in positions:
+                if not reuse:
+                    buffer = np.zeros((lattice.natoms(), 9), dtype=dtype)
+                    snapshot = UMDSnapshot(lattice=lattice, dtype=dtype)
+                block = data[index.offsets[i]:ends[i]]
+                thermo = load_UMDSnapshot_block(block, natoms, buffer, select,
+                                                rows)
+                if arrays:
+                    yield buffer
+                    continue
+                snapshot.snap = int(index.snaps[i])
+                snapshot.setThermodynamics(temperature=thermo['temperature'],
+                                           pressure=thermo['pressure'],
+                                           energy=thermo['energy'])
+                snapshot.setDynamics(position=buffer[:, 0:3],
+                                     velocity=buffer[:, 3:6],
+                                     force=buffer[:, 6:9],
+                                     time=thermo['time'])
+                yield snapshot
+
+
+def load_UMDSnapshot_range(data, starts, ends, natoms, out, select=None,
+                           rows=None):
+    """
+    Decode a range of consecutive snapshot sections of a UMD file.
+
+    Parameters
+    ----------
+    data : bytes or mmap
+        The content of the UMD file.
+    starts : array
+        The byte offsets of the snapshot sections.
+    ends : array
+        The byte offsets of the ends of the snapshot sections.
+    natoms : int
+        The number of atoms in each snapshot.
+    out : array (3, nsnaps, nrows, 3)
+        The array where the positions, velocities and forces of the snapshots
+        are stored, as the vectors array of a UMDTrajectoryArrays object.
+    select : array, optional
+        The boolean mask of the 9 dynamics columns to decode. If None, all
+        the columns printed are decoded. The default is None.
+    rows : array, optional
+        The indexes of the atoms to decode. If None, all the atoms are
+        decoded. The default is None.
+
+    Returns
+    -------
+    thermodynamics : dict
+        The vectors of the snapshots 'time' duration (fs), 'temperature' (K),
+        'pressure' (GPa) and 'energy' (eV).
+
+    """
+    thermodynamics = {key: np.zeros(len(starts)) for key in THERMODYNAMICS}
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        thermo = load_UMDSnapshot_block(data[start:end], natoms,
+                                        np.moveaxis(out[:, i], 0, 1), select,
+                                        rows)
+        for key, value in thermo.items():
+            thermodynamics[key][i] = value
+    return thermodynamics
+
+
+def decode_UMDSnapshot_range(umdfile, name, shape, dtype, first, starts, ends,
+                             natoms, select=None, rows=None):
+    """
+    Decode a range of consecutive snapshot sections into a shared array.
+
+    It is the task of the worker processes of the load_trajectory function.
+    The UMD file is memory mapped again in the worker process, and the
+    vectors are stored directly in the shared memory block of the whole
+    trajectory, starting from the position of the first snapshot.
+
+    Parameters
+    ----------
+    umdfile : string
+        The name of the UMD file.
+    name : string
+        The name of the shared memory block of the dynamics array.
+    shape : tuple
+        The (3, nsnaps, nrows, 3) shape of the vectors array.
+    dtype : numpy dtype
+        The floating point type of the dynamics array.
+    first : int
+        The position of the first snapshot of the range in the UMD file.
+    starts : array
+        The byte offsets of the snapshot sections.
+    ends : array
+        The byte offsets of the ends of the snapshot sections.
+    natoms : int
+        The number of atoms in each snapshot.
+    select : array, optional
+        The boolean mask of the 9 dynamics columns to decode. If None, all
+        the columns printed are decoded. The default is None.
+    rows : array, optional
+        The indexes of the atoms to decode. If None, all the atoms are
+        decoded. The default is None.
+
+    Returns
+    -------
+    thermodynamics : dict
+        The vectors of the snapshots 'time' duration (fs), 'temperature' (K),
+        'pressure' (GPa) and 'energy' (eV).
+
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    out = None
+    try:
+        out = np.ndarray(shape, dtype=dtype, buffer=shm.buf)[:, first:]
+        with open(umdfile, 'rb') as umd:
+            with mmap.mmap(umd.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                thermodynamics = load_UMDSnapshot_range(data, starts, ends,
+                                                        natoms, out, select,
+                                                        rows)
+    finally:
+        out = None
+        shm.close()
+    return thermodynamics
+
+
+def load_UMDSnapshot_block(block, natoms, out, select=None, rows=None):
+    """
+    Decode a snapshot section of a UMD file.
+
+    The snapshot section has the fixed structure written by the
+    UMDSnapshot.save function: the "Snapshot:" line, the four thermodynamics
+    lines, the "Dynamics:" line, the columns header line and the dynamics
+    lines of all the atoms.
+
+    Parameters
+    ----------
+    block : bytes
+        The snapshot section.
+    natoms : int
+        The number of atoms in the snapshot.
+    out : array (nrows, 9) or (nrows, 3, 3)
+        The array where the dynamics of the snapshot are stored, either as
+        the 9 columns of the UMD file or as the position, velocity and force
+        vectors of each atom. The omitted and the not selected columns are
+        set to zero.
+    select : array, optional
+        The boolean mask of the 9 dynamics columns to decode. If None, all
+        the columns printed are decoded. The default is None.
+    rows : array, optional
+        The indexes of the atoms to decode. If None, all the atoms are
+        decoded. The default is None.
+
+    Returns
+    -------
+    thermo : dict
+        The snapshot 'time' duration (fs), 'temperature' (K), 'pressure' (GPa)
+        and 'energy' (eV).
+
+    """
+    lines = block.split(b'\n', 7)
+    thermo, mask = load_UMDSnapshot_head(lines)
+    dynamics = decode_UMDSnapDynamics(lines[7], natoms, mask, out.dtype,
+                                      select, rows)
+    if select is not None:
+        mask = mask & select
+    if not np.all(mask):
+        columns = dynamics
+        dynamics = np.zeros((len(columns), 9), dtype=out.dtype)
+        dynamics[:, mask] = columns
+    out[...] = dynamics.reshape(out.shape)
+    return thermo
+
+
+def _fill(trajectory, snaps, thermodynamics):
+    """
+    Copy the snapshots indexes and thermodynamic series into a
+    UMDTrajectoryArrays object.
+
+    """
+    trajectory.snap[:] = snaps
+    for key, value in thermodynamics.items():
+        getattr(trajectory, key)[:] = value
+
+
+def load_UMDSnapshot_head(lines):
+    """
+    Decode the thermodynamics and the dynamics header of a snapshot section.
+
+    Parameters
+    ----------
+    lines : list
+        The first six lines of the snapshot section, as bytes: the
+        "Snapshot:" line, the four thermodynamics lines and the "Dynamics:"
+        line. Further lines are ignored.
+
+    Returns
+    -------
+    thermo : dict
+        The snapshot 'time' duration (fs), 'temperature' (K), 'pressure' (GPa)
+        and 'energy' (eV).
+    mask : array
+        The boolean mask of the 9 dynamics columns printed.
+
+    """
+    time, mask = load_UMDSnapDynamics_header(lines[5].decode())
+    thermo = {'time': time,
+              'temperature': float(lines[2].split()[-2]),
+              'pressure': float(lines[3].split()[-2]),
+              'energy': float(lines[4].split()[-2])}
+    return thermo, mask
@@ -0,0 +1,191 @@
+"""
+===============================================================================
+                             UMDCodec class tests
+===============================================================================
+"""
+
+from ..libs.UMDCodec import UMDCodec, HEADER, BLOCK, STREAM
+
+import io
+import struct
+import pytest
+import numpy as np
+import hypothesis as hp
+import hypothesis.strategies as st
+
+from ..libs.UMDAtom import UMDAtom
+from ..libs.UMDLattice import UMDLattice
+from ..libs.UMDSnapDynamics import UMDSnapDynamics
+from ..libs.UMDTrajectoryArrays import UMDTrajectoryArrays
+from .test_scenarios import getNumpyArray
+
+
+class TestUMDCodec:
+    """
+    The unit tests implemented test an instance of the UMDCodec class with a
+    precision of 1e-4 and blocks of 2 frames, used to compress a trajectory
+    of 3 frames of 2 atoms.
+
+    """
+    codec = UMDCodec(precision=1e-4, blocksize=2)
+    frames = np.array([[[0.12345, 1.00000, 2.50000],
+                        [5.69999, 0.00001, 3.33333]],
+                       [[0.12355, 1.00010, 2.49990],
+                        [5.69989, 0.00011, 3.33343]],
+                       [[0.12365, 1.00020, 2.49980],
+                        [0.00021, 0.00021, 3.33353]]])
+
+    # %% UMDCodec __init__ function tests
+    def test_UMDCodec_init_default(self):
+        """
+        Test the __init__ function default constructor.
+
+        """
+        codec = UMDCodec()
+        assert codec.precision == 1e-4
+        assert codec.blocksize == 100
+
+    def test_UMDCodec_init_ValueError(self):
+        """
+        Test the __init__ function with non positive precision or blocksize.
+        A ValueError is raised.
+
+        """
+        with pytest.raises(ValueError):
+            UMDCodec(precision=0)
+        with pytest.raises(ValueError):
+            UMDCodec(blocksize=0)
+
+    # %% UMDCodec encode and decode functions tests
+    def test_UMDCodec_decode_encode(self):
+        """
+        Test the decode function on the data compressed by the encode function.
+        The decoded frames must be equal to the original ones within half of
+        the precision.
+
+        """
+        frames = self.codec.decode(self.codec.encode(self.frames))
+        assert frames.shape == self.frames.shape
+        assert np.all(np.abs(frames - self.frames) <= 0.5e-4)
+
+    def test_UMDCodec_encode_itemsize(self):
+        """
+        Test the encode function on a smooth trajectory of 100 frames of 50
+        atoms around 10 Angstrom. The key frame is stored as 4-byte integers,
+        while the deltas of about 10 precision units are stored as 1-byte
+        integers.
+
+        """
+        rng = np.random.default_rng(0)
+        steps = rng.uniform(-1e-3, 1e-3, (100, 50, 3))
+        steps[0] = rng.uniform(9.0, 11.0, (50, 3))
+        frames = np.cumsum(steps, axis=0)
+        codec = UMDCodec(precision=1e-4, blocksize=100)
+        data = codec.encode(frames)
+        keysize, itemsize, _ = BLOCK.unpack_from(data, HEADER.size)
+        assert (keysize, itemsize) == (4, 1)
+        assert len(data) < frames.astype(np.float32).nbytes/4
+        assert np.all(np.abs(codec.decode(data) - frames) <= 0.5e-4)
+
+    def test_UMDCodec_decode_float32(self):
+        """
+        Test the decode function returning single precision frames.
+
+        """
+        frames = self.codec.decode(self.codec.encode(self.frames), np.float32)
+        assert frames.dtype == np.float32
+        assert np.allclose(frames, self.frames, atol=1e-4)
+
+    def test_UMDCodec_decode_rows(self):
+        """
+        Test the decode function reconstructing only the second atom.
+
+        """
+        data = self.codec.encode(self.frames)
+        frames = self.codec.decode(data, rows=[1])
+        assert frames.shape == (3, 1, 3)
+        assert np.array_equal(frames, self.codec.decode(data)[:, 1:2])
+
+    def test_UMDCodec_decode_ValueError(self):
+        """
+        Test the decode function on data not compressed by a UMDCodec.
+        A ValueError is raised.
+
+        """
+        data = b'XXXX' + self.codec.encode(self.frames)[4:]
+        with pytest.raises(ValueError):
+            self.codec.decode(data)
+
+    # %% UMDCodec save and load functions tests
+    def test_UMDCodec_load_save(self):
+        """
+        Test the load function on a stream written by the save function.
+        The positions and the forces are restored, while the velocities are
+        null.
+
+        """
+        dynamics = [UMDSnapDynamics(0.5, frame, frame, -frame)
+                    for frame in self.frames]
+        stream = io.BytesIO()
+        self.codec.save(stream, dynamics)
+        stream.seek(0)
+        loaded = self.codec.load(stream)
+        assert len(loaded) == len(dynamics)
+        for snap, ref in zip(loaded, dynamics):
+            assert snap.time == ref.time
+            assert np.allclose(snap.position, ref.position, atol=0.5e-4)
+            assert np.allclose(snap.force, ref.force, atol=0.5e-4)
+            assert np.array_equal(snap.velocity, np.zeros((2, 3)))
+
+    def test_UMDCodec_load_ValueError(self):
+        """
+        Test the load function on a stream of an older format version, whose
+        header has 32-bit lengths. A ValueError is raised.
+
+        """
+        dynamics = [UMDSnapDynamics(0.5, frame, frame, -frame)
+                    for frame in self.frames]
+        stream = io.BytesIO()
+        self.codec.save(stream, dynamics)
+        header = STREAM.unpack_from(stream.getvalue(), 0)
+        assert header[2:4] == (3, len(self.codec.encode(self.frames)))
+        data = stream.getvalue()[STREAM.size:]
+        data = struct.pack('<iii', *header[2:]) + data
+        with pytest.raises(ValueError):
+            self.codec.load(io.BytesIO(data))
+
+    def test_UMDCodec_save_arrays(self):
+        """
+        Test the save function on a UMDTrajectoryArrays object. The stream
+        must be equal to the one written from the list of its snapshots.
+
+        """
+        lattice = UMDLattice(atoms={UMDAtom(name='H'): 2})
+        trajectory = UMDTrajectoryArrays(3, lattice)
+        trajectory.time[:] = 0.5
+        trajectory.position[:] = self.frames
+        trajectory.force[:] = -self.frames
+        stream = io.BytesIO()
+        self.codec.save(stream, trajectory)
+        reference = io.BytesIO()
+        self.codec.save(reference, list(trajectory))
+        assert stream.getvalue() == reference.getvalue()
+
+
+# %% ===================================================================== %% #
+# %% UMDCodec hypothesis tests
+@hp.given(data=st.data(), nframes=st.integers(1, 20),
+          natoms=st.integers(1, 20),
+          blocksize=st.integers(1, 10),
+          precision=st.sampled_from([1e-2, 1e-3, 1e-4, 1e-5]))
+def test_UMDCodec_maximum_error(data, nframes, natoms, blocksize, precision):
+    """
+    Test the decode function on the data compressed by the encode function.
+    The decoded values must differ from the original ones by at most half of
+    the precision.
+
+    """
+    frames = data.draw(getNumpyArray(nframes, natoms, 3, max_value=10))
+    codec = UMDCodec(precision, blocksize)
+    decoded = codec.decode(codec.encode(frames))
+    assert np.all(np.abs(decoded - frames) <= 0.5*precision*(1+1e-9))
@@ -0,0 +1,106 @@
+"""
+===============================================================================
+                             UMDIndex class tests
+===============================================================================
+"""
+
+
+from ..libs.UMDIndex import UMDIndex
+
+import io
+import pytest
+import numpy as np
+import hypothesis as hp
+import hypothesis.strategies as st
+
+
+class TestUMDIndex:
+    """
+    The unit tests implemented test an instance of the UMDIndex class with
+    four snapshots, numbered from 10 to 13, each 100 bytes long after a 50
+    bytes header.
+
+    """
+    snaps = [10, 11, 12, 13]
+    offsets = [50, 150, 250, 350]
+    index = UMDIndex(snaps, offsets)
+
+    # %% UMDIndex __init__ function tests
+    def test_UMDIndex_init_default(self):
+        """
+        Test the __init__ function default constructor.
+
+        """
+        index = UMDIndex()
+        assert len(index) == 0
+        assert index.offset(0) is None
+
+    def test_UMDIndex_init_ValueError(self):
+        """
+        Test the __init__ function with snaps and offsets of different
+        lengths. A ValueError is raised.
+
+        """
+        with pytest.raises(ValueError):
+            UMDIndex([0, 1], [0])
+
+    # %% UMDIndex offset function tests
+    def test_UMDIndex_offset(self):
+        """
+        Test the offset function for the snapshots in the index.
+
+        """
+        assert self.index.contiguous
+        for snap, offset in zip(self.snaps, self.offsets):
+            assert self.index.offset(snap) == offset
+
+    def test_UMDIndex_offset_missing(self):
+        """
+        Test the offset function for snapshots not in the index.
+        None is returned.
+
+        """
+        assert self.index.offset(9) is None
+        assert self.index.offset(14) is None
+
+    def test_UMDIndex_offset_noncontiguous(self):
+        """
+        Test the offset function for an index with missing snapshots.
+
+        """
+        index = UMDIndex([0, 2, 5], [50, 150, 250])
+        assert not index.contiguous
+        assert index.offset(2) == 150
+        assert index.offset(3) is None
+        assert index.offset(6) is None
+
+    # %% UMDIndex save function tests
+    def test_UMDIndex_save(self):
+        """
+        Test the save function. The table stored has a row for each snapshot
+        with its index and its offset.
+
+        """
+        idx = io.BytesIO()
+        self.index.save(idx)
+        idx.seek(0)
+        table = np.load(idx)
+        assert np.array_equal(table, np.array([self.snaps, self.offsets]).T)
+
+
+# %% ===================================================================== %% #
+# %% UMDIndex hypothesis tests
+@hp.given(snaps=st.lists(st.integers(0, 10**6), unique=True, max_size=50),
+          snap=st.integers(0, 10**6))
+def test_UMDIndex_offset(snaps, snap):
+    """
+    Test the offset function for both contiguous and non contiguous indexes.
+
+    """
+    snaps = sorted(snaps)
+    offsets = [100*i for i in range(len(snaps))]
+    index = UMDIndex(snaps, offsets)
+    if snap in snaps:
+        assert index.offset(snap) == offsets[snaps.index(snap)]
+    else:
+        assert index.offset(snap) is None
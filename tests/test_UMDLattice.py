@@ -8,6 +8,8 @@ from ..libs.UMDLattice import UMDLattice
 from ..libs.UMDAtom import UMDAtom
 
 import pytest
+import pickle
+import itertools as it
 import numpy as np
 import hypothesis as hp
 import hypothesis.strategies as st
@@ -210,6 +212,130 @@ class Test_UMDLattice_unit:
         """
         assert self.lattice.density() == 72.0/4
 
+    # %% UMDLattice species tables tests
+    def test_UMDLattice_tables(self):
+        """
+        Test the species tables computed at construction. Each atom has the
+        species index, the mass and the valence of its species.
+
+        """
+        assert self.lattice.species == (self.X, self.Y)
+        assert np.array_equal(self.lattice.counts, [15, 6])
+        assert np.array_equal(self.lattice.offsets, [0, 15, 21])
+        assert np.array_equal(self.lattice.types, [0]*15 + [1]*6)
+        assert np.array_equal(self.lattice.masses, [3.00]*15 + [4.50]*6)
+        assert np.array_equal(self.lattice.valences, [2.0]*15 + [3.0]*6)
+        assert np.array_equal(self.lattice.pairs,
+                              [[0, 0], [0, 1], [1, 0], [1, 1]])
+
+    def test_UMDLattice_tables_reduction(self):
+        """
+        Test the species tables in the per-species reductions of an array of
+        atoms values, with np.bincount and np.add.reduceat.
+
+        """
+        values = np.arange(21, dtype=float)
+        bincount = np.bincount(self.lattice.types, weights=values)
+        reduceat = np.add.reduceat(values, self.lattice.offsets[:-1])
+        assert np.array_equal(bincount, [105, 105])
+        assert np.array_equal(reduceat, bincount)
+
+    def test_UMDLattice_tables_frozen(self):
+        """
+        Test that the composition is frozen at construction: modifying the
+        atoms dictionary passed does not modify the lattice.
+
+        """
+        atoms = dict(self.atoms)
+        lattice = UMDLattice(self.name, self.basis, atoms)
+        atoms[UMDAtom(name='Z')] = 1
+        assert lattice.natoms() == 21
+        assert lattice.atoms == self.atoms
+
+    # %% UMDLattice immutability tests
+    def test_UMDLattice_immutable(self):
+        """
+        Test that a constructed lattice cannot be modified: the attributes
+        cannot be assigned, the atoms dictionary cannot be changed and the
+        arrays are read-only.
+
+        """
+        with pytest.raises(AttributeError):
+            self.lattice.name = 'NewName'
+        with pytest.raises(AttributeError):
+            del self.lattice.name
+        with pytest.raises(TypeError):
+            self.lattice.atoms[self.X] = 1
+        for array in (self.lattice.dirBasis, self.lattice.invBasis,
+                      self.lattice.recBasis, self.lattice.types,
+                      self.lattice.masses):
+            with pytest.raises(ValueError):
+                array[0] = 0
+
+    def test_UMDLattice_shared_basis(self):
+        """
+        Test that the lattices with the same basis share the same basis
+        arrays, so the basis inversion is done only once.
+
+        """
+        lattice = UMDLattice('', np.copy(self.basis), {self.X: 1})
+        assert lattice.dirBasis is self.lattice.dirBasis
+        assert lattice.invBasis is self.lattice.invBasis
+
+    def test_UMDLattice_reciprocal(self):
+        """
+        Test the reciprocal lattice vectors. The product between the lattice
+        vectors and the reciprocal lattice vectors must be equal (or close)
+        to the identical matrix multiplied by 2*pi.
+
+        """
+        product = self.lattice.dirBasis @ self.lattice.recBasis.T
+        assert np.allclose(product, 2*np.pi*np.identity(3))
+
+    def test_UMDLattice_hash(self):
+        """
+        Test the __hash__ function. Two identical lattices, despite they can
+        have different names, have the same hash value and can be used as
+        the same dictionary key.
+
+        """
+        lattice2 = UMDLattice('', self.basis.astype(float), dict(self.atoms))
+        assert hash(self.lattice) == hash(lattice2)
+        assert {self.lattice: 1}[lattice2] == 1
+
+    def test_UMDLattice_pickle(self):
+        """
+        Test that a lattice pickled and unpickled is equal to the original
+        lattice and it is still immutable.
+
+        """
+        lattice = pickle.loads(pickle.dumps(self.lattice))
+        assert lattice == self.lattice
+        assert lattice.name == self.lattice.name
+        with pytest.raises(AttributeError):
+            lattice.name = 'NewName'
+
+    # %% UMDLattice bonds function tests
+    def test_UMDLattice_bonds(self):
+        """
+        Test the bonds function. All the ordered pairs of species are
+        returned.
+
+        """
+        assert self.lattice.bonds() == [(self.X, self.X), (self.X, self.Y),
+                                        (self.Y, self.X), (self.Y, self.Y)]
+
+    # %% UMDLattice atomslice function tests
+    def test_UMDLattice_atomslice(self):
+        """
+        Test the atomslice function. The slice of each species is returned,
+        while None is returned for a species not in the lattice.
+
+        """
+        assert self.lattice.atomslice(self.X) == slice(0, 15)
+        assert self.lattice.atomslice(self.Y) == slice(15, 21)
+        assert self.lattice.atomslice(UMDAtom(name='Z')) is None
+
     # %% UMDLattice reduced function tests
     def test_UMDLattice_reduced_basis(self):
         """
@@ -324,6 +450,102 @@ class Test_UMDLattice_unit:
         assert np.allclose(cartesian, vector)
 
 
+    # %% UMDLattice wrap function tests
+    def test_UMDLattice_wrap(self):
+        """
+        Test the wrap function on a batch of positions. The wrapped positions
+        must have reduced coordinates in [0, 1) and differ from the original
+        ones by lattice vectors.
+
+        """
+        rng = np.random.default_rng(0)
+        positions = rng.uniform(-10, 10, (4, 5, 3))
+        wrapped = self.lattice.wrap(positions)
+        reduced = self.lattice.reduced(wrapped)
+        shifts = self.lattice.reduced(positions - wrapped)
+        assert wrapped.shape == (4, 5, 3)
+        assert np.all((reduced >= -1e-12) & (reduced < 1+1e-12))
+        assert np.allclose(shifts, np.rint(shifts))
+
+    def test_UMDLattice_wrap_inplace(self):
+        """
+        Test the wrap function working in place on the positions.
+
+        """
+        rng = np.random.default_rng(0)
+        positions = rng.uniform(-10, 10, (5, 3))
+        wrapped = self.lattice.wrap(positions)
+        out = self.lattice.wrap(positions, out=positions)
+        assert out is positions
+        assert np.allclose(positions, wrapped)
+
+    # %% UMDLattice minimage function tests
+    def test_UMDLattice_minimage(self):
+        """
+        Test the minimage function on a batch of displacement vectors in the
+        triclinic lattice. The length of each vector returned must be the
+        shortest among all its images.
+
+        """
+        rng = np.random.default_rng(0)
+        variations = rng.uniform(-5, 5, (3, 7, 3))
+        minimage = self.lattice.minimage(variations)
+        reduced = self.lattice.reduced(variations)
+        nearest = self.lattice.cartesian(reduced - np.rint(reduced))
+        shifts = np.array(list(it.product(range(-3, 4), repeat=3)))
+        images = nearest[..., None, :] + shifts @ self.lattice.dirBasis
+        shortest = np.min(np.linalg.norm(images, axis=-1), axis=-1)
+        shifts = self.lattice.reduced(variations - minimage)
+        assert minimage.shape == (3, 7, 3)
+        assert np.allclose(np.linalg.norm(minimage, axis=-1), shortest)
+        assert np.allclose(shifts, np.rint(shifts))
+
+    def test_UMDLattice_minimage_inplace(self):
+        """
+        Test the minimage function working in place on a single precision
+        batch of displacement vectors.
+
+        """
+        rng = np.random.default_rng(0)
+        variations = rng.uniform(-5, 5, (3, 7, 3)).astype(np.float32)
+        minimage = self.lattice.minimage(variations)
+        out = self.lattice.minimage(variations, out=variations)
+        assert minimage.dtype == np.float32
+        assert out is variations
+        assert out.dtype == np.float32
+        assert np.allclose(out, minimage, atol=1e-5)
+
+    def test_UMDLattice_minimage_orthorhombic(self):
+        """
+        Test the minimage function in an orthorhombic lattice. The minimum
+        image must be equal to the nearest image in reduced coordinates.
+
+        """
+        lattice = UMDLattice(basis=np.diag([2.0, 3.0, 4.0]))
+        rng = np.random.default_rng(0)
+        variations = rng.uniform(-1.5, 1.5, (10, 3)) @ lattice.dirBasis
+        assert np.allclose(lattice.minimage(variations),
+                           lattice.periodic(variations))
+
+    # %% UMDLattice periodic function tests
+    def test_UMDLattice_periodic_reduced(self):
+        """
+        Test the periodic function on reduced coordinates out of
+        [-0.5, 0.5]. A single lattice vector is subtracted (added) to the
+        coordinates greater than 0.5 (lower than -0.5), while the ties at
+        +-0.5 are not changed.
+
+        """
+        variations = np.array([[0.5, -0.5, 0.7],
+                               [-0.7, 1.5, -1.5],
+                               [2.0, -2.0, 0.2]])
+        periodic = np.array([[0.5, -0.5, -0.3],
+                             [0.3, 0.5, -0.5],
+                             [1.0, -1.0, 0.2]])
+        assert np.allclose(self.lattice.periodic(variations, False),
+                           periodic)
+
+
 # %% ===================================================================== %% #
 # %% hypothesis tests
 @hp.given(data=st.data(), ntypes=st.integers(1, 50))
@@ -338,6 +560,10 @@ def test_UMDLattice_init(data, ntypes):
     assert lattice.atoms == data['atoms']
     assert np.array_equal(lattice.dirBasis, data['basis'])
     assert np.array_equal(lattice.invBasis, np.linalg.inv(data['basis']))
+    assert lattice.natoms() == sum(data['atoms'].values())
+    assert len(lattice.types) == lattice.natoms()
+    assert np.isclose(lattice.mass(), sum(atom.mass*n for atom, n
+                                          in data['atoms'].items()))
 
 
 @hp.given(data1=st.data(), data2=st.data())
@@ -493,3 +719,22 @@ def test_UMDLattice_periodic_value_cartesian(lattice, variations, natoms):
     variations_limit = np.abs(np.sum(lattice.dirBasis, axis=0))
     for i in range(3):
         assert np.all(np.abs(variations[:, i]) <= 0.5*variations_limit[i])
+
+
+@hp.given(lattice=st.data(), variations=st.data(), natoms=st.integers(1, 100))
+def test_UMDLattice_minimage_shorter(lattice, variations, natoms):
+    """
+    Test the minimage function. The minimum image of a displacement vector
+    must differ from it by a lattice vector, and it must not be longer than
+    its nearest image in reduced coordinates given by the periodic function.
+
+    """
+    lattice = lattice.draw(getUMDLattice())
+    variations = variations.draw(getNumpyArray(natoms, 3))
+    variations = lattice.cartesian(variations)
+    minimage = lattice.minimage(variations)
+    periodic = lattice.periodic(variations)
+    shifts = lattice.reduced(variations - minimage)
+    assert np.allclose(shifts, np.rint(shifts), atol=1e-6)
+    assert np.all(np.linalg.norm(minimage, axis=1)
+                  <= np.linalg.norm(periodic, axis=1) + 1e-9)
@@ -0,0 +1,153 @@
+"""
+===============================================================================
+                        UMDPairDistribution class tests
+===============================================================================
+
+The pairs of atoms found with cell lists are compared with the ones found by
+brute force, checking all the periodic images of all the pairs of atoms in a
+triclinic lattice.
+
+"""
+
+
+from ..libs.UMDPairDistribution import UMDPairDistribution, cell_pairs
+
+import pytest
+import itertools as it
+import numpy as np
+
+from ..libs.UMDAtom import UMDAtom
+from ..libs.UMDLattice import UMDLattice
+
+
+def brute_pairs(lattice, position, rcut):
+    """
+    Get all the ordered pairs of atoms closer than rcut by brute force.
+
+    """
+    pairs = []
+    natoms = len(position)
+    for i, j in it.product(range(natoms), repeat=2):
+        for shift in it.product(range(-2, 3), repeat=3):
+            if i == j and not any(shift):
+                continue
+            variation = position[j] - position[i] + shift @ lattice.dirBasis
+            r = np.linalg.norm(variation)
+            if r < rcut:
+                pairs.append((i, j, round(r, 8)))
+    return sorted(pairs)
+
+
+class TestUMDPairDistribution:
+
+    X = UMDAtom(name='X')
+    Y = UMDAtom(name='Y')
+    basis = np.array([[6.0, 0.0, 0.0],
+                      [2.0, 5.0, 0.0],
+                      [1.0, -1.5, 7.0]])
+    lattice = UMDLattice('', basis, {X: 25, Y: 15})
+    rng = np.random.default_rng(0)
+    position = rng.uniform(-0.5, 1.5, (40, 3)) @ basis
+
+    # %% cell_pairs function tests
+    @pytest.mark.parametrize('rcut', [1.5, 2.5, 4.0])
+    def test_cell_pairs(self, rcut):
+        """
+        Test the cell_pairs function. Each pair found with the cell lists
+        must be found by brute force in one of the two orders, and vice
+        versa. With the longest cutoff, the cell lists have a single cell
+        along the lattice vectors and the same pairs are found through
+        different periodic images.
+
+        """
+        first, second, distance = cell_pairs(self.lattice, self.position,
+                                             rcut)
+        distance = np.round(distance, 8)
+        pairs = sorted(list(zip(first, second, distance))
+                       + list(zip(second, first, distance)))
+        assert pairs == brute_pairs(self.lattice, self.position, rcut)
+
+    @pytest.mark.parametrize('rcut', [0.0, -1.0, 6.0])
+    def test_cell_pairs_ValueError(self, rcut):
+        """
+        Test the cell_pairs function with a cutoff radius not positive or
+        longer than the lattice planes spacing. A ValueError is raised.
+
+        """
+        with pytest.raises(ValueError):
+            cell_pairs(self.lattice, self.position, rcut)
+
+    # %% UMDPairDistribution __init__ function tests
+    @pytest.mark.parametrize('rmax', [0.0, -1.0, 6.0])
+    def test_UMDPairDistribution_init_ValueError(self, rmax):
+        """
+        Test the __init__ function with a cutoff radius not positive or
+        longer than the lattice planes spacing. A ValueError is raised.
+
+        """
+        with pytest.raises(ValueError):
+            UMDPairDistribution(self.lattice, rmax)
+
+    # %% UMDPairDistribution add function tests
+    def test_UMDPairDistribution_add(self):
+        """
+        Test the add function. The histograms of each pair of species must
+        count the pairs of atoms found by brute force.
+
+        """
+        pdf = UMDPairDistribution(self.lattice, 2.5, 10)
+        pdf.add(self.position)
+        pdf.add(self.position)
+        histogram = np.zeros((4, 10), dtype=int)
+        for i, j, r in brute_pairs(self.lattice, self.position, 2.5):
+            pair = 2*self.lattice.types[i] + self.lattice.types[j]
+            histogram[pair, int(r/0.25)] += 2
+        assert pdf.nsnaps == 2
+        assert np.array_equal(pdf.histogram, histogram)
+        assert np.array_equal(pdf.histogram[1], pdf.histogram[2])
+
+    def test_UMDPairDistribution_merge(self):
+        """
+        Test the merge function. Merging the histograms of two objects must
+        be the same as accumulating all the snapshots in a single one.
+
+        """
+        pdf = UMDPairDistribution(self.lattice, 2.5, 10)
+        pdf.add(self.position)
+        pdf.add(self.position[::-1])
+        merged = UMDPairDistribution(self.lattice, 2.5, 10)
+        other = UMDPairDistribution(self.lattice, 2.5, 10)
+        merged.add(self.position)
+        other.add(self.position[::-1])
+        merged.merge(other)
+        assert merged.nsnaps == 2
+        assert np.array_equal(merged.histogram, pdf.histogram)
+        with pytest.raises(ValueError):
+            merged.merge(UMDPairDistribution(self.lattice, 2.5, 20))
+
+    def test_UMDPairDistribution_reset(self):
+        """
+        Test the reset function.
+
+        """
+        pdf = UMDPairDistribution(self.lattice, 2.5, 10)
+        pdf.add(self.position)
+        pdf.reset()
+        assert pdf.nsnaps == 0
+        assert not pdf.histogram.any()
+
+    # %% UMDPairDistribution rdf function tests
+    def test_UMDPairDistribution_rdf(self):
+        """
+        Test the rdf function for an ideal gas, that is for uniformly random
+        atoms positions. The radial pair distribution functions must be close
+        to 1 for all the pairs of species.
+
+        """
+        lattice = UMDLattice('', 12*self.basis, {self.X: 600, self.Y: 400})
+        rng = np.random.default_rng(1)
+        pdf = UMDPairDistribution(lattice, 10.0, 5)
+        for _ in range(5):
+            pdf.add(rng.uniform(0, 1, (1000, 3)) @ lattice.dirBasis)
+        assert np.allclose(pdf.radii(), [1., 3., 5., 7., 9.])
+        assert np.allclose(pdf.rdf()[:, 1:], 1.0, atol=0.1)
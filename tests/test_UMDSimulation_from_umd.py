@@ -26,6 +26,7 @@ All simulations are performed on the same lattice structure:
 
 """
 
+import io
 import numpy as np
 import pytest
 
@@ -83,3 +84,18 @@ class Test_UMDSimulation_from_umd:
         with open('examples/UMD_empty.umd', 'r') as umd:
             simulation = UMDSimulation.UMDSimulation_from_umd(umd)
             assert simulation is None
+
+    def test_UMDSimulation_from_umd_rounded_time(self):
+        """
+        Test the UMDSimualtion_from_umd loading a simulation whose total time
+        is not exactly represented with the three decimal digits printed in
+        the UMD file header.
+
+        """
+        run = UMDSimulationRun(0, 3, 0.1)
+        simulation = UMDSimulation('rounded', self.lattice, [run])
+        umd = io.StringIO()
+        simulation.save(umd, saveRuns=True)
+        umd.write(145*'-'+'\n\n')
+        self.lattice.save(umd)
+        assert UMDSimulation.UMDSimulation_from_umd(umd) == simulation
@@ -139,6 +139,46 @@ class TestUMDSnapDynamics:
         """
         assert len(str(self.dynamics)) == 460
 
+    # %% UMDSnapDynamics format function tests
+    def test_UMDSnapDynamics_format(self):
+        """
+        Test the format function to convert the UMDSnapDynamics data into a
+        string without the null velocity columns. The columns mask is reported
+        in the header line.
+
+        """
+        dynamics = UMDSnapDynamics(time=self.time, position=self.position,
+                                   velocity=np.zeros((2, 3)), force=self.force)
+        string  = "Dynamics:        0.500 fs Columns: 111000111\n"
+        string += "Position_x      Position_y      Position_z      "
+        string += "Force_x         Force_y         Force_z         \n"
+        string += "      0.47557534      0.75247622      0.26707477"
+        string += "     -0.80722157     -0.47571638      0.23693435\n"
+        string += "      0.65057722      0.82406818      0.51003144"
+        string += "      0.37777898     -0.20037447     -0.03918817"
+        assert dynamics.format() == string
+
+    def test_UMDSnapDynamics_format_noprune(self):
+        """
+        Test the format function without pruning. The string returned must be
+        equal to the __str__ one.
+
+        """
+        assert self.dynamics.format(prune=False) == str(self.dynamics)
+
+    # %% UMDSnapDynamics fingerprint function tests
+    def test_UMDSnapDynamics_fingerprint(self):
+        """
+        Test the fingerprint function. The fingerprint depends only on the
+        atoms positions: it is the same for identical positions, even with
+        different velocities and forces, and it changes with the positions.
+
+        """
+        dynamics = UMDSnapDynamics(time=1.0, position=self.position.copy())
+        assert dynamics.fingerprint() == self.dynamics.fingerprint()
+        dynamics.position[0, 0] += 1e-8
+        assert dynamics.fingerprint() != self.dynamics.fingerprint()
+
 
 # %% ===================================================================== %% #
 # %% UMDSnapDynamics hypothesis tests
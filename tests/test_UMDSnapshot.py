@@ -163,6 +163,41 @@ class Test_UMDSnapshot_unit:
         assert np.array_equal(snapshot.velocity, np.zeros((2, 3), dtype=float))
         assert np.array_equal(snapshot.force, np.zeros((2, 3), dtype=float))
 
+    def test_UMDSnapshot_setDynamics_float32(self):
+        """
+        Test UMDSnapshot setDynamics function on a single precision snapshot.
+        The dynamics arrays are stored as float32, included the missing ones.
+
+        """
+        snapshot = UMDSnapshot(self.snap, self.time, self.lattice, np.float32)
+        snapshot.setDynamics(position=self.position, force=self.force)
+        assert snapshot.position.dtype == np.float32
+        assert snapshot.velocity.dtype == np.float32
+        assert snapshot.force.dtype == np.float32
+        assert np.allclose(snapshot.position, self.position)
+        assert np.array_equal(snapshot.velocity, np.zeros((2, 3)))
+
+    def test_UMDSnapshot_setDynamics_reuse(self):
+        """
+        Test UMDSnapshot setDynamics function on a snapshot reusing its
+        arrays. The vectors are copied in the same preallocated arrays at
+        each call and the missing ones are reset to zero.
+
+        """
+        snapshot = UMDSnapshot(self.snap, self.time, self.lattice, reuse=True)
+        buffer = snapshot.buffer
+        snapshot.setDynamics(self.position, self.velocity, self.force)
+        assert np.shares_memory(snapshot.position, buffer)
+        assert np.array_equal(snapshot.position, self.position)
+        assert np.array_equal(snapshot.velocity, self.velocity)
+        assert np.array_equal(snapshot.force, self.force)
+        snapshot.setDynamics(position=self.force)
+        assert snapshot.buffer is buffer
+        assert np.shares_memory(snapshot.force, buffer)
+        assert np.array_equal(snapshot.position, self.force)
+        assert np.array_equal(snapshot.velocity, np.zeros((2, 3)))
+        assert np.array_equal(snapshot.force, np.zeros((2, 3)))
+
     def test_UMDSnapshot_setDynamics_TypeError(self):
         """
         Test UMDSnapshot setDynamics function with wrong attributes.
@@ -36,6 +36,7 @@ import unittest.mock as mock
 from ..libs.UMDAtom import UMDAtom
 from ..libs.UMDLattice import UMDLattice
 from ..libs.UMDSnapshot import UMDSnapshot
+from ..load_UMDIndex import load_UMDIndex_from_umd
 
 
 class Test_UMDSnapshot_from_umd:
@@ -255,3 +256,36 @@ class Test_UMDSnapshot_from_umd:
             snapshot = UMDSnapshot(lattice=self.lattice)
             snapshot.UMDSnapshot_from_umd(umd, snap)
         assert mock_load.call_count == 0
+
+    # %% UMDSnapshot_from_umd tests with offsets
+    def test_UMDSnapshot_from_umd_offsets(self):
+        """
+        Test UMDSnapshot_from_umd method loading the snapshots of a UMD file
+        in reverse order through its UMDIndex. Each loaded UMDSnapshot must be
+        equal to the one loaded scrolling the UMD file from its beginning.
+
+        """
+        with open('examples/UMD_single.umd', 'rb') as umd:
+            index = load_UMDIndex_from_umd(umd)
+        with open('examples/UMD_single.umd', 'r') as umd:
+            for snap in [299, 150, 0]:
+                snapshot = UMDSnapshot(lattice=self.lattice)
+                snapshot = snapshot.UMDSnapshot_from_umd(umd, snap, index)
+                umd.seek(0)
+                reference = UMDSnapshot(lattice=self.lattice)
+                reference = reference.UMDSnapshot_from_umd(umd, snap)
+                assert snapshot.snap == snap
+                assert snapshot == reference
+
+    def test_UMDSnapshot_from_umd_offsets_too_large(self):
+        """
+        Test UMDSnapshot_from_umd method loading a snapshot not listed in the
+        UMDIndex. No snapshot is loaded and None is returned.
+
+        """
+        with open('examples/UMD_single.umd', 'rb') as umd:
+            index = load_UMDIndex_from_umd(umd)
+        with open('examples/UMD_single.umd', 'r') as umd:
+            snapshot = UMDSnapshot(lattice=self.lattice)
+            assert snapshot.UMDSnapshot_from_umd(umd, 1043, index) is None
+            assert umd.tell() == 0
@@ -0,0 +1,185 @@
+"""
+===============================================================================
+                           UMDTrajectory class tests
+===============================================================================
+
+To test the UMDTrajectory class we use the examples/UMD_single.umd file,
+containing a single simulation run with 300 snapshots of 44 atoms.
+
+"""
+
+
+from ..libs.UMDTrajectory import UMDTrajectory
+
+import pytest
+import numpy as np
+import unittest.mock as mock
+import hypothesis as hp
+import hypothesis.strategies as st
+
+from ..libs.UMDSnapshot import UMDSnapshot
+
+
+UMDFILE = './examples/UMD_single.umd'
+SNAPSIZE = 44*9*8  # The dynamics arrays size of a snapshot in bytes.
+
+
+class TestUMDTrajectory:
+
+    trajectory = UMDTrajectory(UMDFILE)
+
+    def reference(self, snap):
+        """
+        Load a snapshot of the example file with the UMDSnapshot_from_umd
+        function, as reference.
+
+        """
+        with open(UMDFILE, 'r') as umd:
+            snapshot = UMDSnapshot(lattice=self.trajectory.simulation.lattice)
+            return snapshot.UMDSnapshot_from_umd(umd, snap)
+
+    # %% UMDTrajectory __init__ function tests
+    def test_UMDTrajectory_init_ValueError(self):
+        """
+        Test the __init__ function with a negative cache size.
+        A ValueError is raised.
+
+        """
+        with pytest.raises(ValueError):
+            UMDTrajectory(UMDFILE, cacheSize=-1)
+
+    # %% UMDTrajectory __len__ function tests
+    def test_UMDTrajectory_len(self):
+        """
+        Test the __len__ function. The length is the number of snapshots.
+
+        """
+        assert len(self.trajectory) == 300
+
+    # %% UMDTrajectory __getitem__ function tests
+    def test_UMDTrajectory_getitem(self):
+        """
+        Test the __getitem__ function with positive and negative integers.
+        The snapshots must be equal to the ones loaded with the
+        UMDSnapshot_from_umd function.
+
+        """
+        assert self.trajectory[150] == self.reference(150)
+        assert self.trajectory[-1] == self.reference(299)
+        assert self.trajectory[np.int64(0)] == self.reference(0)
+
+    def test_UMDTrajectory_getitem_slice(self):
+        """
+        Test the __getitem__ function with a slice. A list of the snapshots
+        in the slice is returned.
+
+        """
+        snapshots = self.trajectory[290::3]
+        assert [snapshot.snap for snapshot in snapshots] == [290, 293, 296,
+                                                            299]
+
+    def test_UMDTrajectory_getitem_IndexError(self):
+        """
+        Test the __getitem__ function with out of range positions.
+        An IndexError is raised.
+
+        """
+        with pytest.raises(IndexError):
+            self.trajectory[300]
+        with pytest.raises(IndexError):
+            self.trajectory[-301]
+
+    def test_UMDTrajectory_getitem_TypeError(self):
+        """
+        Test the __getitem__ function with a non integer position.
+        A TypeError is raised.
+
+        """
+        with pytest.raises(TypeError):
+            self.trajectory[1.0]
+
+    def test_UMDTrajectory_getitem_cached(self):
+        """
+        Test the __getitem__ function loading a snapshot twice. The second
+        time the snapshot is taken from the cache, without reading the file.
+
+        """
+        trajectory = UMDTrajectory(UMDFILE)
+        snapshot = trajectory[10]
+        with mock.patch.object(UMDTrajectory, '_load') as mock_load:
+            assert trajectory[10] is snapshot
+        assert mock_load.call_count == 0
+        trajectory.close()
+
+    def test_UMDTrajectory_cache_lru(self):
+        """
+        Test the cache with a memory budget of two snapshots. The least
+        recently used snapshot is removed from the cache.
+
+        """
+        with UMDTrajectory(UMDFILE, cacheSize=2*SNAPSIZE) as trajectory:
+            trajectory[0]
+            trajectory[1]
+            trajectory[0]
+            trajectory[2]
+            assert list(trajectory._cache) == [0, 2]
+            assert trajectory._cached == 2*SNAPSIZE
+
+    def test_UMDTrajectory_cache_disabled(self):
+        """
+        Test the cache with a null memory budget. No snapshot is cached.
+
+        """
+        with UMDTrajectory(UMDFILE, cacheSize=0) as trajectory:
+            trajectory[0]
+            assert len(trajectory._cache) == 0
+
+    def test_UMDTrajectory_cache_columns(self):
+        """
+        Test the cache loading only the atoms positions. The null velocity
+        and force arrays do not use memory of the cache budget.
+
+        """
+        with UMDTrajectory(UMDFILE, columns=('position',)) as trajectory:
+            snapshot = trajectory[3]
+            assert np.array_equal(snapshot.position,
+                                  self.reference(3).position)
+            assert trajectory._cached == SNAPSIZE // 3
+
+    def test_UMDTrajectory_species(self):
+        """
+        Test the __getitem__ function loading only the Fe atom.
+
+        """
+        with UMDTrajectory(UMDFILE, species=['Fe']) as trajectory:
+            snapshot = trajectory[7]
+            assert snapshot.snap == 7
+            assert snapshot.lattice.natoms() == 1
+            assert np.array_equal(snapshot.force, self.reference(7).force[43:])
+
+    # %% UMDTrajectory __iter__ function tests
+    def test_UMDTrajectory_iter(self):
+        """
+        Test the __iter__ function. All the snapshots are iterated in order.
+
+        """
+        snaps = [snapshot.snap for snapshot in self.trajectory]
+        assert snaps == list(range(300))
+
+
+# %% ===================================================================== %% #
+# %% UMDTrajectory hypothesis tests
+@hp.settings(deadline=None, max_examples=20)
+@hp.given(items=st.lists(st.integers(0, 299), max_size=30),
+          nsnaps=st.integers(0, 5))
+def test_UMDTrajectory_cache(items, nsnaps):
+    """
+    Test the cache over random access patterns. The cache never exceeds its
+    memory budget and the snapshots returned are always the requested ones.
+
+    """
+    with UMDTrajectory(UMDFILE, cacheSize=nsnaps*SNAPSIZE) as trajectory:
+        for item in items:
+            assert trajectory[item].snap == item
+            assert trajectory._cached <= trajectory.cacheSize
+            assert len(trajectory._cache) <= nsnaps
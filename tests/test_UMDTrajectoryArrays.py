@@ -0,0 +1,140 @@
+"""
+===============================================================================
+                        UMDTrajectoryArrays class tests
+===============================================================================
+
+To test the UMDTrajectoryArrays class we use the examples/UMD_single.umd file,
+containing a single simulation run with 300 snapshots of 44 atoms.
+
+"""
+
+
+from ..libs.UMDTrajectoryArrays import UMDTrajectoryArrays
+
+import pytest
+import numpy as np
+
+from ..libs.UMDSnapshot import UMDSnapshot
+from ..load_UMDTrajectory import load_trajectory
+
+
+UMDFILE = './examples/UMD_single.umd'
+
+
+class TestUMDTrajectoryArrays:
+
+    simulation, trajectory = load_trajectory(UMDFILE)
+    lattice = simulation.lattice
+
+    def reference(self, snap):
+        """
+        Load a snapshot of the example file with the UMDSnapshot_from_umd
+        function, as reference.
+
+        """
+        with open(UMDFILE, 'r') as umd:
+            snapshot = UMDSnapshot(lattice=self.lattice)
+            return snapshot.UMDSnapshot_from_umd(umd, snap)
+
+    # %% UMDTrajectoryArrays __init__ function tests
+    def test_UMDTrajectoryArrays_init(self):
+        """
+        Test the __init__ function. The arrays are null and the position,
+        velocity and force arrays are contiguous sections of the vectors
+        array.
+
+        """
+        trajectory = UMDTrajectoryArrays(5, self.lattice, np.float32)
+        assert len(trajectory) == 5
+        assert trajectory.natoms == 44
+        assert trajectory.vectors.shape == (3, 5, 44, 3)
+        assert trajectory.vectors.dtype == np.float32
+        assert not np.any(trajectory.vectors)
+        assert not np.any(trajectory.temperature)
+        for array in [trajectory.position, trajectory.velocity,
+                      trajectory.force]:
+            assert array.shape == (5, 44, 3)
+            assert array.flags['C_CONTIGUOUS']
+            assert np.shares_memory(array, trajectory.vectors)
+
+    def test_UMDTrajectoryArrays_init_ValueError(self):
+        """
+        Test the __init__ function with a vectors array of a wrong shape.
+        A ValueError is raised.
+
+        """
+        with pytest.raises(ValueError):
+            UMDTrajectoryArrays(5, self.lattice, vectors=np.zeros((3, 5, 4, 3)))
+
+    # %% UMDTrajectoryArrays __getitem__ function tests
+    def test_UMDTrajectoryArrays_getitem(self):
+        """
+        Test the __getitem__ function. The snapshot must be equal to the one
+        loaded from the UMD file and its arrays are views of the trajectory
+        arrays.
+
+        """
+        for i in [0, 42, -1]:
+            snapshot = self.trajectory[i]
+            assert snapshot == self.reference(i % 300)
+            assert np.shares_memory(snapshot.position,
+                                    self.trajectory.position)
+            assert np.shares_memory(snapshot.force, self.trajectory.force)
+
+    def test_UMDTrajectoryArrays_getitem_slice(self):
+        """
+        Test the __getitem__ function with a slice. A UMDTrajectoryArrays
+        object sharing the arrays of the trajectory is returned.
+
+        """
+        sliced = self.trajectory[10:50:7]
+        assert isinstance(sliced, UMDTrajectoryArrays)
+        assert list(sliced.snap) == [10, 17, 24, 31, 38, 45]
+        assert sliced.lattice == self.lattice
+        assert np.array_equal(sliced.position,
+                              self.trajectory.position[10:50:7])
+        assert np.shares_memory(sliced.vectors, self.trajectory.vectors)
+        assert sliced[1] == self.reference(17)
+
+    def test_UMDTrajectoryArrays_getitem_IndexError(self):
+        """
+        Test the __getitem__ function with positions out of range.
+        An IndexError is raised.
+
+        """
+        with pytest.raises(IndexError):
+            self.trajectory[300]
+        with pytest.raises(IndexError):
+            self.trajectory[-301]
+
+    def test_UMDTrajectoryArrays_getitem_TypeError(self):
+        """
+        Test the __getitem__ function with a float item. A TypeError is
+        raised.
+
+        """
+        with pytest.raises(TypeError):
+            self.trajectory[1.0]
+
+    # %% UMDTrajectoryArrays __iter__ function tests
+    def test_UMDTrajectoryArrays_iter(self):
+        """
+        Test the __iter__ function. All the snapshots are yielded in order.
+
+        """
+        snaps = [snapshot.snap for snapshot in self.trajectory[:5]]
+        assert snaps == [0, 1, 2, 3, 4]
+
+    # %% UMDTrajectoryArrays setSnapshot function tests
+    def test_UMDTrajectoryArrays_setSnapshot(self):
+        """
+        Test the setSnapshot function copying the snapshots of the UMD file
+        into a new trajectory. The snapshot views must be equal to them.
+
+        """
+        trajectory = UMDTrajectoryArrays(2, self.lattice)
+        for i, snap in enumerate([7, 123]):
+            trajectory.setSnapshot(i, self.reference(snap))
+        assert list(trajectory.snap) == [7, 123]
+        assert trajectory[0] == self.reference(7)
+        assert trajectory[1] == self.reference(123)
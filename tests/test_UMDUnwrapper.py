@@ -0,0 +1,101 @@
+"""
+===============================================================================
+                            UMDUnwrapper class tests
+===============================================================================
+
+To test the UMDUnwrapper class we use a random walk of 20 atoms in a
+triclinic lattice, whose positions are wrapped into the unit cell. The
+unwrapped positions must be equal to the positions of the random walk.
+
+"""
+
+
+from ..libs.UMDUnwrapper import UMDUnwrapper
+
+import pytest
+import numpy as np
+
+from ..libs.UMDAtom import UMDAtom
+from ..libs.UMDLattice import UMDLattice
+
+
+class TestUMDUnwrapper:
+
+    basis = np.array([[4.0, 0.0, 0.0],
+                      [1.0, 4.0, 0.0],
+                      [0.5, 0.5, 4.0]])
+    lattice = UMDLattice('', basis, {UMDAtom(name='X'): 20})
+    rng = np.random.default_rng(0)
+    steps = rng.uniform(-0.4, 0.4, (50, 20, 3))
+    walk = np.cumsum(steps, axis=0)
+    wrapped = lattice.wrap(walk)
+
+    # %% UMDUnwrapper unwrap function tests
+    def test_UMDUnwrapper_unwrap(self):
+        """
+        Test the unwrap function. The unwrapped positions must be equal to
+        the random walk positions, but for the cell image of the first
+        snapshot.
+
+        """
+        unwrapper = UMDUnwrapper(self.lattice)
+        offset = self.walk[0] - self.wrapped[0]
+        for position, wrapped in zip(self.walk, self.wrapped):
+            unwrapped = unwrapper.unwrap(wrapped)
+            assert np.allclose(unwrapped + offset, position)
+
+    def test_UMDUnwrapper_unwrap_buffer(self):
+        """
+        Test the unwrap function storing the unwrapped positions in the same
+        buffer for all the snapshots.
+
+        """
+        unwrapper = UMDUnwrapper(self.lattice)
+        buffer = np.empty((20, 3))
+        for wrapped in self.wrapped:
+            unwrapped = unwrapper.unwrap(wrapped, out=buffer)
+            assert unwrapped is buffer
+        assert np.allclose(buffer - self.wrapped[-1],
+                           unwrapper.images @ self.basis)
+
+    def test_UMDUnwrapper_reset(self):
+        """
+        Test the reset function. After the reset, the first snapshot is not
+        unwrapped.
+
+        """
+        unwrapper = UMDUnwrapper(self.lattice)
+        for wrapped in self.wrapped:
+            unwrapper.unwrap(wrapped)
+        unwrapper.reset()
+        assert not np.any(unwrapper.images)
+        assert np.allclose(unwrapper.unwrap(self.wrapped[-1]),
+                           self.wrapped[-1])
+
+    # %% UMDUnwrapper iter_unwrap function tests
+    def test_UMDUnwrapper_iter_unwrap(self):
+        """
+        Test the iter_unwrap function storing the image counters in a compact
+        int16 array. The unwrapped positions restored from the image counters
+        must be equal to the ones yielded.
+
+        """
+        unwrapper = UMDUnwrapper(self.lattice)
+        images = np.zeros((50, 20, 3), dtype=np.int16)
+        unwrapped = np.array(list(unwrapper.iter_unwrap(self.wrapped,
+                                                        images)))
+        offset = self.walk[0] - self.wrapped[0]
+        assert np.allclose(unwrapped + offset, self.walk)
+        assert np.allclose(unwrapper.restore(self.wrapped, images), unwrapped)
+
+    def test_UMDUnwrapper_iter_unwrap_OverflowError(self):
+        """
+        Test the iter_unwrap function when the image counters exceed the range
+        of the images array. An OverflowError is raised.
+
+        """
+        unwrapper = UMDUnwrapper(self.lattice)
+        unwrapper.images[0, 0] = 200
+        images = np.zeros((50, 20, 3), dtype=np.int8)
+        with pytest.raises(OverflowError):
+            list(unwrapper.iter_unwrap(self.wrapped, images))
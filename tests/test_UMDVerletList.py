@@ -0,0 +1,132 @@
+"""
+===============================================================================
+                            UMDVerletList class tests
+===============================================================================
+
+To test the UMDVerletList class we use a random walk of 60 atoms in a
+triclinic lattice, with small steps as in a molecular dynamics trajectory,
+whose positions are wrapped into the unit cell. The pairs found through the
+Verlet list must be the ones found with the cell lists in each snapshot.
+
+"""
+
+
+from ..libs.UMDVerletList import UMDVerletList
+
+import pytest
+import numpy as np
+
+from ..libs.UMDAtom import UMDAtom
+from ..libs.UMDLattice import UMDLattice
+from ..libs.UMDPairDistribution import UMDPairDistribution, cell_pairs
+
+
+def sorted_pairs(first, second, distance):
+    """
+    Get the pairs of atoms as a sorted list of (i, j, r) with i < j.
+
+    """
+    pairs = zip(np.minimum(first, second), np.maximum(first, second),
+                np.round(distance, 8))
+    return sorted(pairs)
+
+
+class TestUMDVerletList:
+
+    X = UMDAtom(name='X')
+    Y = UMDAtom(name='Y')
+    basis = np.array([[8.0, 0.0, 0.0],
+                      [3.0, 8.0, 0.0],
+                      [-2.0, 1.0, 9.0]])
+    lattice = UMDLattice('', basis, {X: 40, Y: 20})
+    rng = np.random.default_rng(0)
+    steps = rng.uniform(-0.05, 0.05, (40, 60, 3))
+    steps[0] = rng.uniform(0, 1, (60, 3)) @ basis
+    walk = lattice.wrap(np.cumsum(steps, axis=0))
+
+    # %% UMDVerletList __init__ function tests
+    @pytest.mark.parametrize('rcut, skin', [(0.0, 0.3), (2.0, -0.1),
+                                            (3.5, 0.5)])
+    def test_UMDVerletList_init_ValueError(self, rcut, skin):
+        """
+        Test the __init__ function with a cutoff radius not positive, a
+        negative skin or a cutoff radius plus skin longer than half the
+        lattice planes spacing. A ValueError is raised.
+
+        """
+        with pytest.raises(ValueError):
+            UMDVerletList(self.lattice, rcut, skin)
+
+    # %% UMDVerletList pairs function tests
+    def test_UMDVerletList_pairs(self):
+        """
+        Test the pairs function. The pairs must be the same found with the
+        cell lists in each snapshot, while the list is built only a few
+        times.
+
+        """
+        verlet = UMDVerletList(self.lattice, 2.5, 0.5)
+        for position in self.walk:
+            pairs = sorted_pairs(*verlet.pairs(position))
+            assert pairs == sorted_pairs(*cell_pairs(self.lattice, position,
+                                                     2.5))
+        assert 1 < verlet.builds < len(self.walk)//2
+
+    def test_UMDVerletList_update(self):
+        """
+        Test the update function. The list is built at the first snapshot
+        and when an atom moves by more than half the skin.
+
+        """
+        verlet = UMDVerletList(self.lattice, 2.5, 0.5)
+        position = self.walk[0].copy()
+        assert verlet.update(position)
+        position[7] += [0.2, 0.0, 0.1]
+        assert not verlet.update(position)
+        position[7] += [0.1, 0.0, 0.0]
+        assert verlet.update(position)
+        assert verlet.builds == 2
+        verlet.reset()
+        assert verlet.reference is None
+        assert verlet.update(position)
+
+    def test_UMDVerletList_update_wrapped(self):
+        """
+        Test the update function when an atom is wrapped across a face of
+        the unit cell. The list is not built again.
+
+        """
+        verlet = UMDVerletList(self.lattice, 2.5, 0.5)
+        position = self.walk[0].copy()
+        verlet.update(position)
+        position[3] += self.basis[1] - self.basis[2]
+        assert not verlet.update(position)
+
+    # %% UMDPairDistribution add function with a Verlet list
+    def test_UMDPairDistribution_add_neighbours(self):
+        """
+        Test the UMDPairDistribution.add function with the pairs taken from
+        a Verlet list with a longer cutoff radius. The histograms must be the
+        same obtained with the cell lists.
+
+        """
+        verlet = UMDVerletList(self.lattice, 3.0, 0.5)
+        pdf = UMDPairDistribution(self.lattice, 2.5, 25)
+        reference = UMDPairDistribution(self.lattice, 2.5, 25)
+        for position in self.walk:
+            pdf.add(position, neighbours=verlet)
+            reference.add(position)
+        assert np.array_equal(pdf.histogram, reference.histogram)
+
+    def test_UMDPairDistribution_add_neighbours_ValueError(self):
+        """
+        Test the UMDPairDistribution.add function with the pairs taken from
+        a Verlet list with a cutoff radius shorter than rmax. A ValueError is
+        raised.
+
+        """
+        verlet = UMDVerletList(self.lattice, 2.0, 0.5)
+        pdf = UMDPairDistribution(self.lattice, 2.5, 25)
+        with pytest.raises(ValueError):
+            pdf.add(self.walk[0], neighbours=verlet)
+        assert pdf.nsnaps == 0
@@ -0,0 +1,219 @@
+"""
+===============================================================================
+                          Load_OUTCAR pipeline tests
+===============================================================================
+
+To test the Load_OUTCAR pipeline we use the examples/OUTCAR_snapshot.outcar
+file, containing a single snapshot (the 1044-th of a simulation made of three
+concatenated runs) of a lattice with:
+ - the matrix of basis vectors is:
+       5.70     0.00     0.00
+       0.00     5.70     0.00
+       0.00     0.00     5.70
+ - the contained atoms are:
+     - O: 15 atoms,
+     - H: 28 atoms,
+     - Fe: 1 atom.
+
+"""
+
+from ..load_OUTCAR import Load_OUTCAR
+from ..load_OUTCAR import read_UMDSnapshot_block
+from ..load_OUTCAR import convert_UMDSnapshot_block
+
+import io
+import pytest
+import numpy as np
+import multiprocessing
+import concurrent.futures as cf
+import unittest.mock as mock
+
+from ..libs.UMDAtom import UMDAtom
+from ..libs.UMDLattice import UMDLattice
+from ..libs.UMDSimulation import UMDSimulation
+from ..libs.UMDSimulationRun import UMDSimulationRun
+from ..libs.UMDSnapshot import UMDSnapshot
+
+
+class TestLoad_OUTCAR_pipeline:
+
+    lattice_name = '2bccH2O+1Fe'
+    H = UMDAtom(name='H', mass=1.00, valence=1.0)
+    O = UMDAtom(name='O', mass=16.00, valence=6.0)
+    Fe = UMDAtom(name='Fe', mass=55.85, valence=8.0)
+    atoms = {O: 15, H: 28, Fe: 1}
+    basis = 5.7*np.identity(3)
+    lattice = UMDLattice(lattice_name, basis, atoms)
+
+    with open('./examples/OUTCAR_snapshot.outcar', 'r') as outcar:
+        text = outcar.read()
+
+    # Two snapshots with the first position different from the example one.
+    text1 = text.replace('5.30395', '5.30396')
+    text2 = text.replace('5.30395', '5.30397')
+
+    def serial(self, step, steptime=0.4, prune=False, text=None):
+        """
+        Convert the example snapshot serially, as reference.
+
+        """
+        if text is None:
+            text = self.text
+        umd = io.StringIO()
+        snapshot = UMDSnapshot(step, steptime, self.lattice)
+        snapshot.UMDSnapshot_from_outcar(io.StringIO(text))
+        snapshot.save(umd, prune)
+        return umd.getvalue()
+
+    # %% read_UMDSnapshot_block tests
+    def test_read_UMDSnapshot_block(self):
+        """
+        Test the read_UMDSnapshot_block function reading two consecutive
+        snapshots. Each block ends with the total energy line and the second
+        block starts with the lines following the first one.
+
+        """
+        outcar = io.StringIO(self.text + '\n' + self.text)
+        block = read_UMDSnapshot_block(outcar)
+        assert block.splitlines()[-1].split()[:3] == ['total', 'energy',
+                                                      'ETOTAL']
+        assert 'aborting loop' in block.splitlines()[0]
+        assert read_UMDSnapshot_block(outcar).endswith(block)
+
+    def test_read_UMDSnapshot_block_eof(self):
+        """
+        Test the read_UMDSnapshot_block function at the end of the file and
+        on a truncated snapshot. An EOFError is raised.
+
+        """
+        with pytest.raises(EOFError):
+            read_UMDSnapshot_block(io.StringIO(''))
+        with pytest.raises(EOFError):
+            read_UMDSnapshot_block(io.StringIO(self.text[:len(self.text)//2]))
+
+    # %% convert_UMDSnapshot_block tests
+    def test_convert_UMDSnapshot_block(self):
+        """
+        Test the convert_UMDSnapshot_block function. The string returned must
+        be equal to the snapshot saved serially.
+
+        """
+        string = convert_UMDSnapshot_block(self.text, 1043, 0.4, self.lattice)
+        assert string == self.serial(1043)
+        string = convert_UMDSnapshot_block(self.text, 1043, 0.4, self.lattice,
+                                           prune=True)
+        assert string == self.serial(1043, prune=True)
+
+    # %% _pipeline tests
+    def test_run_after_initialStep_pipeline(self):
+        """
+        Test the _run_after_initialStep function with two worker processes on
+        a run of five snapshots. The UMD output must be equal to the serial
+        one and the run steps must be updated.
+
+        """
+        load_OUTCAR = Load_OUTCAR(workers=2)
+        load_OUTCAR.finalStep = 5
+        simulation = UMDSimulation('', self.lattice,
+                                   [UMDSimulationRun(0, 5, 0.4)])
+        outcar = io.StringIO(5*(self.text+'\n'))
+        umd = io.StringIO()
+        load_OUTCAR._run_after_initialStep(outcar, umd, simulation)
+        assert umd.getvalue() == ''.join(self.serial(s) for s in range(5))
+        assert simulation.steps() == 5
+
+    def test_run_after_initialStep_pipeline_forkserver(self):
+        """
+        Test the _run_after_initialStep function with two worker processes.
+        The workers are not forked from the multi-threaded process, but they
+        are started by the forkserver, if available.
+
+        """
+        load_OUTCAR = Load_OUTCAR(workers=2)
+        load_OUTCAR.finalStep = 2
+        simulation = UMDSimulation('', self.lattice,
+                                   [UMDSimulationRun(0, 2, 0.4)])
+        outcar = io.StringIO(2*(self.text+'\n'))
+        with mock.patch.object(cf, 'ProcessPoolExecutor',
+                               wraps=cf.ProcessPoolExecutor) as pool:
+            load_OUTCAR._run_after_initialStep(outcar, io.StringIO(),
+                                               simulation)
+        context = pool.call_args.kwargs['mp_context']
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            assert context.get_start_method() == 'forkserver'
+        assert simulation.steps() == 2
+
+    @pytest.mark.parametrize('workers', [0, 2])
+    @pytest.mark.parametrize('middle', [False, True])
+    def test_run_after_initialStep_truncated(self, workers, middle):
+        """
+        Test the _run_after_initialStep function, serially and with two
+        worker processes, on a run of five snapshots whose OUTCAR file ends
+        after three snapshots, either on a snapshot boundary or in the middle
+        of the fourth snapshot. The three complete snapshots are written once,
+        the run steps are set to three and then an EOFError is raised.
+
+        """
+        load_OUTCAR = Load_OUTCAR(workers=workers)
+        load_OUTCAR.finalStep = 5
+        simulation = UMDSimulation('', self.lattice,
+                                   [UMDSimulationRun(0, 5, 0.4)])
+        truncated = self.text[:len(self.text)//2] if middle else ''
+        outcar = io.StringIO(3*(self.text+'\n') + truncated)
+        umd = io.StringIO()
+        with pytest.raises(EOFError):
+            load_OUTCAR._run_after_initialStep(outcar, umd, simulation)
+        assert umd.getvalue() == ''.join(self.serial(s) for s in range(3))
+        assert len(load_OUTCAR.offsets) == 3
+        assert simulation.steps() == 3
+
+    # %% duplicated snapshots tests
+    def restarted(self, workers):
+        """
+        Convert two runs, where the second one restarts repeating the last
+        two snapshots of the first one, with dedup set to 2.
+
+        """
+        load_OUTCAR = Load_OUTCAR(workers=workers, dedup=2)
+        umd = io.StringIO()
+        load_OUTCAR.finalStep = 2
+        simulation = UMDSimulation('', self.lattice,
+                                   [UMDSimulationRun(0, 2, 0.4)])
+        outcar = io.StringIO(self.text+'\n'+self.text1+'\n')
+        load_OUTCAR._run_after_initialStep(outcar, umd, simulation)
+        load_OUTCAR.loadedSteps = 2
+        load_OUTCAR.finalStep = 6
+        simulation.add(UMDSimulationRun(1, 4, 0.4))
+        outcar = io.StringIO(self.text+'\n'+self.text1+'\n'
+                             + 2*(self.text2+'\n'))
+        load_OUTCAR._run_after_initialStep(outcar, umd, simulation)
+        return load_OUTCAR, simulation, umd.getvalue()
+
+    def test_run_after_initialStep_dedup(self):
+        """
+        Test the _run_after_initialStep function dropping the duplicated
+        snapshots at the beginning of a restarted run. Only the snapshots
+        at the run boundary are dropped and the snapshots saved are numbered
+        consecutively.
+
+        """
+        load_OUTCAR, simulation, string = self.restarted(workers=0)
+        texts = [self.text, self.text1, self.text2, self.text2]
+        assert string == ''.join(self.serial(s, text=t)
+                                 for s, t in enumerate(texts))
+        assert load_OUTCAR.dropped == 2
+        assert [run.steps for run in simulation.runs] == [2, 2]
+        assert [snap for snap, _ in load_OUTCAR.offsets] == [0, 1, 2, 3]
+
+    def test_run_after_initialStep_dedup_pipeline(self):
+        """
+        Test the _run_after_initialStep function dropping the duplicated
+        snapshots with two worker processes. The UMD output must be equal to
+        the serial one.
+
+        """
+        serial = self.restarted(workers=0)
+        pipeline = self.restarted(workers=2)
+        assert pipeline[2] == serial[2]
+        assert pipeline[0].offsets == serial[0].offsets
+        assert pipeline[1].steps() == serial[1].steps() == 4
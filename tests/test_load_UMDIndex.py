@@ -0,0 +1,152 @@
+"""
+===============================================================================
+                             load_UMDIndex tests
+===============================================================================
+
+To test the load_UMDIndex functions we use the examples/UMD_single.umd file,
+containing a single simulation run with 300 snapshots, the
+examples/UMD_snapshot.umd file, containing a single snapshot without any
+header, and the examples/UMD_empty.umd file, containing no snapshot.
+
+"""
+
+from ..load_UMDIndex import load_UMDIndex
+from ..load_UMDIndex import load_UMDIndex_from_umd
+from ..load_UMDIndex import load_UMDIndex_from_layout
+from ..load_UMDIndex import load_UMDIndex_from_idx
+from ..load_UMDIndex import check_UMDIndex
+
+import io
+import os
+
+from ..libs.UMDIndex import UMDIndex
+
+
+class TestLoad_UMDIndex:
+
+    umdfile = './examples/UMD_single.umd'
+
+    def test_load_UMDIndex_from_umd(self):
+        """
+        Test the load_UMDIndex_from_umd function. Each offset must point to
+        the line of the corresponding snapshot.
+
+        """
+        with open(self.umdfile, 'rb') as umd:
+            index = load_UMDIndex_from_umd(umd)
+            assert len(index) == 300
+            assert index.contiguous
+            for snap in [0, 1, 299]:
+                umd.seek(index.offset(snap))
+                assert umd.readline().split() == [b'Snapshot:',
+                                                  str(snap).encode()]
+
+    def test_load_UMDIndex_from_umd_stream(self):
+        """
+        Test the load_UMDIndex_from_umd function on a stream which cannot be
+        memory mapped. The index must be equal to the one of the file.
+
+        """
+        with open(self.umdfile, 'rb') as umd:
+            index = load_UMDIndex_from_umd(umd)
+            umd.seek(0)
+            assert load_UMDIndex_from_umd(io.BytesIO(umd.read())) == index
+
+    def test_load_UMDIndex_from_umd_empty(self):
+        """
+        Test the load_UMDIndex_from_umd function on a UMD file without any
+        snapshot. The index is empty.
+
+        """
+        with open('./examples/UMD_empty.umd', 'rb') as umd:
+            assert len(load_UMDIndex_from_umd(umd)) == 0
+
+    def test_load_UMDIndex_from_idx(self):
+        """
+        Test the load_UMDIndex_from_idx function reading a saved index.
+
+        """
+        index = UMDIndex([3, 4], [10, 20])
+        idx = io.BytesIO()
+        index.save(idx)
+        idx.seek(0)
+        assert load_UMDIndex_from_idx(idx) == index
+
+    def test_check_UMDIndex(self):
+        """
+        Test the check_UMDIndex function for a valid and a shifted index.
+
+        """
+        with open(self.umdfile, 'rb') as umd:
+            index = load_UMDIndex_from_umd(umd)
+            assert check_UMDIndex(umd, index)
+            shifted = UMDIndex(index.snaps, index.offsets+1)
+            assert not check_UMDIndex(umd, shifted)
+            assert not check_UMDIndex(umd, UMDIndex())
+
+    def test_load_UMDIndex_from_layout(self):
+        """
+        Test the load_UMDIndex_from_layout function on UMD files with a fixed
+        layout. The index must be equal to the one built scanning the file.
+
+        """
+        for umdfile in [self.umdfile, './examples/UMD_snapshot.umd']:
+            with open(umdfile, 'rb') as umd:
+                index = load_UMDIndex_from_layout(umd)
+                assert index == load_UMDIndex_from_umd(umd)
+
+    def test_load_UMDIndex_from_layout_none(self):
+        """
+        Test the load_UMDIndex_from_layout function on a UMD file without any
+        snapshot and on a UMD file with a snapshot section longer than the
+        others. None is returned.
+
+        """
+        with open('./examples/UMD_empty.umd', 'rb') as umd:
+            assert load_UMDIndex_from_layout(umd) is None
+        umd = io.BytesIO(self.irregular())
+        assert load_UMDIndex_from_layout(umd) is None
+        assert len(load_UMDIndex_from_umd(umd)) == 300
+
+    def test_load_UMDIndex_layout(self):
+        """
+        Test the load_UMDIndex function on a UMD file with a fixed layout.
+        The index is computed and no sidecar file is written.
+
+        """
+        index = load_UMDIndex(self.umdfile)
+        assert len(index) == 300
+        assert not os.path.isfile(self.umdfile + '.idx')
+
+    def test_load_UMDIndex(self):
+        """
+        Test the load_UMDIndex function on a UMD file without a fixed layout.
+        The first call writes the sidecar file, which is then loaded by the
+        second call. A stale sidecar file is written again.
+
+        """
+        umdfile = self.umdfile + '.temp'
+        with open(umdfile, 'wb') as umd:
+            umd.write(self.irregular())
+        try:
+            index = load_UMDIndex(umdfile)
+            assert len(index) == 300
+            assert os.path.isfile(umdfile + '.idx')
+            assert load_UMDIndex(umdfile) == index
+            with open(umdfile + '.idx', 'wb') as idx:
+                UMDIndex([0], [1]).save(idx)
+            assert load_UMDIndex(umdfile) == index
+        finally:
+            os.remove(umdfile)
+            os.remove(umdfile + '.idx')
+
+    def irregular(self):
+        """
+        Get the content of the example UMD file with an additional space in
+        the Dynamics line of the snapshot 150.
+
+        """
+        with open(self.umdfile, 'rb') as umd:
+            data = umd.read()
+        offset = data.index(b'Dynamics:', data.index(b'Snapshot:        150'))
+        return data[:offset] + b' ' + data[offset:]
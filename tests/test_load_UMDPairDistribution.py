@@ -0,0 +1,94 @@
+"""
+===============================================================================
+                        load_UMDPairDistribution tests
+===============================================================================
+
+To test the load_pair_distribution function we use the examples/UMD_single.umd
+file, containing a single simulation run with 300 snapshots of a lattice with:
+ - the matrix of basis vectors is:
+       5.70     0.00     0.00
+       0.00     5.70     0.00
+       0.00     0.00     5.70
+ - the contained atoms are:
+     - O: 15 atoms,
+     - H: 28 atoms,
+     - Fe: 1 atom.
+
+"""
+
+from ..load_UMDPairDistribution import load_pair_distribution
+
+import pytest
+import numpy as np
+
+from ..libs.UMDPairDistribution import UMDPairDistribution
+from ..load_UMDTrajectory import load_trajectory
+
+
+class TestLoad_UMDPairDistribution:
+
+    umdfile = './examples/UMD_single.umd'
+    simulation, trajectory = load_trajectory(umdfile)
+
+    def reference(self, lattice, positions):
+        """
+        Accumulate the positions of the snapshots one by one, as reference.
+
+        """
+        pdf = UMDPairDistribution(lattice, 2.5, 50)
+        for position in positions:
+            pdf.add(position)
+        return pdf
+
+    # %% load_pair_distribution tests
+    def test_load_pair_distribution(self):
+        """
+        Test the load_pair_distribution function. The histograms must be the
+        ones of the snapshots selected, accumulated one by one.
+
+        """
+        simulation, pdf = load_pair_distribution(self.umdfile, 2.5, 50,
+                                                 start=10, stop=200, step=3)
+        reference = self.reference(self.simulation.lattice,
+                                   self.trajectory.position[10:200:3])
+        assert simulation == self.simulation
+        assert pdf.nsnaps == len(range(10, 200, 3))
+        assert np.array_equal(pdf.histogram, reference.histogram)
+
+    @pytest.mark.parametrize('workers', [1, 3])
+    def test_load_pair_distribution_workers(self, workers):
+        """
+        Test the load_pair_distribution function with a pool of workers. The
+        histograms must be the same of the serial computation.
+
+        """
+        pdf = load_pair_distribution(self.umdfile, 2.5, 50)[1]
+        ppdf = load_pair_distribution(self.umdfile, 2.5, 50,
+                                      workers=workers)[1]
+        assert ppdf.nsnaps == 300
+        assert np.array_equal(ppdf.histogram, pdf.histogram)
+        assert np.array_equal(ppdf.rdf(), pdf.rdf())
+
+    def test_load_pair_distribution_species(self):
+        """
+        Test the load_pair_distribution function loading only some species.
+        The histograms must have only the pairs of the species selected.
+
+        """
+        simulation, pdf = load_pair_distribution(self.umdfile, 2.5, 50,
+                                                 species=['O', 'Fe'],
+                                                 workers=2)
+        rows = np.r_[0:15, 43]
+        reference = self.reference(simulation.lattice,
+                                   self.trajectory.position[:, rows])
+        assert len(simulation.lattice.bonds()) == 4
+        assert np.array_equal(pdf.histogram, reference.histogram)
+
+    def test_load_pair_distribution_empty(self):
+        """
+        Test the load_pair_distribution function with no snapshot selected.
+
+        """
+        pdf = load_pair_distribution(self.umdfile, 2.5, 50, start=300)[1]
+        assert pdf.nsnaps == 0
+        assert not pdf.histogram.any()
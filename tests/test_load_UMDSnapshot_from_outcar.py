@@ -165,6 +165,23 @@ class Test_load_UMDSnapshot_from_outcar:
             snapshot = load_UMDSnapshot_from_outcar(outcar, snapshot)
             assert snapshot == self.snapshot
 
+    def test_load_UMDSnapshot_from_snapshot_reuse(self):
+        """
+        Test the load_UMDSnapshot_from_outcar function on a snapshot reusing
+        its arrays. The dynamics are read directly into the preallocated
+        arrays of the snapshot.
+
+        """
+        with open('examples/OUTCAR_snapshot.outcar', 'r') as outcar:
+            snapshot = UMDSnapshot(1043, 0.4, self.lattice, reuse=True)
+            snapshot.buffer[1] = 1.0
+            buffer = snapshot.buffer
+            snapshot = load_UMDSnapshot_from_outcar(outcar, snapshot)
+            assert snapshot == self.snapshot
+            assert snapshot.buffer is buffer
+            assert np.shares_memory(snapshot.position, buffer)
+            assert np.shares_memory(snapshot.force, buffer)
+
     def test_load_UMDSnapshot_from_outcar_eof(self):
         """
         Test load_UMDSnapshot_from_outcar when it reads an empty OUTCAR file.
@@ -31,7 +31,12 @@ All simulations are performed on the same lattice structure:
 from ..load_UMDSnapshot_from_umd import load_UMDSnapshot_from_umd
 from ..load_UMDSnapshot_from_umd import load_UMDSnapThermodynamics_from_umd
 from ..load_UMDSnapshot_from_umd import load_UMDSnapDynamics_from_umd
+from ..load_UMDSnapshot_from_umd import load_UMDSnapDynamics_header
+from ..load_UMDSnapshot_from_umd import decode_UMDSnapDynamics
+from ..load_UMDSnapshot_from_umd import columns_mask
+from ..load_UMDSnapshot_from_umd import species_UMDLattice
 
+import io
 import numpy as np
 
 import pytest
@@ -192,6 +197,59 @@ class Test_load_UMDSnapshot_from_umd:
             dynamics = load_UMDSnapDynamics_from_umd(umd, self.natoms)
             assert dynamics == self.dynamics
 
+    def test_load_UMDSnapDynamics_from_umd_float32(self):
+        """
+        Test the load_UMDSnapDynamics_from_umd function reading an isolated
+        snapshot from a UMD file in single precision.
+
+        """
+        with open('examples/UMD_snapshot.umd', 'r') as umd:
+            dynamics = load_UMDSnapDynamics_from_umd(umd, self.natoms,
+                                                     np.float32)
+            assert dynamics.position.dtype == np.float32
+            assert dynamics.force.dtype == np.float32
+            assert dynamics == self.dynamics
+
+    def test_load_UMDSnapDynamics_from_umd_pruned(self):
+        """
+        Test the load_UMDSnapDynamics_from_umd function reading a snapshot
+        saved without the null velocity columns. The velocities are restored
+        as a read-only null array.
+
+        """
+        umd = io.StringIO(self.dynamics.format(prune=True))
+        dynamics = load_UMDSnapDynamics_from_umd(umd, self.natoms)
+        assert dynamics == self.dynamics
+        assert not dynamics.velocity.flags.writeable
+
+    def test_load_UMDSnapDynamics_from_umd_columns(self):
+        """
+        Test the load_UMDSnapDynamics_from_umd function reading only the
+        atoms position. The other vectors are restored as read-only null
+        arrays.
+
+        """
+        with open('examples/UMD_snapshot.umd', 'r') as umd:
+            dynamics = load_UMDSnapDynamics_from_umd(umd, self.natoms,
+                                                     columns=('position',))
+        assert np.array_equal(dynamics.position, self.dynamics.position)
+        assert not np.any(dynamics.force)
+        assert not dynamics.force.flags.writeable
+
+    def test_load_UMDSnapDynamics_header(self):
+        """
+        Test the load_UMDSnapDynamics_header function reading the time and
+        the columns mask from the dynamics line, with and without the mask.
+
+        """
+        time, mask = load_UMDSnapDynamics_header("Dynamics:        0.400 fs")
+        assert time == 0.4
+        assert np.all(mask)
+        line = "Dynamics:        0.400 fs Columns: 111000111"
+        time, mask = load_UMDSnapDynamics_header(line)
+        assert time == 0.4
+        assert list(mask) == [1, 1, 1, 0, 0, 0, 1, 1, 1]
+
     def test_load_UMDSnapDynamics_from_umd_eof(self):
         """
         Test load_UMDSnapDynamics_from_umd function when it reads an empty UMD
@@ -202,6 +260,141 @@ class Test_load_UMDSnapshot_from_umd:
             with pytest.raises(EOFError):
                 load_UMDSnapDynamics_from_umd(umd, self.natoms)
 
+    def test_load_UMDSnapDynamics_from_umd_truncated(self):
+        """
+        Test load_UMDSnapDynamics_from_umd function when it reads a UMD file
+        ending in the middle of the dynamics lines. An EOFError is raised.
+
+        """
+        umd = io.StringIO(str(self.dynamics)[:-200])
+        with pytest.raises(EOFError):
+            load_UMDSnapDynamics_from_umd(umd, self.natoms)
+
+    # %% decode_UMDSnapDynamics tests
+    def test_decode_UMDSnapDynamics(self):
+        """
+        Test the decode_UMDSnapDynamics function decoding the dynamics lines
+        both as string and as bytes.
+
+        """
+        mask = np.ones(9, dtype=bool)
+        lines = str(self.dynamics).split('\n', 2)[-1]
+        reference = np.hstack((self.position, self.velocity, self.force))
+        dynamics = decode_UMDSnapDynamics(lines, self.natoms, mask)
+        assert np.array_equal(dynamics, reference)
+        dynamics = decode_UMDSnapDynamics(lines.encode(), self.natoms, mask,
+                                          np.float32)
+        assert dynamics.dtype == np.float32
+        assert np.allclose(dynamics, reference)
+
+    def test_decode_UMDSnapDynamics_pruned(self):
+        """
+        Test the decode_UMDSnapDynamics function decoding the dynamics lines
+        without the null velocity columns.
+
+        """
+        mask = np.array([1, 1, 1, 0, 0, 0, 1, 1, 1], dtype=bool)
+        lines = self.dynamics.format(prune=True).split('\n', 2)[-1]
+        dynamics = decode_UMDSnapDynamics(lines, self.natoms, mask)
+        assert np.array_equal(dynamics, np.hstack((self.position,
+                                                   self.force)))
+
+    def test_decode_UMDSnapDynamics_select(self):
+        """
+        Test the decode_UMDSnapDynamics function decoding only the position
+        and force columns from fixed width lines, both full and pruned.
+
+        """
+        select = np.array([1, 1, 1, 0, 0, 0, 1, 1, 1], dtype=bool)
+        reference = np.hstack((self.position, self.force))
+        for prune in [False, True]:
+            mask = np.ones(9, dtype=bool) if not prune else select
+            lines = self.dynamics.format(prune=prune).split('\n', 2)[-1]
+            dynamics = decode_UMDSnapDynamics(lines+'\n', self.natoms, mask,
+                                              select=select)
+            assert np.array_equal(dynamics, reference)
+
+    def test_decode_UMDSnapDynamics_select_irregular(self):
+        """
+        Test the decode_UMDSnapDynamics function decoding only the position
+        columns from lines without a fixed width. All the values are decoded
+        and the position columns are returned.
+
+        """
+        mask = np.ones(9, dtype=bool)
+        select = columns_mask(('position',))
+        lines = str(self.dynamics).split('\n', 2)[-1].replace(' ', '  ')
+        dynamics = decode_UMDSnapDynamics(lines, self.natoms, mask,
+                                          select=select)
+        assert np.array_equal(dynamics, self.position)
+
+    def test_decode_UMDSnapDynamics_rows(self):
+        """
+        Test the decode_UMDSnapDynamics function decoding only the forces of
+        some atoms, from lines with and without a fixed width.
+
+        """
+        mask = np.ones(9, dtype=bool)
+        select = columns_mask(('force',))
+        rows = np.array([43, 0])
+        lines = str(self.dynamics).split('\n', 2)[-1] + '\n'
+        for chunk in [lines, lines.replace(' ', '  ')]:
+            dynamics = decode_UMDSnapDynamics(chunk, self.natoms, mask,
+                                              select=select, rows=rows)
+            assert np.array_equal(dynamics, self.force[rows])
+
+    # %% species_UMDLattice tests
+    def test_species_UMDLattice(self):
+        """
+        Test the species_UMDLattice function selecting the species by symbol
+        and by UMDAtom. The lattice returned contains only the species
+        selected, in the order of the UMD file.
+
+        """
+        lattice, rows = species_UMDLattice(self.lattice, [self.Fe, 'O'])
+        assert lattice.atoms == {self.O: 15, self.Fe: 1}
+        assert np.array_equal(lattice.dirBasis, self.lattice.dirBasis)
+        assert np.array_equal(rows, np.append(np.arange(15), 43))
+
+    def test_species_UMDLattice_none(self):
+        """
+        Test the species_UMDLattice function without any species. The lattice
+        is returned unchanged and no row is selected.
+
+        """
+        lattice, rows = species_UMDLattice(self.lattice)
+        assert lattice is self.lattice
+        assert rows is None
+
+    def test_species_UMDLattice_ValueError(self):
+        """
+        Test the species_UMDLattice function with a species not in the
+        lattice. A ValueError is raised.
+
+        """
+        with pytest.raises(ValueError):
+            species_UMDLattice(self.lattice, ['Mg'])
+
+    # %% columns_mask tests
+    def test_columns_mask(self):
+        """
+        Test the columns_mask function for some vectors names.
+
+        """
+        assert np.all(columns_mask())
+        assert list(columns_mask(('force', 'position'))) == [1, 1, 1, 0, 0, 0,
+                                                             1, 1, 1]
+        assert not np.any(columns_mask(()))
+
+    def test_columns_mask_ValueError(self):
+        """
+        Test the columns_mask function with an unknown vector name.
+        A ValueError is raised.
+
+        """
+        with pytest.raises(ValueError):
+            columns_mask(('positions',))
+
     # %% load_UMDSnapshot_from_umd tests
     def test_load_UMDSnapshot_from_umd_snapshot(self):
         """
@@ -0,0 +1,139 @@
+"""
+===============================================================================
+                         load_UMDThermodynamics tests
+===============================================================================
+
+To test the load_UMDThermodynamics functions we use the examples/UMD_single.umd
+file, containing a single simulation run with 300 snapshots, and the
+examples/UMD_empty.umd file, containing no snapshot.
+
+"""
+
+from ..load_UMDThermodynamics import load_thermodynamics
+from ..load_UMDThermodynamics import load_thermodynamics_from_umd
+from ..load_UMDThermodynamics import load_thermodynamics_from_thermo
+from ..load_UMDThermodynamics import check_thermodynamics
+from ..load_UMDThermodynamics import save_thermodynamics
+from .. import load_UMDThermodynamics
+
+import io
+import os
+import numpy as np
+import unittest.mock as mock
+
+from ..libs.UMDIndex import UMDIndex
+from ..load_UMDIndex import load_UMDIndex
+from ..load_UMDTrajectory import load_trajectory
+
+
+class TestLoad_UMDThermodynamics:
+
+    umdfile = './examples/UMD_single.umd'
+
+    def test_load_thermodynamics_from_umd(self):
+        """
+        Test the load_thermodynamics_from_umd function. The series must be
+        equal to the ones loaded together with the dynamics.
+
+        """
+        trajectory = load_trajectory(self.umdfile)[1]
+        with open(self.umdfile, 'rb') as umd:
+            thermo = load_thermodynamics_from_umd(
+                umd, load_UMDIndex(self.umdfile))
+        assert sorted(thermo) == ['energy', 'pressure', 'snap',
+                                  'temperature', 'time']
+        for key in thermo:
+            assert np.array_equal(thermo[key], getattr(trajectory, key))
+
+    def test_load_thermodynamics_from_umd_empty(self):
+        """
+        Test the load_thermodynamics_from_umd function on a UMD file without
+        any snapshot. The series are empty.
+
+        """
+        with open('./examples/UMD_empty.umd', 'rb') as umd:
+            thermo = load_thermodynamics_from_umd(umd, UMDIndex())
+        assert all(len(series) == 0 for series in thermo.values())
+
+    def test_load_thermodynamics_from_thermo(self):
+        """
+        Test the load_thermodynamics_from_thermo function reading saved
+        series.
+
+        """
+        thermodynamics = {'snap': np.arange(3), 'time': np.full(3, 0.5),
+                          'temperature': np.array([1800., 1805., 1795.]),
+                          'pressure': np.array([24.6, 24.7, 24.5]),
+                          'energy': np.array([-192.7, -192.6, -192.8])}
+        thermo = io.BytesIO()
+        save_thermodynamics(thermo, thermodynamics)
+        thermo.seek(0)
+        loaded = load_thermodynamics_from_thermo(thermo)
+        assert loaded.keys() == thermodynamics.keys()
+        for key in thermodynamics:
+            assert np.array_equal(loaded[key], thermodynamics[key])
+
+    def test_check_thermodynamics(self):
+        """
+        Test the check_thermodynamics function. The series saved with the
+        status of the UMD file are valid, unless the UMD file size or
+        modification time changed, the series do not have the stored number
+        of snapshots or the stamp is missing.
+
+        """
+        stat = os.stat(self.umdfile)
+        series = {'snap': np.arange(3), 'time': np.full(3, 0.5),
+                  'temperature': np.full(3, 1800.),
+                  'pressure': np.full(3, 24.6),
+                  'energy': np.full(3, -192.7)}
+        thermo = io.BytesIO()
+        save_thermodynamics(thermo, series, stat)
+        thermo.seek(0)
+        thermodynamics = load_thermodynamics_from_thermo(thermo)
+        assert check_thermodynamics(thermodynamics, stat)
+        assert not check_thermodynamics(
+            dict(thermodynamics, size=stat.st_size+1), stat)
+        assert not check_thermodynamics(
+            dict(thermodynamics, mtime=stat.st_mtime_ns-1), stat)
+        assert not check_thermodynamics(
+            dict(thermodynamics, energy=np.zeros(2)), stat)
+        assert not check_thermodynamics(series, stat)
+
+    def test_load_thermodynamics(self):
+        """
+        Test the load_thermodynamics function. The first call writes the
+        sidecar file, which is then loaded by the second call without
+        building the UMDIndex. A sidecar file inconsistent with the UMD file,
+        or older than the last change of the UMD file, is written again.
+
+        """
+        umdfile = self.umdfile + '.temp'
+        with open(self.umdfile, 'rb') as umd:
+            data = umd.read()
+        with open(umdfile, 'wb') as umd:
+            umd.write(data)
+        try:
+            thermodynamics = load_thermodynamics(umdfile)
+            assert np.array_equal(thermodynamics['snap'], np.arange(300))
+            assert os.path.isfile(umdfile + '.thermo')
+            with mock.patch.object(load_UMDThermodynamics,
+                                   'load_UMDIndex') as index:
+                thermo = load_thermodynamics(umdfile)
+            index.assert_not_called()
+            assert thermo.keys() == thermodynamics.keys()
+            for key in thermodynamics:
+                assert np.array_equal(thermo[key], thermodynamics[key])
+            with open(umdfile + '.thermo', 'wb') as thermo:
+                save_thermodynamics(thermo, {'snap': np.arange(2)})
+            thermo = load_thermodynamics(umdfile)
+            for key in thermodynamics:
+                assert np.array_equal(thermo[key], thermodynamics[key])
+            with open(umdfile, 'ab') as umd:
+                umd.write(data[data.index(b'Snapshot:'):])
+            thermo = load_thermodynamics(umdfile)
+            assert len(thermo['snap']) == 600
+        finally:
+            os.remove(umdfile)
+            os.remove(umdfile + '.thermo')
+            if os.path.isfile(umdfile + '.idx'):
+                os.remove(umdfile + '.idx')
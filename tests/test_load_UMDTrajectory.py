@@ -0,0 +1,250 @@
+"""
+===============================================================================
+                           load_UMDTrajectory tests
+===============================================================================
+
+To test the load_trajectory and iter_snapshots functions we use the
+examples/UMD_single.umd file, containing a single simulation run with 300
+snapshots of a lattice with:
+ - the matrix of basis vectors is:
+       5.70     0.00     0.00
+       0.00     5.70     0.00
+       0.00     0.00     5.70
+ - the contained atoms are:
+     - O: 15 atoms,
+     - H: 28 atoms,
+     - Fe: 1 atom.
+
+"""
+
+from ..load_UMDTrajectory import load_trajectory
+from ..load_UMDTrajectory import iter_snapshots
+from ..load_UMDTrajectory import load_UMDSnapshot_block
+
+import os
+import pytest
+import numpy as np
+
+from ..libs.UMDSnapshot import UMDSnapshot
+from ..libs.UMDSimulation import UMDSimulation
+
+
+class TestLoad_UMDTrajectory:
+
+    umdfile = './examples/UMD_single.umd'
+    with open(umdfile, 'r') as umd:
+        simulation = UMDSimulation.UMDSimulation_from_umd(umd)
+    natoms = simulation.lattice.natoms()
+
+    def reference(self, snap):
+        """
+        Load a snapshot of the example file with the UMDSnapshot_from_umd
+        function, as reference.
+
+        """
+        with open(self.umdfile, 'r') as umd:
+            snapshot = UMDSnapshot(lattice=self.simulation.lattice)
+            return snapshot.UMDSnapshot_from_umd(umd, snap)
+
+    # %% load_trajectory tests
+    def test_load_trajectory(self):
+        """
+        Test the load_trajectory function. The arrays must have a row for
+        each snapshot and their rows must be equal to the snapshots loaded
+        one by one.
+
+        """
+        simulation, trajectory = load_trajectory(self.umdfile)
+        assert simulation == self.simulation
+        assert len(trajectory) == 300
+        assert trajectory.position.shape == (300, self.natoms, 3)
+        assert np.array_equal(trajectory.snap, np.arange(300))
+        for snap in [0, 123, 299]:
+            snapshot = self.reference(snap)
+            assert trajectory.time[snap] == snapshot.time
+            assert trajectory.temperature[snap] == snapshot.temperature
+            assert trajectory.pressure[snap] == snapshot.pressure
+            assert trajectory.energy[snap] == snapshot.energy
+            assert np.array_equal(trajectory.position[snap],
+                                  snapshot.position)
+            assert np.array_equal(trajectory.velocity[snap],
+                                  snapshot.velocity)
+            assert np.array_equal(trajectory.force[snap], snapshot.force)
+            assert trajectory[snap] == snapshot
+
+    def test_load_trajectory_float32(self):
+        """
+        Test the load_trajectory function in single precision.
+
+        """
+        trajectory = load_trajectory(self.umdfile, np.float32)[1]
+        assert trajectory.position.dtype == np.float32
+        assert np.allclose(trajectory.position[299],
+                           self.reference(299).position)
+
+    def test_load_trajectory_columns(self):
+        """
+        Test the load_trajectory function loading only the atoms positions.
+        The other columns are set to zero.
+
+        """
+        trajectory = load_trajectory(self.umdfile, columns=('position',))[1]
+        assert np.array_equal(trajectory.position[42],
+                              self.reference(42).position)
+        assert not np.any(trajectory.velocity)
+        assert not np.any(trajectory.force)
+
+    def test_load_trajectory_species(self):
+        """
+        Test the load_trajectory function loading only the Fe and O atoms.
+        The lattice returned contains only them and the dynamics array has
+        their rows only.
+
+        """
+        simulation, trajectory = load_trajectory(self.umdfile,
+                                                 species=['Fe', 'O'])
+        snapshot = self.reference(42)
+        assert simulation.lattice.natoms() == 16
+        assert trajectory.lattice == simulation.lattice
+        assert trajectory.position.shape == (300, 16, 3)
+        assert np.array_equal(trajectory.position[42, 0:15],
+                              snapshot.position[:15])
+        assert np.array_equal(trajectory.force[42, 15], snapshot.force[43])
+
+    @pytest.mark.parametrize('workers', [1, 3])
+    def test_load_trajectory_workers(self, workers):
+        """
+        Test the load_trajectory function decoding the snapshots with a pool
+        of worker processes. The arrays must be equal to the ones loaded
+        serially.
+
+        """
+        trajectory = load_trajectory(self.umdfile)[1]
+        ptrajectory = load_trajectory(self.umdfile, workers=workers)[1]
+        for key in ['snap', 'time', 'temperature', 'pressure', 'energy',
+                    'vectors']:
+            assert np.array_equal(getattr(ptrajectory, key),
+                                  getattr(trajectory, key))
+
+    def test_load_trajectory_workers_species(self):
+        """
+        Test the load_trajectory function decoding in parallel only the
+        positions of the H atoms.
+
+        """
+        trajectory = load_trajectory(self.umdfile, columns=('position',),
+                                     species=['H'])[1]
+        ptrajectory = load_trajectory(self.umdfile, columns=('position',),
+                                      species=['H'], workers=2)[1]
+        assert ptrajectory.vectors.shape == (3, 300, 28, 3)
+        assert np.array_equal(ptrajectory.vectors, trajectory.vectors)
+
+    def test_load_trajectory_EOFError(self):
+        """
+        Test the load_trajectory function on a UMD file whose last snapshot
+        is missing. An EOFError is raised.
+
+        """
+        umdfile = self.umdfile + '.temp'
+        with open(self.umdfile, 'r') as umd:
+            text = umd.read()
+        with open(umdfile, 'w') as umd:
+            umd.write(text[:text.index('Snapshot:        299')])
+        try:
+            with pytest.raises(EOFError):
+                load_trajectory(umdfile)
+        finally:
+            os.remove(umdfile)
+            if os.path.isfile(umdfile + '.idx'):
+                os.remove(umdfile + '.idx')
+
+    # %% iter_snapshots tests
+    def test_iter_snapshots(self):
+        """
+        Test the iter_snapshots function over a slice of the snapshots.
+        The snapshots must be equal to the ones loaded with the
+        UMDSnapshot_from_umd function and each one has its own arrays.
+
+        """
+        snapshots = list(iter_snapshots(self.umdfile, 10, 50, 7))
+        assert [snapshot.snap for snapshot in snapshots] == [10, 17, 24, 31,
+                                                             38, 45]
+        for snapshot in snapshots:
+            assert snapshot == self.reference(snapshot.snap)
+        assert snapshots[0].position is not snapshots[1].position
+
+    def test_iter_snapshots_reuse(self):
+        """
+        Test the iter_snapshots function reusing the same buffer. The same
+        UMDSnapshot object is yielded, updated with each snapshot.
+
+        """
+        snapshots = iter_snapshots(self.umdfile, -2, reuse=True)
+        snapshot = next(snapshots)
+        assert snapshot == self.reference(298)
+        assert next(snapshots) is snapshot
+        assert snapshot == self.reference(299)
+        assert next(snapshots, None) is None
+
+    def test_iter_snapshots_arrays(self):
+        """
+        Test the iter_snapshots function yielding the raw arrays and reusing
+        the same buffer for all of them.
+
+        """
+        buffers = set()
+        for i, dynamics in enumerate(iter_snapshots(self.umdfile, step=100,
+                                                    reuse=True, arrays=True)):
+            snapshot = self.reference(100*i)
+            assert dynamics.shape == (self.natoms, 9)
+            assert np.array_equal(dynamics[:, 6:9], snapshot.force)
+            buffers.add(id(dynamics))
+        assert len(buffers) == 1
+
+    def test_iter_snapshots_columns(self):
+        """
+        Test the iter_snapshots function loading only the atoms forces.
+
+        """
+        snapshot = next(iter_snapshots(self.umdfile, 7, columns=('force',)))
+        assert np.array_equal(snapshot.force, self.reference(7).force)
+        assert not np.any(snapshot.position)
+
+    def test_iter_snapshots_species(self):
+        """
+        Test the iter_snapshots function loading only the H atoms. The
+        snapshots yielded are described by the lattice of the H atoms.
+
+        """
+        snapshot = next(iter_snapshots(self.umdfile, 7, species=['H']))
+        assert snapshot.natoms == 28
+        assert np.array_equal(snapshot.position,
+                              self.reference(7).position[15:43])
+
+    def test_iter_snapshots_empty(self):
+        """
+        Test the iter_snapshots function with a start beyond the end of the
+        UMD file. No snapshot is yielded.
+
+        """
+        assert list(iter_snapshots(self.umdfile, 300)) == []
+
+    # %% load_UMDSnapshot_block tests
+    def test_load_UMDSnapshot_block_pruned(self):
+        """
+        Test the load_UMDSnapshot_block function decoding a snapshot section
+        without the null velocity columns. The velocity columns are set to
+        zero.
+
+        """
+        snapshot = self.reference(10)
+        out = np.ones((self.natoms, 9))
+        with open(self.umdfile + '.temp', 'w') as umd:
+            snapshot.save(umd, prune=True)
+        with open(self.umdfile + '.temp', 'rb') as umd:
+            thermo = load_UMDSnapshot_block(umd.read(), self.natoms, out)
+        os.remove(self.umdfile + '.temp')
+        assert thermo['temperature'] == snapshot.temperature
+        assert np.array_equal(out[:, 0:3], snapshot.position)
+        assert np.array_equal(out[:, 3:6], np.zeros((self.natoms, 3)))
+        assert np.array_equal(out[:, 6:9], snapshot.force)
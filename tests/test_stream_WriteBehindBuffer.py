@@ -0,0 +1,106 @@
+"""
+===============================================================================
+                            WriteBehindBuffer tests
+===============================================================================
+"""
+
+
+from ..utils.stream_WriteBehindBuffer import WriteBehindBuffer
+
+import io
+import pytest
+import unittest.mock as mock
+import hypothesis as hp
+import hypothesis.strategies as st
+
+
+class TestWriteBehindBuffer:
+    """
+    Test a WriteBehindBuffer object of size 10 wrapping a string stream.
+
+    """
+
+    def test_WriteBehindBuffer_init_ValueError(self):
+        """
+        Test the __init__ function with a non positive size.
+        A ValueError is raised.
+
+        """
+        with pytest.raises(ValueError):
+            WriteBehindBuffer(io.StringIO(), size=0)
+
+    def test_WriteBehindBuffer_write_buffered(self):
+        """
+        Test the write function with less data than the buffer size. Nothing
+        is written on the stream before the buffer is closed.
+
+        """
+        stream = io.StringIO()
+        buffer = WriteBehindBuffer(stream, size=10)
+        buffer.write('abc')
+        buffer.write('def')
+        assert buffer.tell() == 6
+        assert stream.getvalue() == ''
+        buffer.close()
+        assert stream.getvalue() == 'abcdef'
+
+    def test_WriteBehindBuffer_write_aligned(self):
+        """
+        Test the write function with more data than the buffer size. Only a
+        multiple of the buffer size is written on the stream, while the rest
+        stays in the buffer.
+
+        """
+        stream = mock.Mock()
+        buffer = WriteBehindBuffer(stream, size=10)
+        buffer.write('0123456789'+'0123456789'+'012')
+        buffer._queue.put(None)
+        buffer._thread.join()
+        stream.write.assert_called_once_with('0123456789'+'0123456789')
+        assert buffer._buffer == ['012']
+
+    def test_WriteBehindBuffer_close_error(self):
+        """
+        Test the close function when the stream raises an error during the
+        background writing. The error is raised again by the close function.
+
+        """
+        stream = mock.Mock()
+        stream.write.side_effect = OSError
+        with pytest.raises(OSError):
+            with WriteBehindBuffer(stream, size=10) as buffer:
+                buffer.write('0123456789')
+
+    def test_WriteBehindBuffer_exit_body_error(self):
+        """
+        Test the __exit__ function when both the body of the with statement
+        and the background writer raise an error. The error of the body is
+        raised, while the writer error is dropped.
+
+        """
+        stream = mock.Mock()
+        stream.write.side_effect = OSError
+        with pytest.raises(ValueError):
+            with WriteBehindBuffer(stream, size=10) as buffer:
+                buffer.write('0123456789')
+                buffer.write('012')
+                raise ValueError
+        assert isinstance(buffer._error, OSError)
+
+
+# %% ===================================================================== %% #
+# %% WriteBehindBuffer hypothesis tests
+@hp.given(strings=st.lists(st.text(max_size=50), max_size=100),
+          size=st.integers(1, 100))
+def test_WriteBehindBuffer_write(strings, size):
+    """
+    Test the write function. Once the buffer is closed, the stream contains
+    all the strings written in the same order.
+
+    """
+    stream = io.StringIO()
+    with WriteBehindBuffer(stream, size=size) as buffer:
+        for string in strings:
+            buffer.write(string)
+    assert stream.getvalue() == ''.join(strings)
+    assert buffer.tell() == len(''.join(strings))
@@ -0,0 +1,218 @@
+"""
+===============================================================================
+                               WriteBehindBuffer
+===============================================================================
+
+This module provides the WriteBehindBuffer class to wrap an output stream.
+The strings written on the WriteBehindBuffer are collected in memory and
+then they are written on the wrapped stream in large chunks by a background
+thread. In this way, the many small writes of a UMD file (one per snapshot)
+become few large writes, which are much faster on network filesystems, and
+the producer can go on with its computations while the chunk is written.
+
+Classes
+-------
+    WriteBehindBuffer
+
+"""
+
+
+import queue
+import threading
+
+
+class WriteBehindBuffer:
+    """
+    Class to buffer the strings written on a stream and write them behind.
+
+    The strings are accumulated until the buffer size is reached. Then, the
+    data are split in chunks with length multiple of the buffer size and sent
+    to a background thread which writes them on the stream. The remaining data
+    stay in the buffer till the next write or the final flush.
+
+    Parameters
+    ----------
+    stream : output stream
+        The wrapped output stream.
+    size : int
+        The buffer size in characters.
+    depth : int
+        The maximum number of chunks waiting to be written. It bounds the
+        memory used to about (depth+1)*size characters.
+    position : int
+        The total number of characters written on the buffer.
+
+    Methods
+    -------
+    write
+        Write a string on the buffer.
+    tell
+        Get the position in the stream of the next character written.
+    flush
+        Send all the buffered data to the background writer.
+    close
+        Flush the buffer and wait the background writer to end.
+
+    """
+
+    def __init__(self, stream, size=2**22, depth=2):
+        """
+        Construct a WriteBehindBuffer object and start its background writer.
+
+        Parameters
+        ----------
+        stream : output stream
+            The wrapped output stream.
+        size : int, optional
+            The buffer size in characters. The default is 2**22.
+        depth : int, optional
+            The maximum number of chunks waiting to be written. When they are
+            all full, the write function waits for the background writer.
+            The default is 2.
+
+        Raises
+        ------
+        ValueError
+            If the buffer size is not positive.
+
+        Returns
+        -------
+        WriteBehindBuffer object.
+
+        """
+        if size <= 0:
+            raise ValueError('invalid size value: it must be positive.')
+        self.stream = stream
+        self.size = int(size)
+        self.depth = int(depth)
+        self.position = 0
+        self._buffer = []
+        self._length = 0
+        self._error = None
+        self._queue = queue.Queue(maxsize=self.depth)
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # If the body of the with statement raised an exception, it is the
+        # cause of any error of the background writer, so the writer error
+        # is dropped and the original exception propagates.
+        self._join()
+        if exc_type is None and self._error is not None:
+            raise self._error
+
+    def write(self, string):
+        """
+        Write a string on the buffer.
+
+        Parameters
+        ----------
+        string : string
+            The string to write.
+
+        Returns
+        -------
+        n : int
+            The number of characters written.
+
+        """
+        self._buffer.append(string)
+        self._length += len(string)
+        self.position += len(string)
+        if self._length >= self.size:
+            data = ''.join(self._buffer)
+            aligned = (self._length // self.size) * self.size
+            self._send(data[:aligned])
+            self._buffer = [data[aligned:]]
+            self._length -= aligned
+        return len(string)
+
+    def tell(self):
+        """
+        Get the position in the stream of the next character written.
+
+        Returns
+        -------
+        position : int
+            The number of characters written on the buffer.
+
+        """
+        return self.position
+
+    def flush(self):
+        """
+        Send all the buffered data to the background writer.
+
+        Returns
+        -------
+        None.
+
+        """
+        if self._length:
+            self._send(''.join(self._buffer))
+            self._buffer = []
+            self._length = 0
+
+    def close(self):
+        """
+        Flush the buffer and wait the background writer to end.
+
+        Raises
+        ------
+        Exception
+            Any exception raised by the background writer.
+
+        Returns
+        -------
+        None.
+
+        """
+        self._join()
+        if self._error is not None:
+            raise self._error
+
+    def _join(self):
+        """
+        Send the buffered data and wait the background writer to end, storing
+        any error instead of raising it.
+
+        """
+        if self._thread.is_alive():
+            if self._length:
+                self._queue.put(''.join(self._buffer))
+                self._buffer = []
+                self._length = 0
+            self._queue.put(None)
+            self._thread.join()
+            try:
+                self.stream.flush()
+            except Exception as error:
+                if self._error is None:
+                    self._error = error
+
+    def _send(self, data):
+        """
+        Send a chunk of data to the background writer.
+
+        """
+        if self._error is not None:
+            raise self._error
+        self._queue.put(data)
+
+    def _writer(self):
+        """
+        Write the chunks received on the stream till the closing sentinel.
+
+        """
+        while True:
+            data = self._queue.get()
+            if data is None:
+                return
+            if self._error is None:
+                try:
+                    self.stream.write(data)
+                except Exception as error:
+                    self._error = error